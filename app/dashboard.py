@@ -35,21 +35,28 @@ if PROJECT_ROOT not in sys.path:
 
 # Import our project modules
 from app.ui_helpers import load_css, show_home_page
-from app.dashboard_sections import display_weather_information, display_forecast_graph, display_main_market_data, display_ml_recommendations
-from app.ml_crop_recommender import recommend_crops # The new recommendation engine
+from app.dashboard_sections import display_weather_information, display_forecast_graph, display_main_market_data, display_ml_recommendations, display_planting_calendar, display_nearby_townships, display_crop_townships
+from app.ml_crop_recommender import recommend_crops, city_for_location # The new recommendation engine
+from app.planting_date_predictor import PlantingDatePredictor
 from src.data_collection.weather import get_open_meteo_weather as get_weather_data
+from src.data_collection.historical_weather import fetch_historical_weather
+from app.data.city_coordinates import CITY_COORDINATES
 
 # --- Default values and constants ---
 DEFAULT_GREENHOUSE_SIZE = 100.0
-CITY_COORDINATES = {
-    "Pathein (Ayeyarwady)": {"lat": 16.78, "lon": 94.73}, "Bago": {"lat": 17.34, "lon": 96.48},
-    "Hakha (Chin)": {"lat": 22.64, "lon": 93.61}, "Loikaw (Kayah)": {"lat": 19.67, "lon": 97.21},
-    "Hpa-an (Kayin)": {"lat": 16.89, "lon": 97.63}, "Magway": {"lat": 20.15, "lon": 94.95},
-    "Mandalay": {"lat": 21.96, "lon": 96.09}, "Mawlamyine (Mon)": {"lat": 16.49, "lon": 97.63},
-    "Naypyidaw": {"lat": 19.76, "lon": 96.08}, "Sittwe (Rakhine)": {"lat": 20.14, "lon": 92.90},
-    "Sagaing": {"lat": 21.88, "lon": 95.98}, "Taunggyi (Shan)": {"lat": 20.78, "lon": 97.03},
-    "Dawei (Tanintharyi)": {"lat": 14.08, "lon": 98.20}, "Yangon": {"lat": 16.87, "lon": 96.19}
-}
+CUSTOM_LOCATION = "Custom coordinates..."
+
+def location_for(city_full: str):
+    """{'lat', 'lon'} of a preset city, or of the coordinates entered for a custom location."""
+    if city_full == CUSTOM_LOCATION:
+        return {'lat': st.session_state.get('custom_lat'), 'lon': st.session_state.get('custom_lon')}
+    return CITY_COORDINATES.get(city_full)
+
+def recommendation_city_for(city_full: str, location: dict) -> str:
+    """Crop-settings city for a location: the city itself, or the nearest one to custom coordinates."""
+    if city_full == CUSTOM_LOCATION:
+        return city_for_location(location['lat'], location['lon'])[0] or ""
+    return city_full
 
 # Load external CSS
 load_css("assets/styles/dashboard.css")
@@ -83,10 +90,17 @@ if st.session_state.get('show_dashboard'):
         township_options = [
             "Select a location...", "Pathein (Ayeyarwady)", "Bago", "Hakha (Chin)", "Loikaw (Kayah)", 
             "Hpa-an (Kayin)", "Magway", "Mandalay", "Mawlamyine (Mon)", "Naypyidaw",
-            "Sittwe (Rakhine)", "Sagaing", "Taunggyi (Shan)", "Dawei (Tanintharyi)", "Yangon"
+            "Sittwe (Rakhine)", "Sagaing", "Taunggyi (Shan)", "Dawei (Tanintharyi)", "Yangon", CUSTOM_LOCATION
         ]
         city_full: str = st.selectbox("Select your city / township", township_options, key="city_input")
         city = city_full.split(" (")[0] if city_full != "Select a location..." else ""
+        if city_full == CUSTOM_LOCATION:
+            farm_lat = st.number_input("Latitude", min_value=9.5, max_value=28.6, value=19.75, step=0.01, format="%.4f", key="custom_lat")
+            farm_lon = st.number_input("Longitude", min_value=92.1, max_value=101.2, value=96.1, step=0.01, format="%.4f", key="custom_lon")
+            settings_city, settings_distance = city_for_location(farm_lat, farm_lon)
+            city = settings_city or ""
+            if settings_city:
+                st.caption(f"Crop settings from {settings_city} ({settings_distance:.0f} km away)")
 
         # --- THIS SECTION IS RESTORED TO ITS ORIGINAL FUNCTIONALITY ---
         st.header("📏 Greenhouse Size")
@@ -181,7 +195,7 @@ if st.session_state.get("fetch_data", False):
             st.session_state['fetch_data'] = False
             st.stop()
 
-        location_info = CITY_COORDINATES.get(city_full)
+        location_info = location_for(city_full)
         if not location_info:
             st.error(f"Could not find location information for '{city_full}'.")
             st.session_state['fetch_data'] = False
@@ -194,24 +208,34 @@ if st.session_state.get("fetch_data", False):
             st.stop()
             
         st.session_state['weather_data'] = weather
+        # Results are shown for the fetched location, not whatever the inputs hold on a later rerun
+        st.session_state['fetched_city'] = city_full
+        st.session_state['fetched_location'] = location_info
         st.session_state['data_ready'] = True
         st.session_state['fetch_data'] = False
 
 # --- Main Content Display Block ---
 if st.session_state.get("data_ready", False):
     weather = st.session_state.get('weather_data', {})
-    # --- MODIFIED: Retrieve using the widget's key ---
-    city_full = st.session_state.get('city_input', '')
+    city_full = st.session_state.get('fetched_city', '')
     area_sqm = st.session_state.get('area_sqm', DEFAULT_GREENHOUSE_SIZE)
     water_liters = st.session_state.get('water_liters', 0.0)
     # --- MODIFIED: Retrieve using the widget's key ---
     fert_type = st.session_state.get('fertilizer_type', 'Organic')
 
-    st.markdown(f"📍 **Displaying results for:** `{city_full}` | **Greenhouse Area:** `{area_sqm} sqm`")
+    location_info = st.session_state.get('fetched_location')
+    location_label = city_full
+    if city_full == CUSTOM_LOCATION and location_info:
+        location_label = f"{location_info['lat']:.4f}, {location_info['lon']:.4f} (near {recommendation_city_for(city_full, location_info)})"
+
+    st.markdown(f"📍 **Displaying results for:** `{location_label}` | **Greenhouse Area:** `{area_sqm} sqm`")
     
     display_weather_information(st, weather)
     display_forecast_graph(st, weather, go)
     display_main_market_data(st)
+    if location_info:
+        display_nearby_townships(st, location_info['lat'], location_info['lon'])
+    display_crop_townships(st)
 
     st.markdown("## 🌿 AI Crop Recommendations & Planning")
     with st.spinner("🧠 Analyzing your farm data for top crop choices..."):
@@ -228,7 +252,7 @@ if st.session_state.get("data_ready", False):
             )
 
         recommendations = get_recommendations_cached(
-            city_full,
+            recommendation_city_for(city_full, location_info),
             area_sqm,
             water_liters,
             fert_type,
@@ -271,4 +295,37 @@ if st.session_state.get("data_ready", False):
                 st_obj=st,
                 recommendations=recommendations,
                 area_input=str(area_sqm)
-            )
\ No newline at end of file
+            )
+
+    # --- Planting calendar for the recommended crops ---
+    # One archived-weather frame per location, shared by every session without copying;
+    # PlantingDatePredictor only reads it
+    @st.cache_resource(show_spinner=False, ttl=24 * 3600)
+    def get_weather_history_shared(lat, lon):
+        end_date = datetime.now().date() - timedelta(days=7)
+        start_date = end_date - timedelta(days=3 * 365)
+        history = fetch_historical_weather(lat, lon, start_date.isoformat(), end_date.isoformat())
+        if history is None or history.empty:
+            # Raising keeps a failed fetch out of the cache, so the next run retries
+            raise ValueError("no archived weather received for this location")
+        return history
+
+    @st.cache_data(show_spinner=False, ttl=24 * 3600)
+    def get_planting_calendar_cached(lat, lon, crops):
+        history = get_weather_history_shared(lat, lon)
+        predictor = PlantingDatePredictor(lat, lon, historical_weather_df=history, fit_prophet=False)
+        return predictor.get_planting_calendar(list(crops))
+
+    if location_info:
+        with st.spinner("📅 Building the planting calendar from archived weather..."):
+            try:
+                calendar_df = get_planting_calendar_cached(
+                    location_info['lat'],
+                    location_info['lon'],
+                    tuple(rec['crop_name'] for rec in recommendations),
+                )
+            except ValueError as e:
+                calendar_df = None
+                st.warning(f"📅 Planting calendar unavailable: {e}. Please try again later.")
+        if calendar_df is not None:
+            display_planting_calendar(st, calendar_df, go)
@@ -6,10 +6,13 @@ import os
 import json
 import re
 from datetime import datetime, timedelta
-import math
 from app.ui_helpers import fmt, get_weather_condition
 import base64
 from app.profit_predictor import predict_profit
+from app.market_table import SORT_COLUMNS, market_filter_options, market_table_csv, query_market_table
+from src.utils.agro_meteorology import dew_point
+from src.planning.township_locator import get_township_locator
+from src.planning.crop_reverse_index import get_crop_reverse_index
 
 PROJECT_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 try:
@@ -31,6 +34,8 @@ def display_weather_information(st_obj, weather_data):
             emoji, description = (weather_condition_str.split(' ', 1) if ' ' in weather_condition_str
                                   else ('🌈', weather_condition_str))
 
+            # Dew point, VPD and heat index are precomputed from the hourly arrays
+            # in get_open_meteo_weather; only derive dew point here for older payloads.
             dewpoint = weather_data.get('dewpoint')
             temp_c_val_for_dew = weather_data.get('temp', weather_data.get('temp_min'))
             humidity_val_for_dew = weather_data.get('humidity')
@@ -38,24 +43,20 @@ def display_weather_information(st_obj, weather_data):
             if dewpoint is None:
                 if isinstance(temp_c_val_for_dew, (int, float)) and \
                    isinstance(humidity_val_for_dew, (int, float)) and humidity_val_for_dew > 0:
-                    try:
-                        a, b = 17.27, 237.7
-                        alpha = ((a * temp_c_val_for_dew) / (b + temp_c_val_for_dew)) + math.log(humidity_val_for_dew / 100.0)
-                        calculated_dewpoint = (b * alpha) / (a - alpha)
-                        dewpoint = calculated_dewpoint
-                    except (ValueError, TypeError, ZeroDivisionError, OverflowError):
-                        dewpoint = temp_c_val_for_dew if isinstance(temp_c_val_for_dew, (int, float)) else "N/A"
+                    dewpoint = float(dew_point(temp_c_val_for_dew, humidity_val_for_dew))
                 elif isinstance(temp_c_val_for_dew, (int, float)):
                     dewpoint = temp_c_val_for_dew
                 else:
                     dewpoint = "N/A"
             elif not isinstance(dewpoint, (int, float)):
                 dewpoint = "N/A"
-            
+
             metrics_to_display = [
                 {'icon': '🌡️', 'label': 'Maximum', 'value': fmt(weather_data.get('temp_max'), "°C")},
                 {'icon': '🌡️', 'label': 'Minimum', 'value': fmt(weather_data.get('temp_min'), "°C")},
                 {'icon': '💧', 'label': 'Dew Point', 'value': fmt(dewpoint, "°C")},
+                {'icon': '🍃', 'label': 'VPD', 'value': fmt(weather_data.get('vpd'), " kPa", decimals=2)},
+                {'icon': '🥵', 'label': 'Heat Index', 'value': fmt(weather_data.get('heat_index'), "°C")},
                 {'icon': '🌱', 'label': 'Soil Temp', 'value': fmt(weather_data.get('soil_temperature'), "°C")},
                 {'icon': '💨', 'label': 'Wind Speed', 'value': fmt(weather_data.get('wind_speed'), " km/h")},
                 {'icon': '🧭', 'label': 'Wind Dir.', 'value': fmt(weather_data.get('wind_direction'), "°")},
@@ -368,32 +369,133 @@ def display_cost_and_roi(st_obj, profit_data: dict):
     
 def display_main_market_data(st_obj):
     """
-    Displays the main market prices table from data/market_prices.csv.
+    Displays the market prices from the shared price store (data/market_prices.db
+    when ingested, else data/market_prices.csv) as a filterable, sortable, paged table.
+
+    The formatted table and each filtered/sorted view are cached per data version
+    (app/market_table.py), so reruns only slice the current page.
     """
     st_obj.markdown("### 📊 Market Prices (MMK)")
     try:
-        # Correct path from project root
-        market_prices_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'market_prices.csv')
-        df = pd.read_csv(market_prices_path)
-        
-        # Rename 'S.N' to 'No.' if it exists
-        if 'S.N' in df.columns:
-            df = df.rename(columns={'S.N': 'No.'})
-
-        st_obj.dataframe(df, hide_index=True)
-
-        csv = df.to_csv(index=False).encode('utf-8')
-        st_obj.download_button(
+        options = market_filter_options()
+
+        col_region, col_crop, col_search = st_obj.columns(3)
+        region = col_region.selectbox("Region", ["All"] + options['regions'], key="market_region")
+        crop = col_crop.selectbox("Crop", ["All"] + options['crops'], key="market_crop")
+        search = col_search.text_input("Search crop", key="market_search")
+
+        col_sort, col_order, col_size = st_obj.columns(3)
+        sort_by = col_sort.selectbox("Sort by", SORT_COLUMNS, key="market_sort")
+        ascending = col_order.radio("Order", ["Descending", "Ascending"], horizontal=True,
+                                    key="market_order") == "Ascending"
+        page_size = col_size.selectbox("Rows per page", [25, 50, 100, 250], index=1, key="market_page_size")
+
+        filters = dict(region=None if region == "All" else region, crop=None if crop == "All" else crop,
+                       search=search, sort_by=sort_by, ascending=ascending)
+        page = st_obj.session_state.get("market_page", 1)
+        result = query_market_table(page=page, page_size=page_size, **filters)
+        if result['page'] != page:
+            st_obj.session_state["market_page"] = result['page']
+
+        st_obj.dataframe(result['rows'], hide_index=True, use_container_width=True)
+
+        col_page, col_info, col_download = st_obj.columns([1, 2, 1])
+        col_page.number_input("Page", min_value=1, max_value=result['pages'], step=1, key="market_page")
+        col_info.caption(f"{result['total_rows']:,} rows · page {result['page']} of {result['pages']}")
+        col_download.download_button(
             label="📥 Download Market Prices",
-            data=csv,
+            data=market_table_csv(**filters),
             file_name='market_prices.csv',
             mime='text/csv',
         )
     except FileNotFoundError:
-        st_obj.error("Main market prices file not found. Please ensure 'app/market_prices.csv' exists.")
+        st_obj.error("Market price data not found. Please ensure 'data/market_prices.csv' exists "
+                     "or run the market price ingestion.")
     except Exception as e:
         st_obj.error(f"An error occurred while loading the main market prices: {e}")
 
+def display_nearby_townships(st_obj, lat: float, lon: float, k: int = 3, top: int = 10):
+    """
+    The known townships nearest to the farm and their best knowledge-base crops
+    (src/planning/township_locator.py; a ball-tree lookup, no scan of the sites).
+    """
+    st_obj.markdown("### 🗺️ Nearest Known Townships")
+    try:
+        locator = get_township_locator()
+        sites = locator.nearest(lat, lon, k=k)
+        st_obj.dataframe(
+            sites[['Township', 'Region', 'distance_km', 'SuitableCrops']].rename(
+                columns={'distance_km': 'Distance (km)', 'SuitableCrops': 'Suitable Crops'}),
+            hide_index=True, use_container_width=True,
+        )
+        crops = locator.crops_near(lat, lon, k=k, top=top, by="profit")
+        if not crops.empty:
+            st_obj.caption("Most profitable knowledge-base crops at these townships")
+            st_obj.dataframe(crops, hide_index=True, use_container_width=True)
+    except FileNotFoundError:
+        st_obj.info("Knowledge base not found. Run create_knowledge_base.py to enable nearby-township results.")
+    except Exception as e:
+        st_obj.error(f"An error occurred while looking up nearby townships: {e}")
+
+def display_crop_townships(st_obj):
+    """
+    "Where can I grow this crop?": every township where the selected crop is suitable,
+    best predicted profit first (the ranked posting list of src/planning/crop_reverse_index.py).
+    """
+    st_obj.markdown("### 🔎 Where Can I Grow...")
+    try:
+        index = get_crop_reverse_index()
+        col_crop, col_top, col_profit = st_obj.columns(3)
+        crop = col_crop.selectbox("Crop", index.crops, key="reverse_crop")
+        top = col_top.selectbox("Townships", [10, 25, 50, "All"], key="reverse_top")
+        profitable_only = col_profit.checkbox("Profitable only", key="reverse_profitable")
+
+        result = index.townships(crop, top=None if top == "All" else top,
+                                 min_profit=0 if profitable_only else None)
+        if result.empty:
+            st_obj.info(f"No townships found for {crop}.")
+            return
+        st_obj.dataframe(
+            result.rename(columns={'PredictedProfitMMK': 'Predicted Profit (MMK)',
+                                   'PredictedYieldPerSqmKg': 'Predicted Yield (kg/sqm)'}),
+            hide_index=True, use_container_width=True,
+        )
+        total = len(index.township_ids(crop))
+        st_obj.caption(f"{total} townships list {crop} as suitable; townships without a profit prediction come last.")
+    except FileNotFoundError:
+        st_obj.info("Knowledge base not found. Run create_knowledge_base.py to enable this section.")
+    except Exception as e:
+        st_obj.error(f"An error occurred while looking up townships for this crop: {e}")
+
+def display_planting_calendar(st_obj, calendar_df: pd.DataFrame, go_obj):
+    """
+    Full-year planting suitability heatmap (crops × day of year), as produced by
+    PlantingDatePredictor.get_planting_calendar.
+    """
+    st_obj.markdown("### 📅 Planting Calendar")
+    if calendar_df is None or calendar_df.empty:
+        st_obj.info("Not enough historical weather to build a planting calendar.")
+        return
+
+    fig = go_obj.Figure(go_obj.Heatmap(
+        z=calendar_df.values,
+        x=list(calendar_df.columns),
+        y=list(calendar_df.index),
+        colorscale='YlGn',
+        zmin=0,
+        zmax=1,
+        colorbar=dict(title='Suitability'),
+        hovertemplate='<b>%{y}</b><br>Plant on %{x}: %{z:.2f}<extra></extra>'
+    ))
+    fig.update_layout(
+        height=max(250, 40 * len(calendar_df) + 120),
+        margin=dict(l=20, r=20, t=30, b=20),
+        xaxis={'nticks': 12, 'tickfont': {'size': 12}},
+        yaxis={'tickfont': {'size': 13}, 'autorange': 'reversed'},
+    )
+    st_obj.plotly_chart(fig, use_container_width=True)
+    st_obj.caption("Average suitability over each crop's establishment period, by planting day (archived weather).")
+
 def get_image_as_base64(path):
     """Encodes an image file to a Base64 string for embedding in HTML."""
     try:
@@ -0,0 +1,10 @@
+# Representative city per state/region offered in the dashboard's location picker
+CITY_COORDINATES = {
+    "Pathein (Ayeyarwady)": {"lat": 16.78, "lon": 94.73}, "Bago": {"lat": 17.34, "lon": 96.48},
+    "Hakha (Chin)": {"lat": 22.64, "lon": 93.61}, "Loikaw (Kayah)": {"lat": 19.67, "lon": 97.21},
+    "Hpa-an (Kayin)": {"lat": 16.89, "lon": 97.63}, "Magway": {"lat": 20.15, "lon": 94.95},
+    "Mandalay": {"lat": 21.96, "lon": 96.09}, "Mawlamyine (Mon)": {"lat": 16.49, "lon": 97.63},
+    "Naypyidaw": {"lat": 19.76, "lon": 96.08}, "Sittwe (Rakhine)": {"lat": 20.14, "lon": 92.90},
+    "Sagaing": {"lat": 21.88, "lon": 95.98}, "Taunggyi (Shan)": {"lat": 20.78, "lon": 97.03},
+    "Dawei (Tanintharyi)": {"lat": 14.08, "lon": 98.20}, "Yangon": {"lat": 16.87, "lon": 96.19}
+}
@@ -1,79 +1,177 @@
+import os
 import pandas as pd
 import numpy as np
+from datetime import datetime, timedelta
 from sklearn.ensemble import RandomForestRegressor
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence
+
+from src.utils.model_store import ModelStore, fingerprint_frame
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEATURES = ['crop_code', 'region_code', 'temperature', 'humidity', 'rainfall', 'month']
+CLIMATE_COLUMNS = ['temperature', 'humidity', 'rainfall']
+# Bump when the features or forest settings change, so cached artifacts are retrained
+MARKET_MODEL_VERSION = 'rf-shared-v2'
+
+# Trained forests (with their encoders and lookup tables), keyed by region filter and data hash
+MARKET_MODEL_STORE = ModelStore(os.path.join(PROJECT_ROOT, 'data', 'models', 'market_rf'), serializer='joblib')
+
+EMPTY_TREND = {'current_price': 0, 'predicted_trend': 0, 'confidence': 0}
+
 
 class MarketPricePredictor:
-    def __init__(self):
-        self.models = {}
+    """
+    One RandomForestRegressor shared by all crops (and regions), with crop and region
+    as encoded features. Expected columns: region, crop, temperature, humidity,
+    rainfall, month, price.
+    """
+
+    def __init__(self, model_store: Optional[ModelStore] = None, n_jobs: int = -1):
+        self.models = {}  # crop -> shared artifact, kept for callers checking trained crops
+        self.artifact: Optional[Dict[str, Any]] = None
         self.data_path = None
+        self.model_store = model_store or MARKET_MODEL_STORE
+        self.n_jobs = n_jobs
 
     def set_data_path(self, path: str):
         self.data_path = path
 
-    def train_all_models(self, data_path: str, region: str):
-        """Train models for all crops in the specified region"""
+    def _fit(self, df: pd.DataFrame) -> Dict[str, Any]:
+        crops = sorted(df['crop_key'].unique())
+        regions = sorted(df['region_key'].unique())
+        X = self._encode(df, crops, regions)
+
+        model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=self.n_jobs,
+                                      oob_score=len(df) >= 20)
+        model.fit(X, df['price'].to_numpy(dtype=float))
+
+        # Most recent observation per series: by date (or year and month) when the data has
+        # one, otherwise the last row in file order; mergesort keeps ties in file order
+        if 'date' in df.columns:
+            ordered = df.assign(_when=pd.to_datetime(df['date'], errors='coerce')).sort_values('_when', kind='mergesort')
+        elif 'year' in df.columns:
+            ordered = df.sort_values(['year', 'month'], kind='mergesort')
+        else:
+            ordered = df
+        latest = ordered.groupby(['region_key', 'crop_key'])['price'].last()
+        return {
+            'model': model,
+            'crops': crops,
+            'regions': regions,
+            # Typical weather per (region, month) and per month, to build future feature rows
+            'climate': df.groupby(['region_key', 'month'])[CLIMATE_COLUMNS].mean(),
+            'climate_by_month': df.groupby('month')[CLIMATE_COLUMNS].mean(),
+            'latest_price': latest.to_dict(),
+            'confidence': float(np.clip(model.oob_score_, 0, 1)) if hasattr(model, 'oob_score_') else 0.5,
+        }
+
+    @staticmethod
+    def _encode(df: pd.DataFrame, crops: List[str], regions: List[str]) -> np.ndarray:
+        crop_code = pd.Categorical(df['crop_key'], categories=crops).codes
+        region_code = pd.Categorical(df['region_key'], categories=regions).codes
+        return np.column_stack([crop_code, region_code, df[CLIMATE_COLUMNS + ['month']].to_numpy(dtype=float)])
+
+    def train_all_models(self, data_path: str, region: Optional[str] = None):
+        """
+        Train the shared model for all crops (optionally for one region only).
+
+        The fitted artifact is cached on disk per (region filter, data hash), so a
+        restart with unchanged data only loads it.
+        """
         try:
+            self.set_data_path(data_path)
             # Load market data
             df = pd.read_csv(data_path)
-            
+            df = df.dropna(subset=['region', 'crop', 'price'])
+            df['region_key'] = df['region'].str.strip().str.lower()
+            df['crop_key'] = df['crop'].str.strip().str.lower()
+
             # Filter by region
-            region_df = df[df['region'].str.lower() == region.lower()]
-            
-            # Get unique crops
-            crops = region_df['crop'].unique()
-            
-            # Train model for each crop
-            for crop in crops:
-                crop_df = region_df[region_df['crop'] == crop]
-                
-                # Create features and target
-                X = crop_df[['temperature', 'humidity', 'rainfall', 'month']].values
-                y = crop_df['price'].values
-                
-                # Train model
-                model = RandomForestRegressor(n_estimators=100, random_state=42)
-                model.fit(X, y)
-                
-                # Store model
-                self.models[crop.lower()] = model
-                
+            if region:
+                df = df[df['region_key'] == region.strip().lower()]
+            if df.empty:
+                print(f"No market data to train on for region: {region}")
+                return False
+
+            key = f"market_rf_{(region or 'all').strip().lower()}"
+            order_columns = [c for c in ('date', 'year') if c in df.columns]  # decide the latest price
+            fingerprint = fingerprint_frame(df[['region_key', 'crop_key', 'month', 'price'] + CLIMATE_COLUMNS + order_columns],
+                                            salt=MARKET_MODEL_VERSION)
+            self.artifact, _ = self.model_store.get_or_fit(key, fingerprint, lambda: self._fit(df),
+                                                        extra={'region': region or 'all', 'rows': len(df)})
+            self.models = {crop: self.artifact for crop in self.artifact['crops']}
             return True
-            
+
         except Exception as e:
             print(f"Error training models: {str(e)}")
             return False
 
+    def get_price_trends(self, crops: Sequence[str], horizons: Sequence[int] = (30,),
+                         region: Optional[str] = None, today: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Predicted price trends for every (crop, horizon) pair with one predict call.
+
+        For each pair the model is evaluated at the current month and at the month
+        `horizon` days ahead, using the typical weather of those months in the region.
+
+        Returns:
+            DataFrame with crop, horizon_days, current_price, predicted_price,
+            predicted_trend and confidence (rows for unknown crops, or all rows for
+            a region the model was not trained on, are zero). Without `region`
+            the model's region is used if it was trained on a single one.
+        """
+        today = today or datetime.now()
+        pairs = pd.DataFrame([(crop, int(h)) for crop in crops for h in horizons], columns=['crop', 'horizon_days'])
+        result = pairs.assign(current_price=0.0, predicted_price=0.0, predicted_trend=0.0, confidence=0.0)
+        if self.artifact is None or pairs.empty:
+            return result
+
+        artifact = self.artifact
+        region_key = (region or '').strip().lower()
+        if not region_key and len(artifact['regions']) == 1:
+            region_key = artifact['regions'][0]
+        if region_key not in artifact['regions']:
+            return result
+        crop_keys = pairs['crop'].str.strip().str.lower()
+        known = crop_keys.isin(artifact['crops']).to_numpy()
+        if not known.any():
+            return result
+
+        target_months = np.array([(today + timedelta(days=int(h))).month for h in pairs['horizon_days']])
+        months = np.concatenate([np.full(known.sum(), today.month), target_months[known]])
+        rows = pd.DataFrame({
+            'crop_key': np.tile(crop_keys[known].to_numpy(), 2),
+            'region_key': region_key,
+            'month': months,
+        })
+        climate = artifact['climate'].reindex(pd.MultiIndex.from_arrays([rows['region_key'], rows['month']]))
+        fallback = artifact['climate_by_month'].reindex(rows['month'])
+        climate = climate.fillna(pd.DataFrame(fallback.to_numpy(), index=climate.index, columns=CLIMATE_COLUMNS))
+        rows[CLIMATE_COLUMNS] = climate.fillna(climate.mean()).fillna(0).to_numpy()
+
+        predictions = artifact['model'].predict(self._encode(rows, artifact['crops'], artifact['regions']))
+        now, future = np.split(predictions, 2)
+
+        current = np.array([artifact['latest_price'].get((region_key, c), np.nan) for c in crop_keys[known]])
+        current = np.where(np.isnan(current), now, current)
+        result.loc[known, 'current_price'] = current
+        result.loc[known, 'predicted_price'] = future
+        result.loc[known, 'predicted_trend'] = (future - now) / np.where(now != 0, now, np.nan)
+        result.loc[known, 'confidence'] = artifact['confidence']
+        return result.fillna({'predicted_trend': 0.0})
+
     def get_price_trend(self, crop: str, days_ahead: int, region: str) -> Dict[str, Any]:
         """Get price trend prediction for a specific crop"""
         try:
-            # Get model for the crop
-            model = self.models.get(crop.lower())
-            if not model:
-                return {
-                    'current_price': 0,
-                    'predicted_trend': 0,
-                    'confidence': 0
-                }
-
-            # Generate features for prediction
-            # For demonstration, using random values
-            current_price = np.random.uniform(100, 500)
-            
-            # Generate random trend (should be based on actual data)
-            predicted_trend = np.random.uniform(-0.1, 0.1)
-            confidence = np.random.uniform(0.6, 0.9)
-
+            if crop.lower() not in self.models:
+                return dict(EMPTY_TREND)
+            row = self.get_price_trends([crop], [days_ahead], region).iloc[0]
             return {
-                'current_price': current_price,
-                'predicted_trend': predicted_trend,
-                'confidence': confidence
+                'current_price': float(row['current_price']),
+                'predicted_trend': float(row['predicted_trend']),
+                'confidence': float(row['confidence'])
             }
-            
+
         except Exception as e:
             print(f"Error getting price trend: {str(e)}")
-            return {
-                'current_price': 0,
-                'predicted_trend': 0,
-                'confidence': 0
-            }
+            return dict(EMPTY_TREND)
@@ -0,0 +1,151 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.market.price_stats import get_price_stats
+from src.market.price_store import MarketPriceStore, get_price_store
+
+# Display column -> source column of the price statistics history
+DISPLAY_COLUMNS = {
+    'Date': 'date',
+    'Region': 'region',
+    'Crop': 'crop_name',
+    'Price (MMK/kg)': 'price_per_kg',
+    'Change (MMK/kg)': 'change',
+    'Change (%)': 'pct_change',
+    '3-Period Avg (MMK/kg)': 'rolling_mean',
+}
+SORT_COLUMNS = list(DISPLAY_COLUMNS)
+DEFAULT_PAGE_SIZE = 50
+
+# Filtered and sorted views, keyed by (path, version, filters, sort); paging only slices them
+_VIEW_CACHE_SIZE = 32
+_tables: Dict[Tuple[str, int], pd.DataFrame] = {}
+_views: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+_csv: "OrderedDict[Tuple, bytes]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def format_market_table(history: pd.DataFrame) -> pd.DataFrame:
+    """Display frame (DISPLAY_COLUMNS) from the price statistics history, newest first."""
+    table = pd.DataFrame({name: history[col] for name, col in DISPLAY_COLUMNS.items()})
+    table['Region'] = table['Region'].str.replace('_', ' ').str.title()
+    table['Change (%)'] = (table['Change (%)'] * 100).round(1)
+    table['3-Period Avg (MMK/kg)'] = table['3-Period Avg (MMK/kg)'].round(1)
+    table = table.sort_values(['Date', 'Region', 'Crop'], ascending=[False, True, True], kind='mergesort')
+    table['Date'] = table['Date'].dt.strftime('%Y-%m-%d')  # ISO strings still sort chronologically
+    return table.reset_index(drop=True)
+
+
+def get_market_table(store: Optional[MarketPriceStore] = None) -> pd.DataFrame:
+    """Formatted table of every price observation, rebuilt only when the price data changes."""
+    store = store or get_price_store()
+    key = (store.path, store.version)
+    with _lock:
+        table = _tables.get(key)
+    if table is not None:
+        return table
+
+    table = format_market_table(get_price_stats(store)['history'])
+    with _lock:
+        for old_key in [k for k in _tables if k[0] == store.path]:
+            del _tables[old_key]
+        for cache in (_views, _csv):
+            for old_key in [k for k in cache if k[0] == store.path and k[1] != store.version]:
+                del cache[old_key]
+        _tables[key] = table
+    return table
+
+
+def _filtered_view(store: MarketPriceStore, region: Optional[str], crop: Optional[str], search: str,
+                   sort_by: str, ascending: bool) -> pd.DataFrame:
+    key = (store.path, store.version, region, crop, search, sort_by, ascending)
+    with _lock:
+        view = _views.get(key)
+        if view is not None:
+            _views.move_to_end(key)
+            return view
+
+    table = get_market_table(store)
+    mask = np.ones(len(table), dtype=bool)
+    if region:
+        mask &= (table['Region'] == region).to_numpy()
+    if crop:
+        mask &= (table['Crop'] == crop).to_numpy()
+    if search:
+        mask &= table['Crop'].str.contains(search, case=False, regex=False).to_numpy()
+    view = table[mask]
+    # The base table is already newest first
+    if sort_by in SORT_COLUMNS and (sort_by, ascending) != ('Date', False):
+        view = view.sort_values(sort_by, ascending=ascending, kind='mergesort', na_position='last')
+    view = view.reset_index(drop=True)
+
+    with _lock:
+        _views[key] = view
+        while len(_views) > _VIEW_CACHE_SIZE:
+            _views.popitem(last=False)
+    return view
+
+
+def query_market_table(region: Optional[str] = None, crop: Optional[str] = None, search: str = '',
+                       sort_by: str = 'Date', ascending: bool = False, page: int = 1,
+                       page_size: int = DEFAULT_PAGE_SIZE, store: Optional[MarketPriceStore] = None) -> Dict:
+    """
+    One page of the market table after filtering and sorting.
+
+    Args:
+        region: Display region name (e.g. 'Yangon') or None for all
+        crop: Exact crop name or None for all
+        search: Case-insensitive substring of the crop name
+        sort_by: One of SORT_COLUMNS
+        ascending: Sort order
+        page: 1-based page number (clipped to the available pages)
+        page_size: Rows per page
+
+    Returns:
+        Dictionary with 'rows' (the page), 'total_rows', 'page', 'pages' and 'view'
+        (the whole filtered, sorted frame, e.g. for a download; shared, do not modify)
+    """
+    store = store or get_price_store()
+    view = _filtered_view(store, region or None, crop or None, search.strip(), sort_by, ascending)
+    page_size = max(1, int(page_size))
+    pages = max(1, -(-len(view) // page_size))
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * page_size
+    return {
+        'rows': view.iloc[start:start + page_size],
+        'total_rows': len(view),
+        'page': page,
+        'pages': pages,
+        'view': view,
+    }
+
+
+def market_table_csv(region: Optional[str] = None, crop: Optional[str] = None, search: str = '',
+                     sort_by: str = 'Date', ascending: bool = False,
+                     store: Optional[MarketPriceStore] = None) -> bytes:
+    """The filtered, sorted table as UTF-8 CSV, encoded once per data version and filter."""
+    store = store or get_price_store()
+    region, crop, search = region or None, crop or None, search.strip()
+    key = (store.path, store.version, region, crop, search, sort_by, ascending)
+    with _lock:
+        data = _csv.get(key)
+    if data is None:
+        data = _filtered_view(store, region, crop, search, sort_by, ascending).to_csv(index=False).encode('utf-8')
+        with _lock:
+            _csv[key] = data
+            while len(_csv) > _VIEW_CACHE_SIZE:
+                _csv.popitem(last=False)
+    return data
+
+
+def market_filter_options(store: Optional[MarketPriceStore] = None) -> Dict[str, List[str]]:
+    """Region and crop choices for the table filters."""
+    table = get_market_table(store)
+    return {
+        'regions': sorted(table['Region'].unique()),
+        'crops': sorted(table['Crop'].unique()),
+    }
@@ -2,6 +2,9 @@ import json
 import os
 import pandas as pd
 
+from app.data.city_coordinates import CITY_COORDINATES
+from src.utils.geo import build_haversine_tree, query_nearest_km
+
 # Path to the data sources
 CROP_SETTINGS_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'crop_settings.json')
 MARKET_PRICES_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'crop_prices.csv')
@@ -30,6 +33,23 @@ def load_market_prices(path):
 CROP_SETTINGS = load_json_data(CROP_SETTINGS_PATH)
 MARKET_PRICES = load_market_prices(MARKET_PRICES_PATH)
 
+# Cities that have crop settings, in a ball tree for nearest-city lookups
+_SETTINGS_CITIES = [name for name in CITY_COORDINATES if name in CROP_SETTINGS]
+_CITY_TREE = build_haversine_tree([CITY_COORDINATES[n]['lat'] for n in _SETTINGS_CITIES],
+                                  [CITY_COORDINATES[n]['lon'] for n in _SETTINGS_CITIES]) if _SETTINGS_CITIES else None
+
+def city_for_location(lat: float, lon: float):
+    """
+    The crop-settings city nearest to an arbitrary farm location.
+
+    Returns:
+        (city, distance_km), or (None, None) when no crop settings are loaded
+    """
+    if _CITY_TREE is None:
+        return None, None
+    distances, ids = query_nearest_km(_CITY_TREE, lat, lon, k=1)
+    return _SETTINGS_CITIES[ids[0][0]], float(distances[0][0])
+
 def recommend_crops(city: str, greenhouse_size: float, water_availability: float, fertilizer_type: str, weather_data: dict):
     """
     Recommends top crops with yield and profit predictions.
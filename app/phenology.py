@@ -0,0 +1,223 @@
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.planting_windows import CROP_TIMELINES_PATH, DAYS_IN_YEAR, crop_parameters
+from src.utils.agro_meteorology import growing_degree_days
+
+DEFAULT_BASE_C = 10.0
+DEFAULT_CAP_C = 30.0
+# Longest season simulated; the slowest perennials (rubber, tea) need decades of
+# archived weather otherwise
+MAX_SIMULATED_YEARS = 40
+
+
+def load_stage_table(crops: Sequence[str]) -> Tuple[List[List[str]], np.ndarray]:
+    """
+    Stage names and nominal durations from data/crop_timelines.json.
+
+    Returns:
+        (stage names per crop, durations in days of shape (crops, max_stages) padded with NaN)
+    """
+    try:
+        with open(CROP_TIMELINES_PATH, 'r', encoding='utf-8') as f:
+            timelines = {k.lower(): v for k, v in json.load(f).items()}
+    except (FileNotFoundError, json.JSONDecodeError):
+        timelines = {}
+
+    stages = [timelines.get(crop.strip().lower(), []) for crop in crops]
+    n_stages = max((len(s) for s in stages), default=0) or 1
+    durations = np.full((len(crops), n_stages), np.nan)
+    names = []
+    for i, crop_stages in enumerate(stages):
+        names.append([s['stage'] for s in crop_stages])
+        durations[i, :len(crop_stages)] = [s.get('duration', 0) for s in crop_stages]
+    return names, durations
+
+
+def thermal_requirements(crops: Sequence[str], base_c: float = DEFAULT_BASE_C,
+                         cap_c: float = DEFAULT_CAP_C) -> Tuple[List[List[str]], np.ndarray, np.ndarray]:
+    """
+    Convert stage durations to growing degree day requirements.
+
+    The nominal durations are taken to hold at the crop's optimal temperature (middle of
+    its optimal range in the crop catalog), so a stage needs duration × GDD-per-day at
+    that temperature. Cooler weather then stretches a stage, warmer weather shortens it.
+
+    Returns:
+        (stage names, durations (crops, stages), GDD requirements (crops, stages))
+    """
+    names, durations = load_stage_table(crops)
+    params = crop_parameters(crops)
+    optimal = (params['temp_lo'].to_numpy(dtype=float) + params['temp_hi'].to_numpy(dtype=float)) / 2
+    gdd_per_day = np.maximum(np.clip(optimal, base_c, cap_c) - base_c, 1.0)
+    return names, durations, durations * gdd_per_day[:, None]
+
+
+def _continuous_daily(history: pd.DataFrame) -> pd.DataFrame:
+    """Daily temp_max/temp_min on an unbroken date range, with gaps interpolated."""
+    daily = history.assign(ds=pd.to_datetime(history['ds']).dt.normalize()).groupby('ds')[['temp_max', 'temp_min']].mean()
+    daily = daily.reindex(pd.date_range(daily.index.min(), daily.index.max(), freq='D'))
+    return daily.interpolate(limit_direction='both')
+
+
+def simulate_phenology(history: pd.DataFrame, crops: Sequence[str], base_c: float = DEFAULT_BASE_C,
+                       cap_c: float = DEFAULT_CAP_C) -> Dict:
+    """
+    Simulate stage completion for every crop, planting day of year and archived year.
+
+    Cumulative GDD over the whole archive is computed once; the end of each stage for
+    a planting on day p is the first day whose cumulative GDD exceeds C[p] plus the
+    stage's cumulative requirement, found with one searchsorted call for the whole
+    crop × planting day × stage grid. Seasons that run past the end of the archive
+    continue into its earliest years (the archive is tiled).
+
+    Args:
+        history: Daily weather with columns ds, temp_max, temp_min (only read)
+        crops: Crop names
+        base_c: Base temperature for GDD
+        cap_c: Temperature above which development does not speed up further
+
+    Returns:
+        Dictionary with 'crops', 'stages' (names per crop), 'nominal_days' (crops, stages),
+        'years', and 'stage_end_days' of shape (crops, 366, years, stages): days after
+        planting at which each stage ends (NaN for missing stages or planting days
+        outside the archive)
+    """
+    crops = list(crops)
+    names, durations, requirements = thermal_requirements(crops, base_c, cap_c)
+    daily = _continuous_daily(history)
+    gdd = growing_degree_days(daily['temp_max'].to_numpy(), daily['temp_min'].to_numpy(), base_c, cap_c)
+    n_days = len(gdd)
+
+    # Cumulative requirement at the end of each stage; padded stages stay NaN
+    thresholds = np.cumsum(np.nan_to_num(requirements), axis=1)
+    thresholds[np.isnan(requirements)] = np.nan
+
+    # Tile the archive until the slowest crop can finish from the last planting day
+    mean_gdd = max(float(np.mean(gdd)), 0.1)
+    slowest = np.nanmax(thresholds) if np.isfinite(thresholds).any() else 0.0  # no crop with stages
+    needed_days = min(slowest / mean_gdd * 1.5, MAX_SIMULATED_YEARS * 365)
+    tiles = int(np.ceil(needed_days / n_days)) + 1
+    cumulative = np.concatenate([[0.0], np.cumsum(np.tile(gdd, tiles))])
+
+    plant_idx = np.arange(n_days)
+    targets = cumulative[plant_idx][None, :, None] + thresholds[:, None, :]  # (crops, days, stages)
+    valid = ~np.isnan(targets)
+    end_idx = np.searchsorted(cumulative, np.where(valid, targets, np.inf).ravel(), side='left').reshape(targets.shape)
+    days_after = (end_idx - plant_idx[None, :, None]).astype(float)
+    days_after[~valid | (end_idx >= len(cumulative))] = np.nan
+
+    dates = daily.index
+    years = np.unique(dates.year)
+    year_pos = np.searchsorted(years, dates.year)
+    doy_pos = dates.dayofyear.to_numpy() - 1
+
+    cube = np.full((len(crops), DAYS_IN_YEAR, len(years), durations.shape[1]), np.nan)
+    cube[:, doy_pos, year_pos, :] = days_after
+
+    return {
+        'crops': crops,
+        'stages': names,
+        'nominal_days': durations,
+        'years': years.tolist(),
+        'stage_end_days': cube,
+        'base_c': base_c,
+        'cap_c': cap_c,
+    }
+
+
+def _crop_index(simulation: Dict, crop: str) -> int:
+    lookup = {c.strip().lower(): i for i, c in enumerate(simulation['crops'])}
+    key = crop.strip().lower()
+    if key not in lookup:
+        raise KeyError(f"Crop '{crop}' was not simulated")
+    return lookup[key]
+
+
+def stage_date_distribution(simulation: Dict, crop: str, planting_date: datetime,
+                            quantiles: Sequence[float] = (0.1, 0.5, 0.9)) -> pd.DataFrame:
+    """
+    Spread of stage start and end dates over the archived years for one planting date.
+
+    Returns:
+        DataFrame with one row per stage: stage, nominal_days, mean_days (stage length),
+        and start_pXX / end_pXX dates for each quantile
+    """
+    c = _crop_index(simulation, crop)
+    stages = simulation['stages'][c]
+    ends = simulation['stage_end_days'][c, planting_date.timetuple().tm_yday - 1, :, :len(stages)]  # (years, stages)
+    starts = np.concatenate([np.zeros((ends.shape[0], 1)), ends[:, :-1]], axis=1)
+
+    table = pd.DataFrame({
+        'stage': stages,
+        'nominal_days': simulation['nominal_days'][c, :len(stages)].astype(int),
+        'mean_days': np.round(np.nanmean(ends - starts, axis=0), 1) if len(stages) else [],
+    })
+    for label, values in (('start', starts), ('end', ends)):
+        for q in quantiles:
+            offsets = np.nanquantile(values, q, axis=0)
+            table[f"{label}_p{int(round(q * 100))}"] = [
+                planting_date + timedelta(days=int(round(d))) if not np.isnan(d) else pd.NaT for d in offsets
+            ]
+    return table
+
+
+def harvest_date_distribution(simulation: Dict, crop: str, planting_date: datetime,
+                              quantiles: Sequence[float] = (0.1, 0.5, 0.9)) -> Dict:
+    """
+    Harvest (end of the last stage) dates over the archived years for one planting date.
+
+    Returns:
+        Dictionary with the nominal and simulated days to harvest and the harvest date
+        at each quantile (keys 'p10', 'p50', ...)
+    """
+    c = _crop_index(simulation, crop)
+    n_stages = len(simulation['stages'][c])
+    if n_stages == 0:
+        return {'crop': crop, 'planting_date': planting_date, 'nominal_days': 0, 'years': 0, 'harvest_dates': {}}
+    days = simulation['stage_end_days'][c, planting_date.timetuple().tm_yday - 1, :, n_stages - 1]
+    days = days[~np.isnan(days)]
+    result = {
+        'crop': crop,
+        'planting_date': planting_date,
+        'nominal_days': int(np.nansum(simulation['nominal_days'][c])),
+        'years': int(len(days)),
+        'harvest_dates': {},
+    }
+    if len(days):
+        result.update({
+            'mean_days': round(float(days.mean()), 1),
+            'min_days': int(days.min()),
+            'max_days': int(days.max()),
+        })
+        result['harvest_dates'] = {
+            f"p{int(round(q * 100))}": planting_date + timedelta(days=int(round(np.quantile(days, q)))) for q in quantiles
+        }
+    return result
+
+
+if __name__ == "__main__":
+    import time
+    from app.planting_windows import load_crop_catalog
+    from src.data_collection.historical_weather import fetch_historical_weather
+    from src.data_collection.mock_open_meteo import start_mock_server
+
+    server = start_mock_server()
+    try:
+        history = fetch_historical_weather(21.97, 96.08, '2019-01-01', '2023-12-31', base_url=server.base_url)
+    finally:
+        server.stop()
+
+    crops = list(load_crop_catalog()['crop_name'])
+    started = time.perf_counter()
+    sim = simulate_phenology(history, crops)
+    elapsed = time.perf_counter() - started
+    print(f"{len(crops)} crops × {DAYS_IN_YEAR} planting days × {len(sim['years'])} years "
+          f"in {elapsed * 1000:.0f} ms, cube {sim['stage_end_days'].shape}")
+
+    planting = datetime(datetime.now().year, 6, 1)
+    print(stage_date_distribution(sim, 'Tomato', planting).to_string(index=False))
+    print(harvest_date_distribution(sim, 'Tomato', planting))
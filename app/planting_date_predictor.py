@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 from prophet import Prophet
 from datetime import datetime, timedelta
@@ -6,9 +7,26 @@ from typing import Dict, List, Optional
 import requests
 from typing import Optional
 from app.crop_info import CropInfo
+from app.phenology import harvest_date_distribution, simulate_phenology
+from app.planting_windows import daily_suitability, find_planting_windows, planting_calendar
+from app.seasonal_harmonics import seasonal_peak
+from src.data_collection.weather import resolve_open_meteo_url
+from src.utils.model_store import ModelStore, fingerprint_frame
+
+HISTORICAL_API_URL = 'https://archive-api.open-meteo.com/v1/archive'
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Bump when the model configuration or feature preparation changes, so stored models are refitted
+PLANTING_MODEL_VERSION = 'prophet-v2'
+WEATHER_COLUMNS = ['ds', 'temp_max', 'temp_min', 'rainfall', 'humidity']
+
+# Shared by all predictor instances, so each location/history is fitted once and then reloaded
+PLANTING_MODEL_STORE = ModelStore(os.path.join(PROJECT_ROOT, 'data', 'models', 'planting'), serializer='prophet')
 
 class PlantingDatePredictor:
-    def __init__(self, latitude: float, longitude: float, historical_weather_df: Optional[pd.DataFrame] = None):
+    def __init__(self, latitude: float, longitude: float, historical_weather_df: Optional[pd.DataFrame] = None,
+                 base_url: Optional[str] = None, model_store: Optional[ModelStore] = None,
+                 fit_prophet: bool = True):
         """
         Initialize the planting date predictor.
 
@@ -16,12 +34,25 @@ class PlantingDatePredictor:
             latitude: Latitude of the region
             longitude: Longitude of the region
             historical_weather_df: DataFrame containing historical weather data
-                Expected columns: ds (date), temp_max, temp_min, rainfall, humidity
+                Expected columns: ds (date), temp_max, temp_min, rainfall, humidity.
+                It is never modified, so one frame can be shared between predictors
+            base_url: Optional Open-Meteo host override (e.g. the local mock server)
+            model_store: Where fitted models are persisted; defaults to the shared
+                data/models/planting store
+            fit_prophet: Set to False when only the harmonic seasonal engine is needed
         """
         self.model = None
+        self.model_crop = None  # crop `model` was trained for
         self.latitude = latitude
         self.longitude = longitude
         self.historical_data = None
+        self.base_url = base_url
+        self.model_store = model_store or PLANTING_MODEL_STORE
+        # 'fit', 'disk' or 'memory', and the seconds it took
+        self.model_source = None
+        self.model_seconds = None
+        # Training means of the Prophet regressors, used to build future frames
+        self.regressor_means: Dict[str, float] = {}
         self.crop_info = CropInfo()
 
         if historical_weather_df is not None:
@@ -29,7 +60,7 @@ class PlantingDatePredictor:
         else:
             self._fetch_historical_weather()
 
-        if self.historical_data is not None and not self.historical_data.empty:
+        if fit_prophet and self.historical_data is not None and not self.historical_data.empty:
             self._train_model()
 
     def _fetch_historical_weather(self):
@@ -38,7 +69,7 @@ class PlantingDatePredictor:
             start_date = end_date - timedelta(days=365)
             start_date_str = start_date.strftime('%Y-%m-%d')
             end_date_str = end_date.strftime('%Y-%m-%d')
-            url = f'https://archive-api.open-meteo.com/v1/archive'
+            url = resolve_open_meteo_url(HISTORICAL_API_URL, self.base_url)
             params = {
                 'latitude': self.latitude,
                 'longitude': self.longitude,
@@ -110,56 +141,74 @@ class PlantingDatePredictor:
     def _prepare_data(self, crop: str) -> pd.DataFrame:
         """
         Prepare data for Prophet model by adding crop-specific features.
+
+        Returns a new frame (ds, y and the Prophet regressors); self.historical_data
+        is only read, so one history can be shared between predictors and threads.
         """
-        # Add crop-specific features
-        if crop.lower() == 'tomato':
-            optimal_temp = 25
-            optimal_rain = 200
-        elif crop.lower() == 'cucumber':
-            optimal_temp = 28
-            optimal_rain = 150
-        else:
-            optimal_temp = 25
-            optimal_rain = 175
-
-        # Create features that indicate how close we are to optimal conditions
-        self.historical_data['temp_score'] = 1 - abs(self.historical_data['temp_max'] - optimal_temp) / 10
-        self.historical_data['rain_score'] = 1 - abs(self.historical_data['rainfall'] - optimal_rain) / 100
-
-        # Create a planting suitability score
-        self.historical_data['planting_score'] = (
-            0.4 * self.historical_data['temp_score'] +
-            0.4 * self.historical_data['rain_score'] +
-            0.2 * (1 - abs(self.historical_data['humidity'] - 70) / 30)
-        )
+        return self.suitability_frame([crop])[crop]
+
+    def suitability_frame(self, crops: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Daily suitability of the archived weather for several crops, scored in one
+        broadcast (crops × days) pass with each crop's catalog parameters.
 
-        # Create a DataFrame for Prophet
-        df = self.historical_data.copy()
-        df['y'] = df['planting_score']
-        return df
+        Returns:
+            Mapping of crop to a DataFrame with ds, temp_score, rain_score, humidity
+            and y (the combined planting score)
+        """
+        history = self.historical_data
+        scores = daily_suitability(history, crops)
+        frames = {}
+        for i, crop in enumerate(crops):
+            frames[crop] = pd.DataFrame({
+                'ds': history['ds'].to_numpy(),
+                'temp_score': scores['temp'][i],
+                'rain_score': scores['rain'][i],
+                'humidity': history['humidity'].to_numpy(dtype=float),
+                'y': scores['suitability'][i],
+            })
+        return frames
 
-    def _train_model(self):
-        """Train the Prophet model."""
+    def _train_model(self, crop: str = 'tomato'):
+        """
+        Load the Prophet model for this location, history and crop, fitting it only
+        if the store has none. The constructor trains the default (tomato) model;
+        get_seasonal_pattern switches to the model of the crop it is asked about.
+        """
         if self.historical_data is None:
             raise ValueError("Historical data not provided")
 
+        fingerprint = fingerprint_frame(self.historical_data, WEATHER_COLUMNS, salt=PLANTING_MODEL_VERSION)
+        key = f"{self.latitude:.4f}_{self.longitude:.4f}_{crop.strip().lower()}"
+
         # Prepare data
-        df = self._prepare_data('tomato')  # Start with tomato as default
+        df = self._prepare_data(crop)
+        self.regressor_means = df[['temp_score', 'rain_score', 'humidity']].mean().to_dict()
+
+        self.model, access = self.model_store.get_or_fit(
+            key, fingerprint, lambda: self._fit_model(df),
+            extra={'latitude': self.latitude, 'longitude': self.longitude, 'crop': crop, 'rows': len(df)}
+        )
+        self.model_crop = crop.strip().lower()
+        self.model_source = access['source']
+        self.model_seconds = access['seconds']
 
-        # Initialize and fit Prophet model
-        self.model = Prophet(
+    def _fit_model(self, df: pd.DataFrame) -> Prophet:
+        """Fit a fresh Prophet model on prepared data."""
+        model = Prophet(
             yearly_seasonality=True,
             weekly_seasonality=True,
             changepoint_prior_scale=0.1
         )
 
         # Add additional regressors
-        self.model.add_regressor('temp_score')
-        self.model.add_regressor('rain_score')
-        self.model.add_regressor('humidity')
+        model.add_regressor('temp_score')
+        model.add_regressor('rain_score')
+        model.add_regressor('humidity')
 
         # Fit the model
-        self.model.fit(df)
+        model.fit(df)
+        return model
 
     def predict_planting_dates(self, crop: str, region: str, num_dates: int = 3) -> List[Dict]:
         """
@@ -173,66 +222,82 @@ class PlantingDatePredictor:
         Returns:
             List of dictionaries containing predicted planting dates and scores
         """
-        # Since we don't have enough historical weather and crop data,
-        # we'll generate random planting dates in the near future
-
-        # Get current date
-        current_date = datetime.now()
-
-        # Generate random dates within the next 3 months
-        results = []
-        for i in range(num_dates):
-            # Random days between 7 and 90 days from now
-            random_days = np.random.randint(7, 90)
-            future_date = current_date + timedelta(days=random_days)
-
-            # Format the date
-            results.append({
-                'date': future_date,  # Store as datetime object
-                'score': float(0.7 + np.random.random() * 0.3),  # Random score between 0.7 and 1.0
-                'confidence': float(0.8),
-                'region': region,
-                'crop': crop
-            })
+        return self.predict_planting_dates_for_crops([crop], region, num_dates).get(crop, [])
 
-        # Sort by date
-        results.sort(key=lambda x: x['date'])
+    def predict_planting_dates_for_crops(self, crops: List[str], region: str, num_dates: int = 3) -> Dict[str, List[Dict]]:
+        """
+        Best planting windows for several crops at once, from the day-of-year climatology
+        of the archived weather (see app.planting_windows).
 
+        Returns:
+            Mapping of crop to its windows sorted by date; each has 'date' (window start),
+            'end_date', 'score', 'confidence', 'region' and 'crop'
+        """
+        if self.historical_data is None or self.historical_data.empty:
+            return {crop: [] for crop in crops}
+
+        windows = find_planting_windows(self.historical_data, crops, top_k=num_dates)
+        results = {}
+        for crop in crops:
+            dates = [{
+                'date': w['start'],
+                'end_date': w['end'],
+                'score': w['score'],
+                'confidence': w['confidence'],
+                'region': region,
+                'crop': crop
+            } for w in windows.get(crop, [])]
+            # Sort by date
+            dates.sort(key=lambda x: x['date'])
+            results[crop] = dates
         return results
 
-    def get_seasonal_pattern(self, crop: str) -> Dict:
+    def get_planting_calendar(self, crops: List[str]) -> pd.DataFrame:
+        """Crops × day-of-year suitability table for the dashboard heatmap (empty without history)."""
+        if self.historical_data is None or self.historical_data.empty:
+            return pd.DataFrame()
+        return planting_calendar(self.historical_data, crops)
+
+    def get_seasonal_pattern(self, crop: str, engine: str = 'prophet') -> Dict:
         """
         Get the seasonal planting pattern for a crop.
 
+        Args:
+            crop: Name of the crop
+            engine: 'prophet' to use the yearly component of the fitted Prophet model,
+                or 'harmonic' for a least-squares Fourier fit (milliseconds, no Prophet needed)
+
         Returns:
             Dictionary containing seasonal planting information
         """
+        if engine not in ('prophet', 'harmonic'):
+            raise ValueError(f"Unknown seasonal engine: {engine}")
+        if engine == 'harmonic':
+            return self._get_harmonic_seasonal_pattern(crop)
+
         try:
-            if self.model is None or self.historical_data is None or self.historical_data.empty:
-                print("Warning: Model or historical data not available for seasonal pattern analysis.")
+            if self.historical_data is None or self.historical_data.empty:
+                print("Warning: Historical data not available for seasonal pattern analysis.")
                 return {
                     'best_period': "Not available",
                     'peak_season_start': "N/A",
                     'peak_season_end': "N/A",
                     'rationale': "Insufficient data for prediction."
                 }
-                
-            if self.model is None:
-                self._train_model()
+
+            # The model is crop-specific (the target is the crop's suitability score)
+            if self.model is None or self.model_crop != crop.strip().lower():
+                self._train_model(crop)
 
             # Get future predictions to extract seasonal components
             future = self.model.make_future_dataframe(periods=365)
 
             # Automatically add all regressors used during training
             # Prophet stores them in self.model.extra_regressors
-            if hasattr(self.model, 'extra_regressors') and self.historical_data is not None:
+            if hasattr(self.model, 'extra_regressors'):
                 for reg_name in self.model.extra_regressors:
-                    if reg_name in self.historical_data.columns:
-                        reg_mean = self.historical_data[reg_name].mean()
-                        future[reg_name] = reg_mean
-                    else:
-                        # If regressor missing in historical data, fill with 0
-                        future[reg_name] = 0
+                    # Means of the training features; 0 if a regressor is unknown
+                    future[reg_name] = self.regressor_means.get(reg_name, 0)
 
             forecast = self.model.predict(future)
 
@@ -266,7 +331,44 @@ class PlantingDatePredictor:
                 'rationale': "An error occurred during seasonal analysis."
             }
 
-def get_planting_date_recommendations(crop: str, region: str, latitude: float, longitude: float, historical_data: Optional[pd.DataFrame] = None) -> Dict:
+    def _get_harmonic_seasonal_pattern(self, crop: str) -> Dict:
+        """Seasonal pattern from a harmonic regression of the crop's daily suitability score."""
+        try:
+            if self.historical_data is None or self.historical_data.empty:
+                print("Warning: Historical data not available for seasonal pattern analysis.")
+                return {
+                    'best_period': "Not available",
+                    'peak_season_start': "N/A",
+                    'peak_season_end': "N/A",
+                    'rationale': "Insufficient data for prediction."
+                }
+
+            df = self._prepare_data(crop)
+            peak = seasonal_peak(df['ds'], df['y'])
+            best_date = peak['peak_date']
+
+            # Determine the best 2-month planting period
+            start_date = best_date - timedelta(days=30)
+            end_date = best_date + timedelta(days=30)
+
+            return {
+                'best_period': f"{start_date.strftime('%B')} to {end_date.strftime('%B')}",
+                'peak_season_start': start_date.strftime('%Y-%m-%d'),
+                'peak_season_end': end_date.strftime('%Y-%m-%d'),
+                'rationale': f"The optimal planting window is based on peak yearly climate patterns around {best_date.strftime('%B %d')}."
+            }
+
+        except Exception as e:
+            print(f"Error getting seasonal pattern: {e}")
+            return {
+                'best_period': "Error",
+                'peak_season_start': "N/A",
+                'peak_season_end': "N/A",
+                'rationale': "An error occurred during seasonal analysis."
+            }
+
+def get_planting_date_recommendations(crop: str, region: str, latitude: float, longitude: float, historical_data: Optional[pd.DataFrame] = None,
+                                      seasonal_engine: str = 'prophet') -> Dict:
     """
     Get planting date recommendations for a specific crop and region.
 
@@ -276,11 +378,15 @@ def get_planting_date_recommendations(crop: str, region: str, latitude: float, l
         latitude: Latitude of the region
         longitude: Longitude of the region
         historical_data: Optional historical weather data
+        seasonal_engine: 'prophet' or 'harmonic' (see PlantingDatePredictor.get_seasonal_pattern)
 
     Returns:
         Dictionary containing planting date recommendations
     """
-    predictor = PlantingDatePredictor(latitude=latitude, longitude=longitude, historical_weather_df=historical_data)
+    # get_seasonal_pattern trains (or loads) the Prophet model of `crop` itself, so the
+    # constructor must not fit its default crop first
+    predictor = PlantingDatePredictor(latitude=latitude, longitude=longitude, historical_weather_df=historical_data,
+                                      fit_prophet=False)
     crop_info = predictor.crop_info.get_crop_info(crop)
 
     try:
@@ -288,11 +394,12 @@ def get_planting_date_recommendations(crop: str, region: str, latitude: float, l
         planting_dates = predictor.predict_planting_dates(crop, region)
 
         # Get seasonal pattern
-        seasonal_pattern = predictor.get_seasonal_pattern(crop)
+        seasonal_pattern = predictor.get_seasonal_pattern(crop, engine=seasonal_engine)
 
         # Filter out past dates
-        current_date = datetime.now()
-        future_dates = [date for date in planting_dates if date['date'] >= current_date]
+        # Compare calendar dates: a window starting today is dated midnight, before now()
+        current_date = datetime.now().date()
+        future_dates = [date for date in planting_dates if date['date'].date() >= current_date]
 
         # If no future dates are available, use the next available date
         if not future_dates:
@@ -316,13 +423,28 @@ def get_planting_date_recommendations(crop: str, region: str, latitude: float, l
         else:
             recommendation = f"Best time to plant {crop} in {region} region is on {future_dates[0]['display_date']}."
 
+        # Harvest dates for the first window from the thermal-time simulation over the
+        # archived years, instead of the fixed stage durations
+        expected_harvest = {}
+        try:
+            simulation = simulate_phenology(predictor.historical_data, [crop])
+            expected_harvest = harvest_date_distribution(simulation, crop, future_dates[0]['date'])
+        except Exception as e:
+            print(f"Error simulating phenology for {crop}: {str(e)}")
+        harvest_dates = expected_harvest.get('harvest_dates', {})
+        if {'p10', 'p50', 'p90'} <= set(harvest_dates):
+            recommendation += (f" Planted then, it is expected to be ready around {harvest_dates['p50'].strftime('%B %d, %Y')}"
+                               f" ({harvest_dates['p10'].strftime('%b %d')} to {harvest_dates['p90'].strftime('%b %d')}"
+                               f" in {expected_harvest['years']} archived years).")
+
         return {
             'crop': crop,
             'region': region,
             'summary': crop_info.get('summary', 'No summary available.'),
             'water_usage': crop_info.get('water_usage', 'N/A'),
             'fertilizer': crop_info.get('fertilizer', 'N/A'),
-            'recommendation': recommendation
+            'recommendation': recommendation,
+            'expected_harvest': expected_harvest
         }
     except Exception as e:
         return {
@@ -0,0 +1,314 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CROP_SETTINGS_PATH = os.path.join(PROJECT_ROOT, 'data', 'crop_settings.json')
+CROP_TIMELINES_PATH = os.path.join(PROJECT_ROOT, 'data', 'crop_timelines.json')
+
+DAYS_IN_YEAR = 366  # day-of-year axis, 1..366
+
+# Used for crops missing from the catalog
+DEFAULT_CROP_PARAMS = {
+    'temp_lo': 20.0, 'temp_hi': 30.0,
+    'humidity_lo': 60.0, 'humidity_hi': 80.0,
+    'water_need_mm': 5.0,
+    'establishment_days': 21,
+}
+
+# Tolerances beyond the optimal range at which a factor's score reaches 0
+TEMP_TOLERANCE_C = 6.0
+HUMIDITY_TOLERANCE_PCT = 20.0
+WEIGHTS = {'temp': 0.5, 'humidity': 0.3, 'rain': 0.2}
+
+
+def _load_json(path: str) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+@lru_cache(maxsize=1)
+def load_crop_catalog() -> pd.DataFrame:
+    """
+    Per-crop optimal ranges, indexed by lowercase crop name.
+
+    Ranges from data/crop_settings.json are averaged over the cities that list the crop;
+    water needs (L/m²/day, i.e. mm/day) come from the same file, and the establishment
+    window is the first stage of data/crop_timelines.json, clipped to 7-60 days.
+    """
+    settings = _load_json(CROP_SETTINGS_PATH)
+    timelines = _load_json(CROP_TIMELINES_PATH)
+
+    rows = []
+    for city_crops in settings.values():
+        for crop in city_crops:
+            temp = crop.get('optimal_temperature') or [DEFAULT_CROP_PARAMS['temp_lo'], DEFAULT_CROP_PARAMS['temp_hi']]
+            hum = crop.get('optimal_humidity') or [DEFAULT_CROP_PARAMS['humidity_lo'], DEFAULT_CROP_PARAMS['humidity_hi']]
+            rows.append({
+                'crop': crop['crop_name'].strip().lower(),
+                'crop_name': crop['crop_name'].strip(),
+                'temp_lo': temp[0], 'temp_hi': temp[1],
+                'humidity_lo': hum[0], 'humidity_hi': hum[1],
+                'water_need_mm': crop.get('water_needs_liter_per_day_per_sq_meter', DEFAULT_CROP_PARAMS['water_need_mm']),
+            })
+    if not rows:
+        return pd.DataFrame(columns=['crop_name'] + list(DEFAULT_CROP_PARAMS)).rename_axis('crop')
+
+    catalog = pd.DataFrame(rows).groupby('crop').agg({
+        'crop_name': 'first', 'temp_lo': 'mean', 'temp_hi': 'mean',
+        'humidity_lo': 'mean', 'humidity_hi': 'mean', 'water_need_mm': 'mean',
+    })
+    first_stage = {name.lower(): stages[0].get('duration', 0) for name, stages in timelines.items() if stages}
+    catalog['establishment_days'] = [
+        int(np.clip(first_stage.get(crop, DEFAULT_CROP_PARAMS['establishment_days']), 7, 60)) for crop in catalog.index
+    ]
+    return catalog
+
+
+def crop_parameters(crops: Sequence[str]) -> pd.DataFrame:
+    """
+    Catalog rows for the requested crops (in order), using defaults for unknown crops;
+    the 'known' column tells them apart.
+    """
+    catalog = load_crop_catalog()
+    rows = []
+    for crop in crops:
+        key = crop.strip().lower()
+        if key in catalog.index:
+            row = {**catalog.loc[key].to_dict(), 'known': True}
+        else:
+            row = {'crop_name': crop, **DEFAULT_CROP_PARAMS, 'known': False}
+        row['crop'] = key
+        rows.append(row)
+    return pd.DataFrame(rows).set_index('crop')
+
+
+def daily_climatology(history: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Mean temperature, humidity and rainfall for each day of year (index 0 = 1 January).
+
+    Args:
+        history: Daily weather with columns ds, temp_max, temp_min, rainfall, humidity
+
+    Returns:
+        Dictionary of arrays of length 366 plus the number of years covered
+    """
+    ds = pd.to_datetime(history['ds'])
+    doy = ds.dt.dayofyear.to_numpy() - 1
+    tmean = (history['temp_max'].to_numpy(dtype=float) + history['temp_min'].to_numpy(dtype=float)) / 2
+
+    out = {}
+    for name, values in (('temp', tmean),
+                         ('humidity', history['humidity'].to_numpy(dtype=float)),
+                         ('rain', history['rainfall'].to_numpy(dtype=float))):
+        valid = ~np.isnan(values)
+        sums = np.bincount(doy[valid], weights=values[valid], minlength=DAYS_IN_YEAR)
+        counts = np.bincount(doy[valid], minlength=DAYS_IN_YEAR)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            clim = sums / counts
+        # Fill days never observed (e.g. 29 February) by circular interpolation
+        missing = counts == 0
+        if missing.all():
+            clim[:] = np.nan
+        elif missing.any():
+            days = np.arange(DAYS_IN_YEAR)
+            clim[missing] = np.interp(days[missing], days[~missing], clim[~missing], period=DAYS_IN_YEAR)
+        out[name] = clim
+    out['years'] = float(ds.dt.year.nunique()) if len(ds) else 0.0
+    return out
+
+
+def _range_score(values: np.ndarray, lo: np.ndarray, hi: np.ndarray, tolerance: float) -> np.ndarray:
+    """1 inside [lo, hi], falling linearly to 0 at `tolerance` outside it."""
+    distance = np.maximum(lo - values, 0) + np.maximum(values - hi, 0)
+    return np.clip(1 - distance / tolerance, 0, 1)
+
+
+def score_components(temp: np.ndarray, humidity: np.ndarray, rain: np.ndarray,
+                     params: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Per-factor and combined suitability in [0, 1], broadcast to shape (crops, days).
+
+    Args:
+        temp: Daily mean temperature (°C), shape (days,)
+        humidity: Relative humidity (%), shape (days,)
+        rain: Rainfall (mm/day), shape (days,)
+        params: Crop parameters as returned by crop_parameters
+
+    Returns:
+        Dictionary with 'temp', 'humidity', 'rain' and 'suitability' arrays
+    """
+    col = lambda name: params[name].to_numpy(dtype=float)[:, None]
+    temp = np.asarray(temp, dtype=float)[None, :]
+    humidity = np.asarray(humidity, dtype=float)[None, :]
+    rain = np.asarray(rain, dtype=float)[None, :]
+
+    temp_score = _range_score(temp, col('temp_lo'), col('temp_hi'), TEMP_TOLERANCE_C)
+    humidity_score = _range_score(humidity, col('humidity_lo'), col('humidity_hi'), HUMIDITY_TOLERANCE_PCT)
+    # Rain well beyond the crop's daily water need means waterlogging and disease pressure
+    need = np.maximum(col('water_need_mm'), 0.5)
+    rain_score = 1 / (1 + np.maximum(rain - 2 * need, 0) / (5 * need))
+
+    return {
+        'temp': temp_score,
+        'humidity': humidity_score,
+        'rain': rain_score,
+        'suitability': WEIGHTS['temp'] * temp_score + WEIGHTS['humidity'] * humidity_score + WEIGHTS['rain'] * rain_score,
+    }
+
+
+def suitability_matrix(climatology: Dict[str, np.ndarray], params: pd.DataFrame) -> np.ndarray:
+    """
+    Daily planting suitability in [0, 1] for every crop, shape (crops, 366).
+    """
+    return score_components(climatology['temp'], climatology['humidity'], climatology['rain'], params)['suitability']
+
+
+def daily_suitability(history: pd.DataFrame, crops: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Suitability of every archived day for every crop, without modifying `history`.
+
+    Args:
+        history: Daily weather (ds, temp_max, temp_min, rainfall, humidity); only read
+        crops: Crop names
+
+    Returns:
+        score_components output, each array of shape (len(crops), len(history))
+    """
+    tmean = (history['temp_max'].to_numpy(dtype=float) + history['temp_min'].to_numpy(dtype=float)) / 2
+    return score_components(tmean, history['humidity'].to_numpy(dtype=float),
+                            history['rainfall'].to_numpy(dtype=float), crop_parameters(crops))
+
+
+def window_means(matrix: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Mean suitability of the window starting on each day, per crop, with a
+    crop-specific window length; windows wrap around the new year.
+    """
+    n_crops, n_days = matrix.shape
+    max_len = int(lengths.max())
+    extended = np.concatenate([matrix, matrix[:, :max_len]], axis=1)
+    csum = np.concatenate([np.zeros((n_crops, 1)), np.cumsum(extended, axis=1)], axis=1)
+    starts = np.arange(n_days)[None, :]
+    ends = starts + lengths[:, None]
+    sums = np.take_along_axis(csum, ends, axis=1) - np.take_along_axis(csum, np.broadcast_to(starts, ends.shape), axis=1)
+    return sums / lengths[:, None]
+
+
+def top_k_windows(scores: np.ndarray, lengths: np.ndarray, k: int) -> tuple:
+    """
+    Greedy top-k non-overlapping windows per crop.
+
+    Returns:
+        (start_days, window_scores), both of shape (crops, k); unavailable slots are -1 / NaN
+    """
+    n_crops, n_days = scores.shape
+    remaining = scores.copy()
+    starts = np.full((n_crops, k), -1, dtype=int)
+    values = np.full((n_crops, k), np.nan)
+    days = np.arange(n_days)[None, :]
+    rows = np.arange(n_crops)
+    for i in range(k):
+        best = np.argmax(remaining, axis=1)
+        best_value = remaining[rows, best]
+        available = np.isfinite(best_value)
+        starts[available, i] = best[available]
+        values[available, i] = best_value[available]
+        # Block every start whose window would overlap the chosen one (circularly)
+        gap = np.abs(days - best[:, None])
+        gap = np.minimum(gap, n_days - gap)
+        remaining[(gap < lengths[:, None]) & available[:, None]] = -np.inf
+    return starts, values
+
+
+def _day_of_year_date(year: int, day_index: int) -> datetime:
+    """Date of a 0-based day of year; day 366 (index 365) is Dec 31 in a non-leap year."""
+    last_index = (datetime(year, 12, 31) - datetime(year, 1, 1)).days
+    return datetime(year, 1, 1) + timedelta(days=min(int(day_index), last_index))
+
+
+def _next_occurrence(day_index: int, today: datetime) -> datetime:
+    """Next date (on or after today) falling on the given 0-based day of year."""
+    candidate = _day_of_year_date(today.year, day_index)
+    if candidate.date() < today.date():
+        candidate = _day_of_year_date(today.year + 1, day_index)
+    return candidate
+
+
+def find_planting_windows(history: pd.DataFrame, crops: Sequence[str], top_k: int = 3,
+                          today: Optional[datetime] = None) -> Dict[str, List[Dict]]:
+    """
+    Best non-overlapping planting windows for every crop, in one vectorized pass.
+
+    Args:
+        history: Archived daily weather (ds, temp_max, temp_min, rainfall, humidity)
+        crops: Crop names
+        top_k: Windows to return per crop
+        today: Reference date for turning days of year into upcoming dates
+
+    Returns:
+        Mapping of crop name to a list of windows sorted by score (best first), each with
+        'start', 'end' (datetime), 'start_day_of_year', 'length_days', 'score' and 'confidence'.
+        Crops missing from the catalog get no windows: default ranges say nothing about them
+    """
+    if history is None or history.empty or not len(crops):
+        return {crop: [] for crop in crops}
+    today = today or datetime.now()
+    params = crop_parameters(crops)
+    climatology = daily_climatology(history)
+    matrix = suitability_matrix(climatology, params)
+    lengths = params['establishment_days'].to_numpy(dtype=int)
+    means = window_means(matrix, lengths)
+    # Break ties (e.g. a long fully suitable season) in favour of windows centred in
+    # good conditions: add a small bonus from the mean over the surrounding 3x window
+    n_days = matrix.shape[1]
+    wide = window_means(matrix, 3 * lengths)
+    centred = (np.arange(n_days)[None, :] - lengths[:, None]) % n_days
+    ranking = means + 1e-3 * np.take_along_axis(wide, centred, axis=1)
+    starts, _ = top_k_windows(ranking, lengths, top_k)
+    values = np.where(starts >= 0, np.take_along_axis(means, np.maximum(starts, 0), axis=1), np.nan)
+
+    # Confidence grows with the number of archived years behind the climatology
+    confidence = round(min(1.0, climatology['years'] / 3.0) * 0.9, 2)
+    results = {}
+    known = params['known'].to_numpy(dtype=bool)
+    for c, crop in enumerate(crops):
+        windows = []
+        if not known[c]:
+            results[crop] = windows
+            continue
+        for start, score in zip(starts[c], values[c]):
+            if start < 0 or np.isnan(score):
+                continue
+            start_date = _next_occurrence(start, today)
+            windows.append({
+                'start': start_date,
+                'end': start_date + timedelta(days=int(lengths[c]) - 1),
+                'start_day_of_year': int(start) + 1,
+                'length_days': int(lengths[c]),
+                'score': round(float(score), 3),
+                'confidence': confidence,
+            })
+        results[crop] = windows
+    return results
+
+
+def planting_calendar(history: pd.DataFrame, crops: Sequence[str], smooth: bool = True) -> pd.DataFrame:
+    """
+    Full-year suitability heatmap data: rows are crops, columns are 'Mon DD' labels
+    for each day of year. With smooth=True each cell is the mean over the crop's
+    establishment window starting that day.
+    """
+    params = crop_parameters(crops)
+    matrix = suitability_matrix(daily_climatology(history), params)
+    if smooth:
+        matrix = window_means(matrix, params['establishment_days'].to_numpy(dtype=int))
+    labels = [(datetime(2024, 1, 1) + timedelta(days=d)).strftime('%b %d') for d in range(DAYS_IN_YEAR)]
+    return pd.DataFrame(matrix, index=params['crop_name'].tolist(), columns=labels)
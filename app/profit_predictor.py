@@ -11,6 +11,15 @@ try:
 except FileNotFoundError:
     _TIMELINES = {}
 
+# Crop-specific water use (L / m² / day) when the caller gives no daily capacity
+WATER_USAGE_RATES = {
+    "rice": 15, "paddy": 15, "maize": 8, "corn": 8, "soybean": 6, "cotton": 7,
+    "groundnut": 5, "sorghum": 6, "millet": 5, "wheat": 7, "barley": 6,
+    "tea": 8, "coffee": 9, "onion": 5, "watermelon": 10, "beans": 6,
+    "lentil": 4, "pineapple": 7, "strawberry": 8, "coconut": 12, "mango": 9,
+    "banana": 14, "palm oil": 15, "sugarcane": 12, "sunflower": 7, "vegetables": 7
+}
+
 def _get_growth_days(crop: str, default_days: int = 90) -> int:
     stages = _TIMELINES.get(crop.lower())
     if not stages:
@@ -59,14 +68,7 @@ def predict_profit(crop_name: str, yield_per_sqm: float, total_yield: float,
     # If the caller provides their daily capacity, use it directly; otherwise fall back to
     # an agronomic estimate based on crop-specific rate × area.
     if daily_water_available is None:
-        water_usage_rates = {
-            "rice": 15, "paddy": 15, "maize": 8, "corn": 8, "soybean": 6, "cotton": 7,
-            "groundnut": 5, "sorghum": 6, "millet": 5, "wheat": 7, "barley": 6,
-            "tea": 8, "coffee": 9, "onion": 5, "watermelon": 10, "beans": 6,
-            "lentil": 4, "pineapple": 7, "strawberry": 8, "coconut": 12, "mango": 9,
-            "banana": 14, "palm oil": 15, "sugarcane": 12, "sunflower": 7, "vegetables": 7
-        }
-        water_usage_rate = water_usage_rates.get(crop_name.lower(), 8)  # L / m² / day
+        water_usage_rate = WATER_USAGE_RATES.get(crop_name.lower(), 8)  # L / m² / day
         daily_water_available = water_usage_rate * greenhouse_size
 
     # Total water for the growth cycle
@@ -125,4 +127,62 @@ def predict_profit(crop_name: str, yield_per_sqm: float, total_yield: float,
         "profit_per_sqm": round(profit_per_sqm, 2),  # MMK per sq.m
         "roi": round(roi, 2),  # %
         "confidence": 0.75  # Fixed confidence for demonstration
-    }
\ No newline at end of file
+    }
+
+
+def predict_profit_batch(crop_names, total_yield, price_per_kg, greenhouse_size: float,
+                         water_cost_per_liter: float = 0.5, fertilizer_cost: float = 10,
+                         rng: Optional[np.random.Generator] = None,
+                         draws: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized predict_profit for many crops at once, with the default water use
+    (crop rate × area) and cost rates.
+
+    The per-call LinearRegression in predict_profit is fitted to a single sample, so
+    it reproduces revenue − costs exactly; here that is computed directly.
+
+    Args:
+        crop_names: Sequence of crop names
+        total_yield: Total yields in kg, aligned with crop_names
+        price_per_kg: Prices in MMK (scalar or aligned)
+        greenhouse_size: Size of greenhouse in square meters
+        water_cost_per_liter: Cost of water per liter in MMK
+        fertilizer_cost: Fertilizer cost in MMK per m²·day
+        rng: Generator for the ±15% variation (seed it for reproducible output);
+            the global NumPy RNG when None, as in predict_profit
+        draws: Uniform [0, 1) values for the variation, one per crop (overrides rng),
+            e.g. derived from row keys so results do not depend on batch composition
+
+    Returns:
+        Dictionary of arrays with the same keys as predict_profit (without crop_name and confidence)
+    """
+    unique_names, inverse = np.unique(np.asarray(crop_names, dtype=str), return_inverse=True)
+    lowered = [name.lower() for name in unique_names]
+    growth_days = np.array([_get_growth_days(name) for name in lowered], dtype=float)[inverse]
+    water_rate = np.array([WATER_USAGE_RATES.get(name, 8) for name in lowered], dtype=float)[inverse]
+
+    total_water_cost = water_rate * greenhouse_size * growth_days * water_cost_per_liter
+    total_fertilizer_cost = fertilizer_cost * greenhouse_size * growth_days
+    total_revenue = np.asarray(total_yield, dtype=float) * np.asarray(price_per_kg, dtype=float)
+    other_costs = total_revenue * 0.10
+    total_costs = total_water_cost + total_fertilizer_cost + other_costs
+
+    if draws is not None:
+        random = np.asarray(draws, dtype=float)
+    else:
+        random = rng.random(len(total_revenue)) if rng is not None else np.random.random(len(total_revenue))
+    final_profit = (total_revenue - total_costs) * (0.85 + random * 0.3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_per_sqm = final_profit / greenhouse_size if greenhouse_size > 0 else np.zeros_like(final_profit)
+        roi = np.where(total_costs > 0, final_profit / total_costs * 100, 0)
+
+    return {
+        "total_revenue": np.round(total_revenue, 2),
+        "total_costs": np.round(total_costs, 2),
+        "total_water_cost": np.round(total_water_cost, 2),
+        "total_fertilizer_cost": np.round(total_fertilizer_cost, 2),
+        "other_costs": np.round(other_costs, 2),
+        "total_profit": np.round(final_profit, 2),
+        "profit_per_sqm": np.round(profit_per_sqm, 2),
+        "roi": np.round(roi, 2),
+    }
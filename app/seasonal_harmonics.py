@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+YEAR_LENGTH = 365.25
+
+
+def _fourier_terms(t: np.ndarray, order: int, period: float = YEAR_LENGTH) -> np.ndarray:
+    """Columns sin(2πkt/P), cos(2πkt/P) for k = 1..order."""
+    k = np.arange(1, order + 1)
+    angles = 2 * np.pi * np.outer(t, k) / period
+    return np.column_stack([np.sin(angles), np.cos(angles)])
+
+
+def fit_harmonic_seasonality(ds, y, order: int = 3, include_trend: bool = True) -> Dict:
+    """
+    Fit y ≈ a + b·t + Σ (s_k sin + c_k cos) of the yearly cycle by least squares.
+
+    Args:
+        ds: Dates of the observations
+        y: Daily values (e.g. planting suitability score); NaN values are ignored
+        order: Number of yearly harmonics (3 is enough for a monsoon climate)
+        include_trend: Also fit a linear trend so it does not leak into the seasonality
+
+    Returns:
+        Dictionary with the fitted coefficients and the residual standard deviation
+    """
+    dates = pd.to_datetime(pd.Series(ds)).reset_index(drop=True)
+    values = np.asarray(y, dtype=float)
+    mask = ~np.isnan(values)
+    dates, values = dates[mask], values[mask]
+    if len(values) < 2 * order + 2:
+        raise ValueError(f"Need at least {2 * order + 2} observations for order {order}, got {len(values)}")
+
+    doy = dates.dt.dayofyear.to_numpy(dtype=float)
+    t = (dates - dates.iloc[0]).dt.days.to_numpy(dtype=float)
+    columns = [np.ones_like(t)]
+    if include_trend:
+        columns.append(t / YEAR_LENGTH)
+    X = np.column_stack(columns + [_fourier_terms(doy, order)])
+
+    coef, *_ = np.linalg.lstsq(X, values, rcond=None)
+    residuals = values - X @ coef
+    n_fixed = len(columns)
+    return {
+        'order': order,
+        'intercept': float(coef[0]),
+        'trend_per_year': float(coef[1]) if include_trend else 0.0,
+        'sin': coef[n_fixed:n_fixed + order],
+        'cos': coef[n_fixed + order:],
+        'residual_std': float(residuals.std()),
+    }
+
+
+def yearly_curve(fit: Dict, day_of_year: Optional[np.ndarray] = None) -> np.ndarray:
+    """Evaluate the yearly seasonal component (zero-mean) at the given days of year."""
+    if day_of_year is None:
+        day_of_year = np.arange(1, 367)
+    terms = _fourier_terms(np.asarray(day_of_year, dtype=float), fit['order'])
+    return terms @ np.concatenate([fit['sin'], fit['cos']])
+
+
+def seasonal_peak(ds, y, order: int = 3, today: Optional[datetime] = None) -> Dict:
+    """
+    Fit the yearly curve and locate its peak.
+
+    Returns:
+        Dictionary with the yearly curve (index = day of year 1..366), the peak
+        day of year and the next calendar date on or after `today` with that day of year
+    """
+    fit = fit_harmonic_seasonality(ds, y, order=order)
+    days = np.arange(1, 367)
+    curve = yearly_curve(fit, days)
+    peak_doy = int(days[np.argmax(curve)])
+
+    today = today or datetime.now()
+    peak_date = datetime(today.year, 1, 1) + timedelta(days=peak_doy - 1)
+    if peak_date.date() < today.date():
+        peak_date = datetime(today.year + 1, 1, 1) + timedelta(days=peak_doy - 1)
+
+    return {
+        'fit': fit,
+        'curve': pd.Series(curve, index=days, name='yearly'),
+        'peak_day_of_year': peak_doy,
+        'peak_date': peak_date,
+    }
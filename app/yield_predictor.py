@@ -2,6 +2,28 @@ import numpy as np
 from sklearn.linear_model import LinearRegression
 from typing import Dict, Any, Optional
 
+# Define base yield for each crop (kg per sq.m)
+# These are approximate values for demonstration purposes, adjusted for greenhouse potential
+BASE_YIELDS = {
+    "rice": 0.8, "paddy": 0.8, "maize": 1.0, "corn": 1.0, "soybean": 0.5,
+    "cotton": 0.4, "groundnut": 0.6, "sorghum": 0.8, "millet": 0.7,
+    "wheat": 0.9, "barley": 0.8, "tea": 0.5, "coffee": 0.4, "onion": 4.0,
+    "watermelon": 5.0, "beans": 1.2, "lentil": 0.4, "pineapple": 2.5,
+    "strawberry": 2.0, "coconut": 0.2, "mango": 1.2, "banana": 3.0,
+    "palm oil": 0.5, "sugarcane": 8.0, "sunflower": 0.7, "vegetables": 1.5
+}
+
+# --- Weighted Factor Model for Yield Prediction ---
+# Optimal conditions and weights for environmental factors
+OPTIMAL_TEMP = 25  # °C
+OPTIMAL_RAINFALL = 300  # mm
+OPTIMAL_HUMIDITY = 70  # %
+YIELD_WEIGHTS = {
+    'temp': 0.5,      # Temperature is the most critical factor
+    'rainfall': 0.3,
+    'humidity': 0.2
+}
+
 def predict_yield(crop_name: str, greenhouse_size: float, temperature: float, rainfall: float, humidity: float, base_yield_kg_per_sqm: Optional[float] = None) -> Dict[str, Any]:
     """
     Predict crop yield using a weighted factor model based on ideal climate conditions.
@@ -17,45 +39,23 @@ def predict_yield(crop_name: str, greenhouse_size: float, temperature: float, ra
     Returns:
         Dictionary containing predicted yield in kg per sq.m and other information
     """
-    # Define base yield for each crop (kg per sq.m)
-    # These are approximate values for demonstration purposes, adjusted for greenhouse potential
-    base_yields = {
-        "rice": 0.8, "paddy": 0.8, "maize": 1.0, "corn": 1.0, "soybean": 0.5, 
-        "cotton": 0.4, "groundnut": 0.6, "sorghum": 0.8, "millet": 0.7, 
-        "wheat": 0.9, "barley": 0.8, "tea": 0.5, "coffee": 0.4, "onion": 4.0, 
-        "watermelon": 5.0, "beans": 1.2, "lentil": 0.4, "pineapple": 2.5, 
-        "strawberry": 2.0, "coconut": 0.2, "mango": 1.2, "banana": 3.0, 
-        "palm oil": 0.5, "sugarcane": 8.0, "sunflower": 0.7, "vegetables": 1.5
-    }
-    
     # Get base yield from the new parameter if provided, otherwise use the hardcoded dictionary
     if base_yield_kg_per_sqm is not None:
         base_yield = base_yield_kg_per_sqm
     else:
-        base_yield = base_yields.get(crop_name.lower(), 0.5)
+        base_yield = BASE_YIELDS.get(crop_name.lower(), 0.5)
     
     # --- Weighted Factor Model for Yield Prediction ---
-    # Define optimal conditions and weights for environmental factors
-    optimal_temp = 25  # °C
-    optimal_rainfall = 300  # mm
-    optimal_humidity = 70  # %
-    
-    weights = {
-        'temp': 0.5,      # Temperature is the most critical factor
-        'rainfall': 0.3,
-        'humidity': 0.2
-    }
-    
     # Normalize environmental factors based on deviation from optimal values
     # The closer to optimal, the closer the score is to 1.
-    temp_score = max(0, 1 - abs(temperature - optimal_temp) / 15)  # Penalize larger deviations
-    rainfall_score = max(0, 1 - abs(rainfall - optimal_rainfall) / 400)
-    humidity_score = max(0, 1 - abs(humidity - optimal_humidity) / 30)
+    temp_score = max(0, 1 - abs(temperature - OPTIMAL_TEMP) / 15)  # Penalize larger deviations
+    rainfall_score = max(0, 1 - abs(rainfall - OPTIMAL_RAINFALL) / 400)
+    humidity_score = max(0, 1 - abs(humidity - OPTIMAL_HUMIDITY) / 30)
 
     # Calculate the overall yield factor using weighted scores
-    yield_factor = (temp_score * weights['temp'] +
-                    rainfall_score * weights['rainfall'] +
-                    humidity_score * weights['humidity'])
+    yield_factor = (temp_score * YIELD_WEIGHTS['temp'] +
+                    rainfall_score * YIELD_WEIGHTS['rainfall'] +
+                    humidity_score * YIELD_WEIGHTS['humidity'])
 
     # The final yield is the base yield adjusted by the environmental factor
     # A small systematic variation is added for realism, but it's not random.
@@ -81,4 +81,44 @@ def predict_yield(crop_name: str, greenhouse_size: float, temperature: float, ra
         "total_yield": round(total_yield, 2),  # kg total
         "greenhouse_size": greenhouse_size,  # sq.m
         "confidence": round(confidence, 2)  # Dynamic confidence score
-    }
\ No newline at end of file
+    }
+
+
+def predict_yield_batch(crop_names, greenhouse_size: float, temperature, rainfall, humidity,
+                        base_yield_kg_per_sqm=None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized predict_yield for many crops (and conditions) at once.
+
+    Args:
+        crop_names: Sequence of crop names
+        greenhouse_size: Size of greenhouse in square meters (scalar or per row)
+        temperature, rainfall, humidity: Scalars or arrays aligned with crop_names
+        base_yield_kg_per_sqm: Optional base yields aligned with crop_names (NaN/None
+            falls back to the per-crop defaults)
+
+    Returns:
+        Dictionary of arrays: yield_per_sqm, total_yield and confidence (same rounding as predict_yield)
+    """
+    # Dictionary lookups once per distinct crop name
+    unique_names, inverse = np.unique(np.asarray(crop_names, dtype=str), return_inverse=True)
+    defaults = np.array([BASE_YIELDS.get(name.lower(), 0.5) for name in unique_names], dtype=float)[inverse]
+    if base_yield_kg_per_sqm is None:
+        base_yield = defaults
+    else:
+        given = np.asarray(base_yield_kg_per_sqm, dtype=float)
+        base_yield = np.where(np.isnan(given), defaults, given)
+
+    temp_score = np.maximum(0, 1 - np.abs(np.asarray(temperature, dtype=float) - OPTIMAL_TEMP) / 15)
+    rainfall_score = np.maximum(0, 1 - np.abs(np.asarray(rainfall, dtype=float) - OPTIMAL_RAINFALL) / 400)
+    humidity_score = np.maximum(0, 1 - np.abs(np.asarray(humidity, dtype=float) - OPTIMAL_HUMIDITY) / 30)
+    yield_factor = (temp_score * YIELD_WEIGHTS['temp'] + rainfall_score * YIELD_WEIGHTS['rainfall']
+                    + humidity_score * YIELD_WEIGHTS['humidity'])
+
+    yield_per_sqm = np.maximum(0, base_yield * yield_factor * 0.95)
+    confidence = (temp_score + rainfall_score + humidity_score) / 3
+    shape = yield_per_sqm.shape
+    return {
+        "yield_per_sqm": np.round(yield_per_sqm, 2),
+        "total_yield": np.round(yield_per_sqm * greenhouse_size, 2),
+        "confidence": np.round(np.broadcast_to(confidence, shape), 2),
+    }
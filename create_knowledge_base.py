@@ -1,7 +1,13 @@
 import pandas as pd
+import numpy as np
 import os
 import sys
 import json
+import time
+import hashlib
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 
 # --- Path Setup ---
@@ -24,8 +30,8 @@ project_root = setup_paths()
 
 # Now, we can import the necessary modules
 try:
-    from app.profit_predictor import predict_profit
-    from app.yield_predictor import predict_yield
+    from app.profit_predictor import predict_profit, predict_profit_batch, WATER_USAGE_RATES
+    from app.yield_predictor import predict_yield, predict_yield_batch, BASE_YIELDS
     # from app.planting_date_predictor import get_planting_date_recommendations  # No longer needed for static generation
     # from src.data_collection.historical_weather import get_historical_weather_for_region # No longer needed
     from app.crop_info import CropInfo
@@ -37,6 +43,10 @@ except ImportError as e:
 
 # --- Configuration & Constants ---
 OUTPUT_CSV_PATH = os.path.join(project_root, "knowledge_base.csv")
+OUTPUT_PARQUET_PATH = os.path.join(project_root, "knowledge_base.parquet")
+CROP_DATA_PATH = os.path.join(project_root, "Crop Data.csv")
+# Per-row results of previous builds, keyed by row fingerprint (see build_knowledge_base_incremental)
+KB_CACHE_PATH = os.path.join(project_root, "data", "models", "knowledge_base_rows.pkl")
 CROP_TIMELINES_PATH = os.path.join(project_root, "data", "crop_timelines.json")
 FULL_DATA_PATH = os.path.join(project_root, "Full Data.txt")
 
@@ -65,6 +75,27 @@ REPRESENTATIVE_CITIES = {
     "dry_zone": "Magway"
 }
 
+PRICE_COLUMN = "Average Market Price (MMK/kg)"
+YIELD_COLUMN = "Yield (kg/sqm)"
+WATER_COLUMN = "Water Availability (L/day)"
+FERTILIZER_COLUMN = "Fertilizer Type"
+DEFAULT_AVG_PRICE = 1000  # used when a price range is missing or unparseable
+CHUNK_ROWS = 2000  # 'Full Data.txt' rows per process-pool task
+STREAM_CHUNK_ROWS = 5000  # input rows read, built and written at a time by the streaming build
+# Bump when the builder or the yield/profit models change, so cached rows are recomputed
+KB_BUILD_VERSION = "kb-v2"
+ROW_FINGERPRINT = "_row_fingerprint"
+
+# Output column order of knowledge_base.csv
+KB_COLUMNS = [
+    "CropName", "KnownTownships", "KnownRegions", "Latitude", "Longitude",
+    "WaterAvailabilityLPerDay", "FertilizerType", "BaseYieldKgPerSqm",
+    "AvgMarketPriceMMK", "PlantingSeason", "HarvestingSeason", "PredictedYieldPerSqmKg",
+    "PredictedTotalYieldKg", "PredictedRevenueMMK", "PredictedWaterCostMMK", "PredictedLaborCostMMK",
+    "PredictedFertilizerCostMMK", "PredictedProfitMMK", "PlantingRecommendation", "PlantingRationale",
+    "CareInfo", "MarketInfo", "Summary",
+]
+
 
 # --- Helper Functions ---
 def load_json(file_path):
@@ -108,18 +139,399 @@ def parse_yield_value(yield_str):
     except (ValueError, TypeError):
         return None # Return None if parsing fails
 
-def main():
-    print("Starting knowledge base creation using 'Full Data.txt'...")
-    
-    # Load external data
-    crop_timelines = load_json(CROP_TIMELINES_PATH)
-    full_data_df = load_csv_data(FULL_DATA_PATH, "Full Data")
-    crop_info_manager = CropInfo()
+def fix_placeholder_townships(df: pd.DataFrame) -> pd.DataFrame:
+    """Replace placeholder townships ('Township_1', ...) with the row's region."""
+    df = df.copy()
+    placeholder = df['Township'].astype(str).str.strip().str.startswith('Township_')
+    df['Township'] = df['Township'].where(~placeholder, df['Region'])
+    return df
 
+def parse_price_ranges(values: pd.Series) -> pd.Series:
+    """Vectorized parse_price_range: midpoint of 'low – high' ranges, else the single number."""
+    text = values.where(values.map(lambda v: isinstance(v, str)))
+    parts = text.str.replace('MMK', '', regex=False).str.replace(',', '', regex=False).str.strip().str.split('–')
+    low = pd.to_numeric(parts.str[0].str.strip(), errors='coerce')
+    high = pd.to_numeric(parts.str[1].str.strip(), errors='coerce')
+    is_range = parts.str.len() == 2
+    # A two-part range only parses if both ends do
+    price = low.where(~is_range, (low + high) / 2)
+    return price.fillna(DEFAULT_AVG_PRICE).astype(float)
 
-    if full_data_df.empty:
-        print("Critical error: 'Full Data.txt' could not be loaded or is empty. Aborting.")
+def parse_yield_values(values: pd.Series) -> pd.Series:
+    """Vectorized parse_yield_value (NaN where missing or not numeric)."""
+    return pd.to_numeric(values, errors='coerce')
+
+def explode_crops(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per (township row, crop) from the comma-separated 'Suitable Crops' lists."""
+    crops = df['Suitable Crops'].where(df['Suitable Crops'].notna(), None).str.split(',')
+    exploded = df.assign(CropName=crops).explode('CropName')
+    exploded = exploded[exploded['CropName'].notna()]
+    exploded['CropName'] = exploded['CropName'].str.strip()
+    return exploded.reset_index(drop=True)
+
+def _timeline_field(crop_timelines, crop_name, field):
+    entry = crop_timelines.get(crop_name, {})
+    return entry.get(field, "Not available") if isinstance(entry, dict) else "Not available"
+
+def crop_attributes(crop_names, crop_timelines, crop_info_manager) -> pd.DataFrame:
+    """Seasons and CropInfo texts, looked up once per distinct crop name (indexed by name)."""
+    rows = {}
+    for crop_name in pd.unique(pd.Series(crop_names)):
+        info = crop_info_manager.get_crop_info(crop_name)
+        planting_season = _timeline_field(crop_timelines, crop_name, "Planting")
+        rows[crop_name] = {
+            "PlantingSeason": planting_season,
+            "HarvestingSeason": _timeline_field(crop_timelines, crop_name, "Harvesting"),
+            "PlantingRecommendation": f"General season: {planting_season}",
+            "CareInfo": info.get('care_info'),
+            "MarketInfo": info.get('market_info'),
+            "Summary": info.get('summary'),
+        }
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+# Loaded once per process (the main process or each pool worker)
+_context = {}
+
+def _load_context():
+    if not _context:
+        _context['crop_timelines'] = load_json(CROP_TIMELINES_PATH)
+        _context['crop_info'] = CropInfo(CROP_DATA_PATH)
+    return _context
+
+def _digest(value) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def config_fingerprint(seed=None) -> str:
+    """Digest of everything besides the input row and its crops that shapes a row's output."""
+    return _digest({
+        "version": KB_BUILD_VERSION,
+        "defaults": [DEFAULT_GREENHOUSE_SIZE, DEFAULT_TEMP, DEFAULT_RAINFALL, DEFAULT_HUMIDITY, DEFAULT_AVG_PRICE],
+        "base_yields": BASE_YIELDS,
+        "water_usage_rates": WATER_USAGE_RATES,
+        "seed": seed,
+    })[:16]
+
+def crop_fingerprint(crop_name, crop_timelines, crop_info_manager) -> str:
+    """Digest of the crop_timelines.json and 'Crop Data.csv' entries a crop's rows depend on."""
+    key = crop_name.lower().strip()
+    return _digest([
+        crop_timelines.get(crop_name),
+        crop_timelines.get(key),  # growth days in predict_profit
+        crop_info_manager.crop_info.get(key),
+        CropInfo.CROP_DETAILS.get(key),
+    ])
+
+def _canonical_value(value) -> str:
+    """A cell as text that does not depend on its column's dtype (1345 and 1345.0 agree)."""
+    if pd.isna(value):
+        return ''
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_)):
+        return repr(float(value))
+    return str(value)
+
+def row_fingerprints(df: pd.DataFrame, seed=None) -> pd.Series:
+    """
+    Fingerprint per input row: the row's values, the entries of its crops in the crop
+    files, and the build configuration. Rows with equal fingerprints build identically.
+    """
+    context = _load_context()
+    columns = [c for c in df.columns if c != ROW_FINGERPRINT]
+    # Hash canonical text, not the raw values: a column turning int -> float (one edited
+    # value, or a new NaN) must not change the fingerprints of its other rows
+    values = df[columns]
+    # DataFrame.map is pandas >= 2.1; older versions (requirements allow 1.5) only have applymap
+    canonical = values.map(_canonical_value) if hasattr(values, 'map') else values.applymap(_canonical_value)
+    row_hash = pd.util.hash_pandas_object(canonical, index=False).map('{:016x}'.format)
+
+    crop_digests = {}
+    list_digests = {}
+    for crop_list in df['Suitable Crops'].dropna().unique():
+        parts = []
+        for crop_name in str(crop_list).split(','):
+            crop_name = crop_name.strip()
+            if crop_name not in crop_digests:
+                crop_digests[crop_name] = crop_fingerprint(crop_name, context['crop_timelines'], context['crop_info'])
+            parts.append(crop_digests[crop_name])
+        list_digests[crop_list] = _digest(parts)[:16]
+    crops_hash = df['Suitable Crops'].map(list_digests).fillna('-')
+
+    return row_hash + ':' + crops_hash + ':' + config_fingerprint(seed)
+
+def _hash_key(seed: int) -> str:
+    # hash_pandas_object takes a 16-character key
+    return f"{int(seed) % 10 ** 16:016d}"
+
+def seeded_draws(fingerprints: pd.Series, seed: int) -> np.ndarray:
+    """
+    Uniform [0, 1) value per crop row from (row fingerprint, position in the row, seed).
+    Expects each fingerprint's crop rows once (duplicate input rows removed).
+    """
+    keys = pd.DataFrame({"fp": fingerprints.to_numpy(), "pos": fingerprints.groupby(fingerprints).cumcount().to_numpy()})
+    hashes = pd.util.hash_pandas_object(keys, index=False, hash_key=_hash_key(seed)).to_numpy(dtype=np.uint64)
+    return (hashes >> np.uint64(11)).astype(float) / float(1 << 53)
+
+def build_chunk(chunk: pd.DataFrame, seed_sequence: np.random.SeedSequence, seed=None) -> pd.DataFrame:
+    """
+    Knowledge-base rows for a slice of 'Full Data.txt' (townships already fixed):
+    crops exploded, prices parsed, yields and profits computed in batch.
+
+    With a `seed`, the profit variation of each crop row is derived from its row
+    fingerprint, so the output does not depend on chunking or on which rows are
+    rebuilt; otherwise it is drawn from `seed_sequence`.
+    """
+    context = _load_context()
+    rows = explode_crops(chunk)
+    if rows.empty:
+        return pd.DataFrame(columns=KB_COLUMNS + [ROW_FINGERPRINT])
+
+    avg_price = parse_price_ranges(rows[PRICE_COLUMN]) if PRICE_COLUMN in rows else pd.Series(
+        float(DEFAULT_AVG_PRICE), index=rows.index)
+    base_yield = parse_yield_values(rows[YIELD_COLUMN]) if YIELD_COLUMN in rows else pd.Series(
+        np.nan, index=rows.index)
+
+    crop_names = rows['CropName'].to_numpy(dtype=str)
+    yields = predict_yield_batch(crop_names, DEFAULT_GREENHOUSE_SIZE, DEFAULT_TEMP, DEFAULT_RAINFALL,
+                                 DEFAULT_HUMIDITY, base_yield.to_numpy(dtype=float))
+    draws = seeded_draws(rows[ROW_FINGERPRINT], seed) if seed is not None else None
+    profits = predict_profit_batch(crop_names, yields['total_yield'], avg_price.to_numpy(),
+                                   DEFAULT_GREENHOUSE_SIZE, rng=np.random.default_rng(seed_sequence), draws=draws)
+    attributes = crop_attributes(crop_names, context['crop_timelines'], context['crop_info']).reindex(crop_names)
+
+    kb = pd.DataFrame({
+        "CropName": crop_names,
+        "KnownTownships": rows['Township'].to_numpy(),
+        "KnownRegions": rows['Region'].to_numpy(),
+        "Latitude": rows.get('Latitude'),
+        "Longitude": rows.get('Longitude'),
+        "WaterAvailabilityLPerDay": pd.to_numeric(rows[WATER_COLUMN], errors='coerce').to_numpy()
+        if WATER_COLUMN in rows else np.nan,
+        "FertilizerType": rows[FERTILIZER_COLUMN].to_numpy() if FERTILIZER_COLUMN in rows else None,
+        "BaseYieldKgPerSqm": base_yield.to_numpy(),
+        "AvgMarketPriceMMK": avg_price.to_numpy(),
+        "PredictedYieldPerSqmKg": yields['yield_per_sqm'],
+        "PredictedTotalYieldKg": yields['total_yield'],
+        "PredictedRevenueMMK": profits['total_revenue'],
+        "PredictedWaterCostMMK": profits['total_water_cost'],
+        # predict_profit has no 'labor_cost'/'fertilizer_cost' keys, so these stay empty as before
+        "PredictedLaborCostMMK": None,
+        "PredictedFertilizerCostMMK": None,
+        "PredictedProfitMMK": profits['total_profit'],
+        "PlantingRationale": "Based on general regional suitability and crop timelines.",
+    })
+    for column in attributes.columns:
+        kb[column] = attributes[column].to_numpy()
+    kb[ROW_FINGERPRINT] = rows[ROW_FINGERPRINT].to_numpy()
+    return kb[KB_COLUMNS + [ROW_FINGERPRINT]]
+
+def _prepare_input(full_data_df: pd.DataFrame, seed=None) -> pd.DataFrame:
+    df = full_data_df.copy()
+    df.columns = df.columns.str.strip()
+    df = fix_placeholder_townships(df)
+    df[ROW_FINGERPRINT] = row_fingerprints(df, seed)
+    return df
+
+def _build_rows(df: pd.DataFrame, workers: int, chunk_rows: int, seed=None) -> pd.DataFrame:
+    """build_chunk over `chunk_rows`-row slices, on a process pool when worthwhile."""
+    chunks = [df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows)] or [df]
+    seeds = np.random.SeedSequence().spawn(len(chunks))
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(build_chunk, chunks, seeds, [seed] * len(chunks)))
+    else:
+        parts = [build_chunk(chunk, child, seed) for chunk, child in zip(chunks, seeds)]
+    return pd.concat(parts, ignore_index=True)
+
+def _finalize(rows: pd.DataFrame) -> pd.DataFrame:
+    final_df = rows.drop(columns=[ROW_FINGERPRINT]).reset_index(drop=True)
+    # Create lowercase columns for easier matching
+    final_df['KnownTownships_lower'] = final_df['KnownTownships'].str.lower()
+    final_df['KnownRegions_lower'] = final_df['KnownRegions'].str.lower()
+    return final_df
+
+def build_knowledge_base(full_data_df: pd.DataFrame, workers: int = 1, chunk_rows: int = CHUNK_ROWS,
+                         seed=None) -> pd.DataFrame:
+    """
+    Batch knowledge-base build. Input chunks of `chunk_rows` rows run on a process
+    pool when `workers` > 1 and there is more than one chunk.
+
+    Args:
+        full_data_df: Raw 'Full Data.txt' frame
+        workers: Worker processes (1 = in-process)
+        chunk_rows: Input rows per task
+        seed: Seed for the profit variation; output is then fully deterministic
+            (None = fresh randomness, as before)
+
+    Returns:
+        Knowledge-base DataFrame (KB_COLUMNS plus the lowercase matching columns)
+    """
+    df = _prepare_input(full_data_df, seed)
+    # Identical input rows build identically: build each fingerprint once
+    built = _build_rows(df.drop_duplicates(ROW_FINGERPRINT), workers, chunk_rows, seed)
+    return _finalize(df[[ROW_FINGERPRINT]].merge(built, on=ROW_FINGERPRINT, how='inner')[KB_COLUMNS + [ROW_FINGERPRINT]])
+
+def load_row_cache(cache_path: str) -> pd.DataFrame:
+    """Cached per-row results (KB_COLUMNS plus the row fingerprint); empty if missing or unreadable."""
+    try:
+        cache = pd.read_pickle(cache_path)
+        if ROW_FINGERPRINT in cache.columns and set(KB_COLUMNS).issubset(cache.columns):
+            return cache
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Warning: ignoring unreadable knowledge-base cache {cache_path}: {e}")
+    return pd.DataFrame(columns=KB_COLUMNS + [ROW_FINGERPRINT])
+
+def build_knowledge_base_incremental(full_data_df: pd.DataFrame, cache_path: str = KB_CACHE_PATH,
+                                     workers: int = 1, chunk_rows: int = CHUNK_ROWS, seed=None):
+    """
+    build_knowledge_base that reuses the rows of previous builds.
+
+    Each input row is fingerprinted together with its crops' entries in
+    crop_timelines.json / 'Crop Data.csv' and the build configuration (including
+    the seed); only rows whose fingerprint is not in the cache are built. The cache
+    is then rewritten with the rows of the current input only.
+
+    Returns:
+        (knowledge-base DataFrame, report) where the report counts input_rows,
+        reused_rows, recomputed_rows, kb_rows and seconds
+    """
+    started = time.perf_counter()
+    df = _prepare_input(full_data_df, seed)
+    cache = load_row_cache(cache_path)
+
+    cached = df[ROW_FINGERPRINT].isin(cache[ROW_FINGERPRINT])
+    todo = df[~cached].drop_duplicates(ROW_FINGERPRINT)
+    built = _build_rows(todo, workers, chunk_rows, seed) if len(todo) else cache.iloc[:0]
+
+    kept = cache[cache[ROW_FINGERPRINT].isin(df[ROW_FINGERPRINT])]
+    # Skip empty frames so their object columns don't widen the dtypes
+    parts = [part for part in (kept, built) if len(part)]
+    current = pd.concat(parts, ignore_index=True) if parts else built
+    # Input order; an inner merge keeps the left order and each row's crop order
+    rows = df[[ROW_FINGERPRINT]].merge(current, on=ROW_FINGERPRINT, how='inner')
+
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    current.to_pickle(cache_path)
+
+    final_df = _finalize(rows[KB_COLUMNS + [ROW_FINGERPRINT]])
+    report = {
+        "input_rows": len(df),
+        "reused_rows": int(cached.sum()),
+        "recomputed_rows": int((~cached).sum()),
+        "kb_rows": len(final_df),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    return final_df, report
+
+def write_knowledge_base(final_df: pd.DataFrame, csv_path: str = OUTPUT_CSV_PATH,
+                         parquet_path: str = OUTPUT_PARQUET_PATH) -> None:
+    """Write the CSV and, when a Parquet engine (pyarrow) is installed, a Parquet copy."""
+    final_df.to_csv(csv_path, index=False, encoding='utf-8')
+    print(f"Successfully created knowledge base at: {csv_path}")
+    if not parquet_path:
         return
+    try:
+        final_df.to_parquet(parquet_path, index=False)
+        print(f"Columnar copy written to: {parquet_path}")
+    except ImportError:
+        print("Skipping Parquet output: install 'pyarrow' to enable it.")
+
+def build_stream_chunk(chunk: pd.DataFrame, seed_sequence: np.random.SeedSequence, seed=None) -> pd.DataFrame:
+    """build_knowledge_base for one chunk of raw input rows (a process-pool task of the streaming build)."""
+    df = _prepare_input(chunk, seed)
+    built = build_chunk(df.drop_duplicates(ROW_FINGERPRINT), seed_sequence, seed)
+    return _finalize(df[[ROW_FINGERPRINT]].merge(built, on=ROW_FINGERPRINT, how='inner')[KB_COLUMNS + [ROW_FINGERPRINT]])
+
+def _open_parquet_writer(parquet_path: str, first: pd.DataFrame):
+    """ParquetWriter whose schema comes from the first chunk, or None without pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("Skipping Parquet output: install 'pyarrow' to enable it.")
+        return None, None
+    schema = pa.Schema.from_pandas(first, preserve_index=False)
+    # Columns that are empty in the first chunk would be typed null; store them as strings
+    schema = pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in schema])
+    return pq.ParquetWriter(parquet_path, schema), schema
+
+def build_knowledge_base_streaming(input_path: str = FULL_DATA_PATH, csv_path: str = OUTPUT_CSV_PATH,
+                                   parquet_path: str = OUTPUT_PARQUET_PATH, chunk_rows: int = STREAM_CHUNK_ROWS,
+                                   workers: int = 1, seed=None) -> dict:
+    """
+    Knowledge-base build with memory bounded by the chunk size, for inputs too large
+    to hold (or whose output is too large to hold) in memory.
+
+    The input CSV is read `chunk_rows` rows at a time; each chunk goes through the
+    batch predictors (on a process pool when `workers` > 1, with at most two chunks
+    per worker in flight) and is appended to the CSV and, with pyarrow, as a row
+    group to the Parquet file. Outputs are written next to the targets and renamed
+    into place at the end, so readers never see a partial knowledge base.
+
+    With a `seed`, the output matches build_knowledge_base(seed=seed) row for row.
+
+    Returns:
+        Report with input_rows, kb_rows, chunks and seconds
+    """
+    started = time.perf_counter()
+    report = {"input_rows": 0, "kb_rows": 0, "chunks": 0}
+    partial_csv = csv_path + ".partial"
+    partial_parquet = parquet_path + ".partial" if parquet_path else ""
+    parquet_writer, schema = None, None
+    seeds = np.random.SeedSequence()
+
+    def write(part: pd.DataFrame):
+        nonlocal parquet_writer, schema
+        part.to_csv(partial_csv, mode='w' if report["chunks"] == 0 else 'a', header=report["chunks"] == 0,
+                    index=False, encoding='utf-8')
+        if partial_parquet:
+            if report["chunks"] == 0:
+                parquet_writer, schema = _open_parquet_writer(partial_parquet, part)
+            if parquet_writer is not None:
+                import pyarrow as pa
+                parquet_writer.write_table(pa.Table.from_pandas(part, schema=schema, preserve_index=False))
+        report["chunks"] += 1
+        report["kb_rows"] += len(part)
+
+    reader = pd.read_csv(input_path, chunksize=chunk_rows)
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in reader:
+                    report["input_rows"] += len(chunk)
+                    pending.append(pool.submit(build_stream_chunk, chunk, seeds.spawn(1)[0], seed))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+        else:
+            for chunk in reader:
+                report["input_rows"] += len(chunk)
+                write(build_stream_chunk(chunk, seeds.spawn(1)[0], seed))
+        if report["chunks"] == 0:
+            write(pd.DataFrame(columns=KB_COLUMNS + ['KnownTownships_lower', 'KnownRegions_lower']))
+    finally:
+        reader.close()
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+    os.replace(partial_csv, csv_path)
+    print(f"Successfully created knowledge base at: {csv_path}")
+    if parquet_writer is not None:
+        os.replace(partial_parquet, parquet_path)
+        print(f"Columnar copy written to: {parquet_path}")
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+def build_knowledge_base_rowwise(full_data_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Original row-by-row builder (iterrows, scalar predict_yield / predict_profit per
+    crop). Kept as the reference implementation for benchmarks and output checks.
+    """
+    crop_timelines = load_json(CROP_TIMELINES_PATH)
+    crop_info_manager = CropInfo(CROP_DATA_PATH)
+    full_data_df = full_data_df.copy()
 
     # --- Data Correction ---
     # Conditionally replace placeholder 'Township' values
@@ -130,11 +542,9 @@ def main():
             lambda row: row['Region'] if str(row['Township']).strip().startswith('Township_') else row['Township'],
             axis=1
         )
-        print("Conditionally replaced placeholder 'Township' values with 'Region' values.")
     else:
-        print("Error: Required columns ('Township', 'Region') not found in 'Full Data.txt'.")
-        return
-        
+        raise ValueError("Required columns ('Township', 'Region') not found in 'Full Data.txt'.")
+
     # Clean column names just in case
     full_data_df.columns = full_data_df.columns.str.strip()
 
@@ -189,6 +599,8 @@ def main():
                 "KnownRegions": region_name,
                 "Latitude": lat,
                 "Longitude": lon,
+                "WaterAvailabilityLPerDay": row.get(WATER_COLUMN),
+                "FertilizerType": row.get(FERTILIZER_COLUMN),
                 "BaseYieldKgPerSqm": base_yield,
                 "AvgMarketPriceMMK": avg_price,
                 "PlantingSeason": planting_season,
@@ -208,16 +620,58 @@ def main():
             }
             all_crops_data.append(record)
 
+    final_df = pd.DataFrame(all_crops_data, columns=KB_COLUMNS)
+    # Create lowercase columns for easier matching
+    final_df['KnownTownships_lower'] = final_df['KnownTownships'].str.lower()
+    final_df['KnownRegions_lower'] = final_df['KnownRegions'].str.lower()
+    return final_df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build knowledge_base.csv from 'Full Data.txt'.")
+    parser.add_argument("--input", default=FULL_DATA_PATH)
+    parser.add_argument("--output", default=OUTPUT_CSV_PATH)
+    parser.add_argument("--parquet", default=OUTPUT_PARQUET_PATH, help="Columnar copy ('' to skip)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, default=None, help="Seed the profit variation for reproducible output")
+    parser.add_argument("--cache", default=KB_CACHE_PATH, help="Per-row result cache")
+    parser.add_argument("--full", action="store_true", help="Rebuild every row, ignoring the cache")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read, build and write the input in chunks with bounded memory (no row cache)")
+    parser.add_argument("--stream-chunk-rows", type=int, default=STREAM_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    if args.stream:
+        print(f"Streaming knowledge base creation from '{args.input}'...")
+        report = build_knowledge_base_streaming(args.input, args.output, args.parquet,
+                                                chunk_rows=args.stream_chunk_rows, workers=args.workers,
+                                                seed=args.seed)
+        print(f"Built {report['kb_rows']} rows from {report['input_rows']} input rows "
+              f"in {report['chunks']} chunks in {report['seconds']:.2f} s")
+        return
+
+    print("Starting knowledge base creation using 'Full Data.txt'...")
+    full_data_df = load_csv_data(args.input, "Full Data")
+    if full_data_df.empty:
+        print("Critical error: 'Full Data.txt' could not be loaded or is empty. Aborting.")
+        return
+    if not {'Township', 'Region'}.issubset(full_data_df.columns.str.strip()):
+        print("Error: Required columns ('Township', 'Region') not found in 'Full Data.txt'.")
+        return
+
+    if args.full and os.path.exists(args.cache):
+        os.remove(args.cache)
+    final_df, report = build_knowledge_base_incremental(full_data_df, args.cache, workers=args.workers,
+                                                        chunk_rows=args.chunk_rows, seed=args.seed)
+    print(f"Built {report['kb_rows']} rows from {report['input_rows']} input rows in {report['seconds']:.2f} s "
+          f"({report['reused_rows']} input rows reused, {report['recomputed_rows']} recomputed)")
+
     # Create the final DataFrame and save it
-    if all_crops_data:
-        final_df = pd.DataFrame(all_crops_data)
-        # Create lowercase columns for easier matching
-        final_df['KnownTownships_lower'] = final_df['KnownTownships'].str.lower()
-        final_df['KnownRegions_lower'] = final_df['KnownRegions'].str.lower()
-        final_df.to_csv(OUTPUT_CSV_PATH, index=False, encoding='utf-8')
-        print(f"Successfully created knowledge base at: {OUTPUT_CSV_PATH}")
-    else:
+    if final_df.empty:
         print("No data was processed to generate the knowledge base.")
+        return
+    write_knowledge_base(final_df, args.output, args.parquet)
 
 
 if __name__ == "__main__":
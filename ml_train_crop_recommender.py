@@ -1,51 +1,93 @@
-import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-import joblib
+"""
+Train the crop recommender (region, coordinates, water, fertilizer, price -> crop).
 
-# Load full region-crop dataset with water_availability and fertilizer_type
-crop_df = pd.read_csv('data/crop_data_with_region_full_v2.csv')
-# Load market price data (use latest price for each crop/region)
-market_df = pd.read_csv('data/market_prices.csv')
+The training set is generated from knowledge_base.csv and 'Full Data.txt'
+(resampled and jittered to --rows rows) or read with --input. A parallel
+successive-halving search picks the random-forest settings, the winner is
+refitted on the full training split and scored on held-out sites (next to a
+region-lookup baseline), and the model is saved as a versioned artifact with
+metadata under data/models/crop_recommender (see src/recommendations/crop_training.py).
 
-# Get latest price for each crop (by region)
-market_df['date'] = pd.to_datetime(market_df['date'], errors='coerce')
-latest_prices = market_df.sort_values('date').groupby(['region', 'crop_name']).tail(1)
+Usage:
+    python ml_train_crop_recommender.py                        # 250,000 generated rows
+    python ml_train_crop_recommender.py --rows 1000000 --save-dataset data/models/crop_training.parquet
+    python ml_train_crop_recommender.py --input my_training_set.csv
+    python ml_train_crop_recommender.py --list
+"""
+import argparse
+import json
+import os
+import sys
+import time
 
-# Merge crop data with price info (on crop_name), but keep only the region from crop_df
-merged = pd.merge(crop_df, latest_prices[['crop_name', 'price_per_kg']], on='crop_name', how='left')
+# Resolve paths from this file, not from the working directory
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
-# Fill missing price_per_kg with a default value
-merged['price_per_kg'] = merged['price_per_kg'].fillna(1000)
+from src.recommendations.crop_training import (MODEL_DIR, MODEL_KEY, base_training_rows, expand_training_set,
+                                               load_training_set, save_crop_recommender, train_crop_recommender)
+from src.utils.model_store import ModelStore
 
-# Only drop rows with missing essential features (not price)
-merged = merged.dropna(subset=['region', 'crop_name', 'optimal_temperature', 'optimal_rainfall', 'optimal_humidity'])
 
-# Encode categorical features
-le_region = LabelEncoder()
-merged['region_enc'] = le_region.fit_transform(merged['region'])
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the crop recommender with a parallel successive-halving search.")
+    parser.add_argument("--input", help="CSV/Parquet training set (default: generate one from the knowledge base)")
+    parser.add_argument("--rows", type=int, default=250_000, help="Rows to generate")
+    parser.add_argument("--save-dataset", help="Also write the generated training set (.csv or .parquet)")
+    parser.add_argument("--candidates", type=int, default=24, help="Parameter settings in the first halving round")
+    parser.add_argument("--factor", type=int, default=3, help="Halving factor")
+    parser.add_argument("--search-rows", type=int, default=150_000, help="Most rows a search candidate sees")
+    parser.add_argument("--cv", type=int, default=3)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel jobs (-1 = all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--models-dir", default=MODEL_DIR)
+    parser.add_argument("--list", action="store_true", help="List the stored versions and exit")
+    args = parser.parse_args(argv)
 
-# Encode fertilizer_type: 1 for organic, 0 for chemical/both
-merged['fertilizer_type_enc'] = merged['fertilizer_type'].apply(lambda x: 1 if str(x).lower() == 'organic' else 0)
+    if args.list:
+        entries = [e for e in ModelStore(args.models_dir, serializer="joblib").entries() if e.get("key") == MODEL_KEY]
+        for e in sorted(entries, key=lambda e: e.get("created_at", "")):
+            print(f"{e['version']}  {e['created_at']}  {e['rows']:>9} rows  test acc {e['test_accuracy']:.3f}  "
+                  f"top-3 {e['test_top3_accuracy']:.3f} (baseline {e.get('baseline_top3_accuracy', float('nan')):.3f})  fit {e['fit_seconds']:.1f}s  ({e['source']})")
+        if not entries:
+            print(f"No crop recommender versions in {args.models_dir}")
+        return
 
-# Features: region, optimal_temperature, optimal_rainfall, optimal_humidity, price_per_kg, water_availability, fertilizer_type
-X = merged[['region_enc', 'optimal_temperature', 'optimal_rainfall', 'optimal_humidity', 'price_per_kg', 'water_availability', 'fertilizer_type_enc']]
-# Target: crop_name
-le_crop = LabelEncoder()
-y = le_crop.fit_transform(merged['crop_name'])
+    started = time.perf_counter()
+    if args.input:
+        data, source = load_training_set(args.input), os.path.abspath(args.input)
+    else:
+        base = base_training_rows()
+        data = expand_training_set(base, args.rows, seed=args.seed)
+        source = f"generated: {len(base)} knowledge-base rows x {args.rows} samples (seed {args.seed})"
+        if args.save_dataset:
+            os.makedirs(os.path.dirname(os.path.abspath(args.save_dataset)), exist_ok=True)
+            if args.save_dataset.endswith(".parquet"):
+                data.to_parquet(args.save_dataset, index=False)
+            else:
+                data.to_csv(args.save_dataset, index=False)
+    print(f"Training set: {len(data):,} rows, {data['crop_name'].nunique()} crops "
+          f"({time.perf_counter() - started:.1f} s) - {source}")
 
-# Train/test split (for future evaluation)
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    model, metadata = train_crop_recommender(data, n_candidates=args.candidates, factor=args.factor,
+                                             search_rows=args.search_rows, cv=args.cv, n_jobs=args.n_jobs,
+                                             seed=args.seed)
+    search = metadata["search"]
+    print(f"Search: {search['candidates']} candidates over {search['rounds']} rounds "
+          f"({search['resources_per_round']} rows), {search['fits']} fits in {metadata['search_seconds']:.1f} s")
+    print(f"Best parameters: {json.dumps(metadata['best_params'], default=str)} (CV accuracy {metadata['cv_accuracy']:.3f})")
+    print(f"Final fit on {metadata['train_rows']:,} rows ({metadata['train_sites']} sites): "
+          f"{metadata['fit_seconds']:.1f} s; held-out accuracy {metadata['test_accuracy']:.3f}, "
+          f"top-3 {metadata['test_top3_accuracy']:.3f} on {metadata['test_rows']:,} rows "
+          f"({metadata['test_sites']} unseen sites)")
+    print(f"Top-3 of the region lookup baseline: {metadata['baseline_top3_accuracy']:.3f}; "
+          f"{metadata['crops_per_site']:.1f} crops per site cap top-1 at about {1 / metadata['crops_per_site']:.2f}")
 
-# Train model
-clf = RandomForestClassifier(n_estimators=100, random_state=42)
-clf.fit(X_train, y_train)
+    entry = save_crop_recommender(model, metadata, data, source, model_dir=args.models_dir)
+    print(f"Saved version {entry['version']} to {os.path.join(args.models_dir, entry['artifact'])} "
+          f"(total {time.perf_counter() - started:.1f} s)")
 
-# Save model and encoders
-joblib.dump(clf, 'ml_crop_recommender.pkl')
-joblib.dump(le_region, 'ml_region_encoder.pkl')
-joblib.dump(le_crop, 'ml_crop_encoder.pkl')
 
-print('ML crop recommendation model trained and saved.')
+if __name__ == "__main__":
+    main()
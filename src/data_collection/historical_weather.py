@@ -1,12 +1,14 @@
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
+from typing import Optional
 # from .weather import get_city_coordinates # No longer needed
+from .weather import resolve_open_meteo_url
 
 # Historical weather data endpoint
 HISTORICAL_API_URL = "https://archive-api.open-meteo.com/v1/archive"
 
-def fetch_historical_weather(lat: float, lon: float, start_date: str, end_date: str) -> pd.DataFrame:
+def fetch_historical_weather(lat: float, lon: float, start_date: str, end_date: str, base_url: Optional[str] = None) -> pd.DataFrame:
     """
     Fetches historical weather data for a given region (now using lat/lon) and date range.
     Parameters:
@@ -14,6 +16,8 @@ def fetch_historical_weather(lat: float, lon: float, start_date: str, end_date:
     - lon (float): Longitude of the location.
     - start_date (str): Start date in 'YYYY-MM-DD' format.
     - end_date (str): End date in 'YYYY-MM-DD' format.
+    - base_url (str, optional): Alternative API host, e.g. the local mock server.
+      Defaults to OPEN_METEO_BASE_URL, then to the public archive API.
     Returns:
     - pd.DataFrame: A DataFrame with historical weather data.
     """
@@ -31,7 +35,7 @@ def fetch_historical_weather(lat: float, lon: float, start_date: str, end_date:
         "timezone": "Asia/Yangon"
     }
     try:
-        response = requests.get(HISTORICAL_API_URL, params=params, timeout=20)
+        response = requests.get(resolve_open_meteo_url(HISTORICAL_API_URL, base_url), params=params, timeout=20)
         response.raise_for_status()
         data = response.json()
         
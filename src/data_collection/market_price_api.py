@@ -1,10 +1,57 @@
+import os
+import threading
 import requests
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import pandas as pd
 from datetime import datetime
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def get_real_time_market_prices() -> Dict[str, Any]:
+MARKET_API_URL = "https://api.mockmarketdata.com/prices"
+REQUEST_TIMEOUT = (5, 20)  # (connect, read) seconds
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def resolve_market_api_url(default_url: str, base_url: Optional[str] = None) -> str:
+    """
+    Re-root a market API endpoint on `base_url` (or the MARKET_API_BASE_URL
+    environment variable), e.g. the local stand-in server; `default_url` otherwise.
+    """
+    base_url = base_url or os.environ.get("MARKET_API_BASE_URL")
+    if not base_url:
+        return default_url
+    return base_url.rstrip("/") + urlparse(default_url).path
+
+
+def create_market_session(pool_size: int = 8, retries: int = 3) -> requests.Session:
+    """
+    Session with a connection pool of `pool_size` keep-alive connections per host
+    and retries with backoff on 5xx responses.
+    """
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504],
+                  allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_market_session() -> requests.Session:
+    """Process-wide pooled session shared by the market API clients."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_market_session()
+        return _session
+
+
+def get_real_time_market_prices(base_url: Optional[str] = None,
+                                session: Optional[requests.Session] = None) -> Dict[str, Any]:
     """
     Fetch real-time market prices from the API
     Returns a dictionary with market data
@@ -12,7 +59,8 @@ def get_real_time_market_prices() -> Dict[str, Any]:
     try:
         # For now, we'll use a mock API endpoint
         # In production, this should be replaced with a real market data API
-        response = requests.get("https://api.mockmarketdata.com/prices")
+        session = session or get_market_session()
+        response = session.get(resolve_market_api_url(MARKET_API_URL, base_url), timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -25,10 +73,10 @@ def format_market_data(data: Dict) -> pd.DataFrame:
     """
     if not data:
         return None
-    
+
     # Create a list of market entries
     market_entries = []
-    
+
     for crop, price_info in data.items():
         market_entries.append({
             'Crop': crop,
@@ -37,12 +85,15 @@ def format_market_data(data: Dict) -> pd.DataFrame:
             'Trend': 'Rising' if price_info.get('change', 0) > 0 else 'Falling',
             'Last Updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         })
-    
+
     return pd.DataFrame(market_entries)
 
 def get_cached_market_data(cache_file: str) -> pd.DataFrame:
     """
     Get market data from cache if available
+
+    Historical prices live in the SQLite price database instead
+    (see src/data_collection/market_price_ingest.py).
     """
     try:
         if os.path.exists(cache_file):
@@ -1,59 +1,56 @@
 import pandas as pd
 from datetime import datetime
 import os
+import sys
+
+# This file is at: [project_root]/src/data_collection/market_price_collector.py
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.market.price_stats import price_summary
 
 def get_latest_market_prices(region: str) -> pd.DataFrame:
     """
     Get the latest market prices for a specific region
     """
-    # Load market prices data
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.abspath(os.path.join(script_dir, "..", ".."))
-    file_path = os.path.join(project_root, "data", "market_prices.csv")
-    
     try:
-        df = pd.read_csv(file_path)
-        
-        # Filter by region
-        region_df = df[df['region'] == region]
-        
-        # Get latest date
-        latest_date = region_df['date'].max()
-        
-        # Get latest prices
-        latest_prices = region_df[region_df['date'] == latest_date]
-        
-        # Format the data
-        market_data = []
-        for _, row in latest_prices.iterrows():
-            market_data.append({
-                'Crop': row['crop_name'],
-                'Current Price (MMK/kg)': row['price_per_kg'],
-                'Daily Change (MMK/kg)': 0,  # We'll calculate this later
-                'Trend': 'Stable'  # We'll update this later
-            })
-        
-        return pd.DataFrame(market_data)
-        
+        latest_prices = price_summary(region)
+
+        # Format the data; change and trend come from the cached price statistics
+        return pd.DataFrame({
+            'Crop': latest_prices['crop_name'],
+            'Current Price (MMK/kg)': latest_prices['latest_price'],
+            'Daily Change (MMK/kg)': latest_prices['change'],  # versus the previous observation
+            'Change (%)': (latest_prices['pct_change'] * 100).round(1),
+            'Trend': latest_prices['trend']
+        }).reset_index(drop=True)
+
     except Exception as e:
         print(f"Error getting market prices: {e}")
         return None
 
-def calculate_price_changes(df: pd.DataFrame) -> pd.DataFrame:
+def calculate_price_changes(df: pd.DataFrame, region: str = None) -> pd.DataFrame:
     """
     Calculate price changes and trends
+
+    Rows from get_latest_market_prices already carry them; for other tables of
+    'Crop' and 'Current Price (MMK/kg)', pass the region to fill them from the
+    precomputed price statistics.
     """
     if df is None or len(df) == 0:
         return df
-    
+
     # Sort by crop name
     df = df.sort_values('Crop')
-    
-    # Calculate price changes (for now, we'll just show 0)
-    # In a real implementation, we would compare with previous day's prices
-    df['Daily Change (MMK/kg)'] = 0
-    df['Trend'] = 'Stable'
-    
+
+    if region is not None:
+        stats = price_summary(region)
+        stats = stats.set_index(stats['crop_name'].str.lower())
+        crop_keys = df['Crop'].str.lower()
+        df['Daily Change (MMK/kg)'] = crop_keys.map(stats['change']).fillna(0)
+        df['Trend'] = crop_keys.map(stats['trend']).fillna('Stable')
+
     return df
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+"""
+Market price ingestion: paged price feed -> indexed SQLite table.
+
+`MarketPriceIngestor` asks the feed for rows newer than what the database
+already holds (minus an overlap window for late corrections), fetches the
+pages concurrently over one pooled HTTP session and writes each page in a
+single bulk transaction. The unique (date, region, crop) index makes the
+write an upsert of new rows only, so re-running an ingest is cheap and safe.
+MarketPriceStore picks up the database automatically once it exists.
+
+The feed is expected at ``<base>/v1/market/prices`` and to return
+``{"prices": [{date, region, crop_name, price_per_kg}, ...], "next_page": n | null, "total": n}``
+for the query parameters since, page and page_size.
+
+Usage:
+    python -m src.data_collection.market_price_ingest --base-url https://prices.example.org
+    python -m src.data_collection.market_price_ingest --mock      # offline stand-in server, temporary database
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import requests
+
+# This file is at: [project_root]/src/data_collection/market_price_ingest.py
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.data_collection.market_price_api import (REQUEST_TIMEOUT, create_market_session,
+                                                  resolve_market_api_url)
+from src.market.price_db import DEFAULT_MARKET_DB_PATH, MarketPriceDB
+
+MARKET_FEED_URL = "https://api.mockmarketdata.com/v1/market/prices"
+DEFAULT_PAGE_SIZE = 500
+OVERLAP_DAYS = 62  # re-request the last two months so late corrections and new regions are caught
+
+
+class MarketPriceIngestor:
+    """
+    Args:
+        db: Target database (data/market_prices.db by default)
+        base_url: Feed host; falls back to MARKET_API_BASE_URL, then the default feed URL
+        workers: Concurrent page requests (also the HTTP connection pool size)
+        page_size: Rows requested per page
+        session: Optional pre-configured requests session
+    """
+
+    def __init__(self, db: Optional[MarketPriceDB] = None, base_url: Optional[str] = None, workers: int = 4,
+                 page_size: int = DEFAULT_PAGE_SIZE, session: Optional[requests.Session] = None):
+        self.db = db or MarketPriceDB()
+        self.url = resolve_market_api_url(MARKET_FEED_URL, base_url)
+        self.workers = max(1, workers)
+        self.page_size = page_size
+        self.session = session or create_market_session(pool_size=self.workers)
+        self.last_report: Dict[str, Any] = {}
+
+    def _fetch_page(self, page: int, since: Optional[str]) -> Dict[str, Any]:
+        params = {"page": page, "page_size": self.page_size}
+        if since:
+            params["since"] = since
+        response = self.session.get(self.url, params=params, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def incremental_since(self, overlap_days: int = OVERLAP_DAYS) -> Optional[str]:
+        """Start date for an incremental ingest, or None for a full one (empty database)."""
+        latest = self.db.latest_date()
+        if latest is None:
+            return None
+        return (date.fromisoformat(latest) - timedelta(days=overlap_days)).isoformat()
+
+    def ingest(self, since: Optional[str] = None, full: bool = False) -> Dict[str, Any]:
+        """
+        Pull the feed and store new rows.
+
+        Args:
+            since: Only request rows after this ISO date (default: incremental_since())
+            full: Request the whole feed regardless of what is stored
+
+        Returns:
+            Report with pages, failed_pages, rows_received, rows_inserted, duplicates,
+            fetch/write/total seconds and rows_per_second
+        """
+        if not full and since is None:
+            since = self.incremental_since()
+        if full:
+            since = None
+
+        started = time.perf_counter()
+        report = {"url": self.url, "since": since, "pages": 0, "failed_pages": 0,
+                  "rows_received": 0, "rows_inserted": 0, "write_seconds": 0.0}
+
+        def store(payload: Dict[str, Any]):
+            rows: List[Dict] = payload.get("prices", [])
+            write_started = time.perf_counter()
+            inserted = self.db.upsert(rows, source=self.url)
+            report["write_seconds"] += time.perf_counter() - write_started
+            report["pages"] += 1
+            report["rows_received"] += len(rows)
+            report["rows_inserted"] += inserted
+
+        try:
+            first = self._fetch_page(0, since)
+        except Exception as e:
+            print(f"Error fetching market price feed: {e}")
+            report["failed_pages"] = 1
+            return self._finish(report, started)
+        store(first)
+
+        # The first page tells how many pages remain; fetch them concurrently and
+        # write each one as it arrives (SQLite has a single writer: this thread)
+        total = int(first.get("total", len(first.get("prices", []))))
+        remaining = range(1, -(-total // self.page_size)) if first.get("next_page") is not None else range(0)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._fetch_page, page, since): page for page in remaining}
+            for future in as_completed(futures):
+                try:
+                    store(future.result())
+                except Exception as e:
+                    print(f"Error fetching market price page {futures[future]}: {e}")
+                    report["failed_pages"] += 1
+        return self._finish(report, started)
+
+    def _finish(self, report: Dict[str, Any], started: float) -> Dict[str, Any]:
+        seconds = time.perf_counter() - started
+        report["duplicates"] = report["rows_received"] - report["rows_inserted"]
+        report["seconds"] = round(seconds, 3)
+        report["fetch_seconds"] = round(seconds - report["write_seconds"], 3)
+        report["write_seconds"] = round(report["write_seconds"], 3)
+        report["rows_per_second"] = round(report["rows_received"] / seconds, 1) if seconds > 0 else 0.0
+        self.last_report = report
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest market prices from the price feed into SQLite.")
+    parser.add_argument("--base-url", default=None, help="Feed host (default: MARKET_API_BASE_URL or the public feed)")
+    parser.add_argument("--db", default=None,
+                        help="Target database (default: data/market_prices.db; a temporary file with --mock)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--since", default=None, help="Only rows after this date (YYYY-MM-DD)")
+    parser.add_argument("--full", action="store_true", help="Ignore stored rows and request the whole feed")
+    parser.add_argument("--mock", action="store_true", help="Serve the feed from the local stand-in server")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    db_path = args.db or DEFAULT_MARKET_DB_PATH
+    if args.mock and args.db is None:
+        # Synthetic prices must not land in the database the dashboard and predictors read
+        db_path = os.path.join(tempfile.mkdtemp(prefix="market_prices_mock_"), "market_prices.db")
+        print(f"--mock without --db: writing to {db_path}")
+    if args.mock:
+        from src.data_collection.mock_market_feed import start_mock_market_server
+        server = start_mock_market_server()
+        base_url = server.base_url
+    try:
+        ingestor = MarketPriceIngestor(MarketPriceDB(db_path), base_url=base_url,
+                                       workers=args.workers, page_size=args.page_size)
+        for label, full in (("first run", args.full), ("re-run", False)):
+            report = ingestor.ingest(since=args.since, full=full)
+            print(f"{label}: {report['pages']} pages, {report['rows_received']} rows received, "
+                  f"{report['rows_inserted']} inserted, {report['duplicates']} duplicates, "
+                  f"{report['failed_pages']} failed pages in {report['seconds']:.2f} s "
+                  f"({report['rows_per_second']:.0f} rows/s; write {report['write_seconds']:.2f} s)")
+            if not args.mock:
+                break
+        print(f"{ingestor.db.count()} rows in {ingestor.db.path}, latest {ingestor.db.latest_date()}")
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
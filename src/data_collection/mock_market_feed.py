@@ -0,0 +1,130 @@
+"""
+Local stand-in for the paged market price feed.
+
+Serves ``/v1/market/prices`` with synthetic monthly prices per region and crop
+in the shape MarketPriceIngestor expects
+(src/data_collection/market_price_ingest.py), so ingestion can be exercised
+and benchmarked offline. The HTTP server and fault injection are the ones of
+the Open-Meteo mock (src/data_collection/mock_open_meteo.py).
+
+Usage:
+    python -m src.data_collection.mock_market_feed --port 8766 --latency-ms 40 --error-rate 0.02
+
+    # Point the ingestor at it
+    python -m src.data_collection.market_price_ingest --base-url http://127.0.0.1:8766 --db /tmp/prices.db
+
+Or in-process:
+    with start_mock_market_server() as server:
+        MarketPriceIngestor(base_url=server.base_url).ingest()
+"""
+
+import argparse
+import math
+import random
+import zlib
+from dataclasses import asdict
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+from src.data_collection.mock_open_meteo import FaultConfig, MockOpenMeteoServer
+
+MARKET_PRICES_PATH = "/v1/market/prices"
+MOCK_MARKET_REGIONS = ["yangon", "mandalay", "naypyidaw", "taunggyi", "pyin_oo_lwin", "bago"]
+MOCK_MARKET_CROPS = {
+    "Rice": 1500, "Maize": 1300, "Wheat": 1400, "Tomato": 1000, "Potato": 900, "Onion": 1100,
+    "Cabbage": 700, "Chili": 2500, "Groundnut": 2200, "Sesame": 3500, "Mango": 1800, "Banana": 800,
+    "Coffee": 2600, "Tea": 3000, "Apple": 3100, "Strawberry": 4200, "Citrus": 1900, "Cardamom": 4200,
+}
+
+
+def generate_market_prices(start: date, end: date, crops: Optional[Dict[str, float]] = None,
+                           regions: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Monthly (first-of-month) prices per region and crop between start and end:
+    base price with a regional offset, a slow drift, a yearly cycle and noise.
+    Deterministic for the same arguments.
+    """
+    crops = crops or MOCK_MARKET_CROPS
+    regions = regions or MOCK_MARKET_REGIONS
+    months = []
+    current = date(start.year, start.month, 1)
+    while current <= end:
+        months.append(current)
+        current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+
+    records = []
+    for region in regions:
+        for crop, base in crops.items():
+            rng = random.Random(zlib.crc32(f"{region},{crop}".encode("utf-8")))
+            level = base * rng.uniform(0.9, 1.1)
+            phase = rng.uniform(0, 2 * math.pi)
+            for i, month in enumerate(months):
+                price = level * (1 + 0.004 * i + 0.08 * math.sin(2 * math.pi * month.month / 12 + phase)
+                                 + rng.gauss(0, 0.02))
+                records.append({"date": month.isoformat(), "region": region,
+                                "crop_name": crop, "price_per_kg": round(price, 2)})
+    records.sort(key=lambda r: (r["date"], r["region"], r["crop_name"]))
+    return records
+
+
+def market_prices_route(records: Optional[List[Dict]] = None, default_page_size: int = 500) -> Callable:
+    """
+    Handler for a paged price feed. Query parameters: since (only rows with a
+    later date), page (0-based) and page_size. Without `records`, serves
+    generate_market_prices() from January 2020 up to the current month.
+    """
+    generated: Dict[date, List[Dict]] = {}
+
+    def handle(params: Dict[str, List[str]]) -> Dict:
+        rows = records
+        if rows is None:
+            today = date.today()
+            if today not in generated:
+                generated.clear()
+                generated[today] = generate_market_prices(date(2020, 1, 1), today)
+            rows = generated[today]
+        since = params.get("since", [None])[0]
+        if since:
+            since = date.fromisoformat(since).isoformat()
+            rows = [r for r in rows if r["date"] > since]
+        page = int(params.get("page", ["0"])[0])
+        page_size = int(params.get("page_size", [str(default_page_size)])[0])
+        if page < 0 or page_size <= 0:
+            raise ValueError("Parameters 'page' and 'page_size' must be positive")
+        chunk = rows[page * page_size:(page + 1) * page_size]
+        has_more = (page + 1) * page_size < len(rows)
+        return {"prices": chunk, "page": page, "total": len(rows), "next_page": page + 1 if has_more else None}
+    return handle
+
+
+def start_mock_market_server(config: Optional[FaultConfig] = None, host: str = "127.0.0.1",
+                             port: int = 0, records: Optional[List[Dict]] = None) -> MockOpenMeteoServer:
+    """Start the mock price feed on a background thread (port 0 picks a free port)."""
+    routes = {MARKET_PRICES_PATH: market_prices_route(records)}
+    return MockOpenMeteoServer(host=host, port=port, config=config, routes=routes).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local market price feed stand-in with latency and fault injection.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    config = FaultConfig(latency_ms=args.latency_ms, error_rate=args.error_rate, seed=args.seed)
+    server = MockOpenMeteoServer(host=args.host, port=args.port, config=config, verbose=args.verbose,
+                                 routes={MARKET_PRICES_PATH: market_prices_route()})
+    print(f"Mock market price feed serving on {server.base_url}{MARKET_PRICES_PATH} with {asdict(config)}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
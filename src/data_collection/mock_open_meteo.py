@@ -0,0 +1,417 @@
+"""
+Local stand-in for the Open-Meteo forecast and archive APIs.
+
+Serves ``/v1/forecast`` and ``/v1/archive`` with synthetic but realistic
+payloads in the same JSON shape Open-Meteo returns, so the weather clients
+(`get_open_meteo_weather`, `fetch_historical_weather` and
+`PlantingDatePredictor`) can be exercised and benchmarked offline. Other
+mocks reuse its HTTP and fault-injection layer with their own routes (see
+src/data_collection/mock_market_feed.py).
+
+Payloads are deterministic for a given location and date range, and the
+server can inject latency, random 5xx errors and periodic 5xx bursts.
+
+Usage:
+    python -m src.data_collection.mock_open_meteo --port 8765 --latency-ms 40 --error-rate 0.02
+
+    # Point the clients at it
+    OPEN_METEO_BASE_URL=http://127.0.0.1:8765 streamlit run app/dashboard.py
+
+Or in-process, e.g. from a benchmark:
+    with start_mock_server(FaultConfig(latency_ms=20)) as server:
+        get_open_meteo_weather(16.87, 96.19, base_url=server.base_url)
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+ERROR_STATUSES = [500, 502, 503, 504]
+
+HOURLY_UNITS = {
+    "temperature_2m": "°C",
+    "relativehumidity_2m": "%",
+    "relative_humidity_2m": "%",
+    "dewpoint_2m": "°C",
+    "precipitation": "mm",
+    "windspeed_10m": "km/h",
+    "winddirection_10m": "°",
+    "soil_temperature_0cm": "°C",
+    "soil_moisture_0_1cm": "m³/m³",
+    "evapotranspiration": "mm",
+    "weathercode": "wmo code",
+    "pressure_msl": "hPa",
+    "cloudcover": "%",
+}
+
+DAILY_UNITS = {
+    "temperature_2m_max": "°C",
+    "temperature_2m_min": "°C",
+    "temperature_2m_mean": "°C",
+    "precipitation_sum": "mm",
+    "sunrise": "iso8601",
+    "sunset": "iso8601",
+    "weathercode": "wmo code",
+}
+
+
+@dataclass
+class FaultConfig:
+    """
+    Latency and failure behaviour of the mock server.
+
+    Attributes:
+        latency_ms: Fixed delay added to every response
+        latency_jitter_ms: Extra uniformly distributed delay (0..jitter)
+        error_rate: Probability that a request fails with a random 5xx status
+        burst_every: Every N-th request starts a burst of failures (0 disables bursts)
+        burst_length: Number of consecutive requests that fail in each burst
+        burst_status: HTTP status returned during a burst
+        seed: Seed for the fault RNG, so runs are reproducible
+    """
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    burst_every: int = 0
+    burst_length: int = 0
+    burst_status: int = 503
+    seed: int = 0
+
+
+class FaultInjector:
+    """Decides, request by request, whether to delay and/or fail."""
+
+    def __init__(self, config: FaultConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+
+    def next_fault(self) -> Dict:
+        """Return {'delay': seconds, 'status': int or None} for the next request."""
+        cfg = self.config
+        with self._lock:
+            n = self.request_count
+            self.request_count += 1
+            delay = cfg.latency_ms / 1000.0
+            if cfg.latency_jitter_ms > 0:
+                delay += self._rng.uniform(0, cfg.latency_jitter_ms) / 1000.0
+
+            status = None
+            if cfg.burst_every > 0 and cfg.burst_length > 0 and n % cfg.burst_every < cfg.burst_length and n >= cfg.burst_every:
+                status = cfg.burst_status
+            elif cfg.error_rate > 0 and self._rng.random() < cfg.error_rate:
+                status = self._rng.choice(ERROR_STATUSES)
+            if status is not None:
+                self.error_count += 1
+        return {"delay": delay, "status": status}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"requests": self.request_count, "errors": self.error_count}
+
+
+# --- Synthetic weather model ---
+def _location_rng(lat: float, lon: float, start: date, salt: str) -> random.Random:
+    """RNG seeded from location, start date and variable so payloads are reproducible."""
+    key = f"{lat:.4f},{lon:.4f},{start.isoformat()},{salt}"
+    return random.Random(zlib.crc32(key.encode("utf-8")))
+
+
+def _monsoon_factor(doy: int) -> float:
+    """0 in the dry season, rising to 1 at the peak of the May-October monsoon."""
+    if 135 <= doy <= 305:
+        return math.sin(math.pi * (doy - 135) / 170)
+    return 0.0
+
+
+def _daily_mean_temp(lat: float, doy: int) -> float:
+    # Warmer in the south and in April/May, cooler in the northern hills and in January
+    return 27.0 - 0.35 * (lat - 16.0) + 4.0 * math.sin(2 * math.pi * (doy - 30) / 365.25)
+
+
+def generate_hourly(lat: float, lon: float, start: date, end: date) -> Dict[str, List]:
+    """Generate the full set of hourly variables between start and end (inclusive)."""
+    rng = _location_rng(lat, lon, start, "hourly")
+    out: Dict[str, List] = {k: [] for k in ["time"] + list(HOURLY_UNITS)}
+    day = start
+    while day <= end:
+        doy = day.timetuple().tm_yday
+        mean_t = _daily_mean_temp(lat, doy)
+        monsoon = _monsoon_factor(doy)
+        rain_prob = 0.02 + 0.15 * monsoon
+        for hour in range(24):
+            temp = mean_t + 5.0 * math.sin(2 * math.pi * (hour - 9) / 24) + rng.gauss(0, 1.0)
+            humidity = min(100.0, max(20.0, 70 + 15 * monsoon - 1.5 * (temp - mean_t) + rng.gauss(0, 4)))
+            raining = rng.random() < rain_prob
+            precip = round(rng.expovariate(1 / 2.5), 1) if raining else 0.0
+            # Magnus formula, matching what the real API derives
+            gamma = (17.27 * temp) / (237.7 + temp) + math.log(humidity / 100.0)
+            dew = 237.7 * gamma / (17.27 - gamma)
+            daylight = max(0.0, math.sin(math.pi * (hour - 6) / 12))
+            cloud = min(100, max(0, int(humidity - 40 + (40 if raining else 0) + rng.gauss(0, 10))))
+            if raining:
+                code = 63 if precip > 2.5 else 61
+            else:
+                code = 3 if cloud > 85 else 2 if cloud > 50 else 1 if cloud > 20 else 0
+
+            out["time"].append(f"{day.isoformat()}T{hour:02d}:00")
+            out["temperature_2m"].append(round(temp, 1))
+            out["relativehumidity_2m"].append(int(round(humidity)))
+            out["relative_humidity_2m"].append(int(round(humidity)))
+            out["dewpoint_2m"].append(round(dew, 1))
+            out["precipitation"].append(precip)
+            out["windspeed_10m"].append(round(max(0.0, 6 + 4 * monsoon + rng.gauss(0, 2.5)), 1))
+            out["winddirection_10m"].append(int(rng.uniform(0, 360)))
+            out["soil_temperature_0cm"].append(round(mean_t + 2 + 0.6 * (temp - mean_t), 1))
+            out["soil_moisture_0_1cm"].append(round(0.18 + 0.2 * monsoon + (0.03 if raining else 0.0), 3))
+            out["evapotranspiration"].append(round(0.35 * daylight * (1 - cloud / 200), 2))
+            out["weathercode"].append(code)
+            out["pressure_msl"].append(round(1010 - 4 * monsoon + rng.gauss(0, 1.2), 1))
+            out["cloudcover"].append(cloud)
+        day += timedelta(days=1)
+    return out
+
+
+def generate_daily(lat: float, lon: float, start: date, end: date, hourly: Dict[str, List]) -> Dict[str, List]:
+    """Aggregate the hourly series into the daily variables, keeping both consistent."""
+    out: Dict[str, List] = {k: [] for k in ["time"] + list(DAILY_UNITS)}
+    n_days = (end - start).days + 1
+    for i in range(n_days):
+        day = start + timedelta(days=i)
+        temps = hourly["temperature_2m"][i * 24:(i + 1) * 24]
+        precip = hourly["precipitation"][i * 24:(i + 1) * 24]
+        codes = hourly["weathercode"][i * 24:(i + 1) * 24]
+        doy = day.timetuple().tm_yday
+        # Day length varies by roughly +/- 45 minutes over the year at these latitudes
+        half_day_min = 360 + 45 * math.sin(2 * math.pi * (doy - 80) / 365.25)
+        sunrise = datetime.combine(day, datetime.min.time()) + timedelta(minutes=720 - half_day_min - 20)
+        sunset = datetime.combine(day, datetime.min.time()) + timedelta(minutes=720 + half_day_min - 20)
+
+        out["time"].append(day.isoformat())
+        out["temperature_2m_max"].append(max(temps))
+        out["temperature_2m_min"].append(min(temps))
+        out["temperature_2m_mean"].append(round(sum(temps) / len(temps), 1))
+        out["precipitation_sum"].append(round(sum(precip), 1))
+        out["sunrise"].append(sunrise.strftime("%Y-%m-%dT%H:%M"))
+        out["sunset"].append(sunset.strftime("%Y-%m-%dT%H:%M"))
+        out["weathercode"].append(max(codes))
+    return out
+
+
+def build_payload(lat: float, lon: float, start: date, end: date, hourly_vars: List[str],
+                  daily_vars: List[str], timezone: str = "GMT", current_weather: bool = False) -> Dict:
+    """Build an Open-Meteo style response body for the requested variables."""
+    unknown = [v for v in hourly_vars if v not in HOURLY_UNITS] + [v for v in daily_vars if v not in DAILY_UNITS]
+    if unknown:
+        raise ValueError(f"Cannot initialize WeatherVariable from invalid String value {unknown[0]}")
+
+    started = time.perf_counter()
+    hourly = generate_hourly(lat, lon, start, end)
+    payload = {
+        "latitude": round(lat, 4),
+        "longitude": round(lon, 4),
+        "utc_offset_seconds": 23400 if timezone in ("Asia/Yangon", "auto") else 0,
+        "timezone": "Asia/Yangon" if timezone == "auto" else timezone,
+        "timezone_abbreviation": "MMT" if timezone in ("Asia/Yangon", "auto") else "GMT",
+        "elevation": 25.0,
+    }
+    if current_weather:
+        now_idx = min(len(hourly["time"]) - 1, max(0, ((date.today() - start).days * 24) + datetime.now().hour))
+        payload["current_weather"] = {
+            "temperature": hourly["temperature_2m"][now_idx],
+            "windspeed": hourly["windspeed_10m"][now_idx],
+            "winddirection": hourly["winddirection_10m"][now_idx],
+            "weathercode": hourly["weathercode"][now_idx],
+            "is_day": 1 if 6 <= now_idx % 24 < 18 else 0,
+            "time": hourly["time"][now_idx],
+        }
+    if hourly_vars:
+        payload["hourly_units"] = {"time": "iso8601", **{v: HOURLY_UNITS[v] for v in hourly_vars}}
+        payload["hourly"] = {"time": hourly["time"], **{v: hourly[v] for v in hourly_vars}}
+    if daily_vars:
+        daily = generate_daily(lat, lon, start, end, hourly)
+        payload["daily_units"] = {"time": "iso8601", **{v: DAILY_UNITS[v] for v in daily_vars}}
+        payload["daily"] = {"time": daily["time"], **{v: daily[v] for v in daily_vars}}
+    payload["generationtime_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return payload
+
+
+# --- HTTP layer ---
+def _split_vars(params: Dict[str, List[str]], name: str) -> List[str]:
+    values = []
+    for raw in params.get(name, []):
+        values.extend(v.strip() for v in raw.split(",") if v.strip())
+    return values
+
+
+def _date_range(params: Dict[str, List[str]], archive: bool) -> tuple:
+    start = params.get("start_date", [None])[0]
+    end = params.get("end_date", [None])[0]
+    if start and end:
+        return date.fromisoformat(start), date.fromisoformat(end)
+    if archive:
+        raise ValueError("Parameter 'start_date' and 'end_date' are required")
+    past_days = int(params.get("past_days", ["0"])[0])
+    forecast_days = int(params.get("forecast_days", ["7"])[0])
+    today = date.today()
+    return today - timedelta(days=past_days), today + timedelta(days=forecast_days - 1)
+
+
+class _MockOpenMeteoHandler(BaseHTTPRequestHandler):
+    server_version = "MockOpenMeteo/1.0"
+
+    def log_message(self, format, *args):
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: Dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == "/stats":
+            self._send_json(200, self.server.injector.stats())
+            return
+
+        routes: Dict[str, Callable] = getattr(self.server, "routes", {})
+        if parsed.path not in routes:
+            self._send_json(404, {"error": True, "reason": f"Unknown endpoint {parsed.path}"})
+            return
+
+        fault = self.server.injector.next_fault()
+        if fault["delay"] > 0:
+            time.sleep(fault["delay"])
+        if fault["status"] is not None:
+            self._send_json(fault["status"], {"error": True, "reason": "Injected upstream failure"})
+            return
+
+        try:
+            body = routes[parsed.path](parse_qs(parsed.query))
+        except (ValueError, KeyError) as e:
+            self._send_json(400, {"error": True, "reason": str(e)})
+            return
+        self._send_json(200, body)
+
+
+def _weather_route(archive: bool) -> Callable:
+    def handle(params: Dict[str, List[str]]) -> Dict:
+        lat = float(params["latitude"][0])
+        lon = float(params["longitude"][0])
+        start, end = _date_range(params, archive)
+        if end < start:
+            raise ValueError("Parameter 'start_date' must be before 'end_date'")
+        current = params.get("current_weather", ["false"])[0].lower() == "true" and not archive
+        return build_payload(lat, lon, start, end,
+                             _split_vars(params, "hourly"), _split_vars(params, "daily"),
+                             timezone=params.get("timezone", ["GMT"])[0], current_weather=current)
+    return handle
+
+
+class MockOpenMeteoServer:
+    """
+    A ThreadingHTTPServer running the mock API in a background thread.
+
+    Args:
+        routes: JSON endpoints (path -> handler of the parsed query); defaults to
+            the Open-Meteo /v1/forecast and /v1/archive routes
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[FaultConfig] = None,
+                 verbose: bool = False, routes: Optional[Dict[str, Callable]] = None):
+        self.config = config or FaultConfig()
+        self.httpd = ThreadingHTTPServer((host, port), _MockOpenMeteoHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.injector = FaultInjector(self.config)
+        self.httpd.verbose = verbose
+        self.httpd.routes = dict(routes) if routes is not None else {
+            "/v1/forecast": _weather_route(archive=False),
+            "/v1/archive": _weather_route(archive=True),
+        }
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_route(self, path: str, handler: Callable[[Dict[str, List[str]]], Dict]):
+        """Serve another JSON endpoint through the same fault injection."""
+        self.httpd.routes[path] = handler
+
+    def stats(self) -> Dict:
+        return self.httpd.injector.stats()
+
+    def start(self) -> "MockOpenMeteoServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self if self._thread is not None else self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def start_mock_server(config: Optional[FaultConfig] = None, host: str = "127.0.0.1", port: int = 0) -> MockOpenMeteoServer:
+    """Start the mock server on a background thread (port 0 picks a free port)."""
+    return MockOpenMeteoServer(host=host, port=port, config=config).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Open-Meteo stand-in with latency and fault injection.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=int, default=0)
+    parser.add_argument("--burst-length", type=int, default=0)
+    parser.add_argument("--burst-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    config = FaultConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        burst_every=args.burst_every,
+        burst_length=args.burst_length,
+        burst_status=args.burst_status,
+        seed=args.seed,
+    )
+    server = MockOpenMeteoServer(host=args.host, port=args.port, config=config, verbose=args.verbose)
+    print(f"Mock Open-Meteo serving on {server.base_url} with {asdict(config)}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
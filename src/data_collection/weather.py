@@ -1,18 +1,44 @@
+import os
 import requests
-from typing import Any
+from typing import Any, Optional
+from urllib.parse import urlparse
 from datetime import datetime, timedelta
 import pytz
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from src.utils.agro_meteorology import derive_weather_metrics
 
-def get_open_meteo_weather(lat: float, lon: float) -> dict[str, Any]:
+FORECAST_API_URL = "https://api.open-meteo.com/v1/forecast"
+
+
+def resolve_open_meteo_url(default_url: str, base_url: Optional[str] = None) -> str:
+    """
+    Re-root an Open-Meteo endpoint on `base_url`, e.g. the local stand-in server
+    (src/data_collection/mock_open_meteo.py). Falls back to the OPEN_METEO_BASE_URL
+    environment variable, and to `default_url` when neither is set.
+    """
+    base_url = base_url or os.environ.get("OPEN_METEO_BASE_URL")
+    if not base_url:
+        return default_url
+    return base_url.rstrip("/") + urlparse(default_url).path
+
+
+def _first_value(values, decimals: int = 1) -> Optional[float]:
+    """First element of a derived array as a rounded float, or None if missing."""
+    if len(values) == 0 or values[0] != values[0]:  # empty or NaN
+        return None
+    return round(float(values[0]), decimals)
+
+
+def get_open_meteo_weather(lat: float, lon: float, base_url: Optional[str] = None) -> dict[str, Any]:
     """
     Fetch full weather details from Open-Meteo, including soil temperature, seasonal averages, and climate zones.
     Use comma-separated values for the 'hourly' and 'daily' parameters to avoid repeated keys.
     Also fetches 7-day forecast data for visualization.
+    Pass `base_url` (or set OPEN_METEO_BASE_URL) to target a different host such as the local mock server.
     """
-    url = "https://api.open-meteo.com/v1/forecast"
+    url = resolve_open_meteo_url(FORECAST_API_URL, base_url)
 
     # Get today and 7 days in the future for forecast
     today = datetime.now()
@@ -34,6 +60,7 @@ def get_open_meteo_weather(lat: float, lon: float) -> dict[str, Any]:
     s = requests.Session()
     retries = Retry(total=5, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504], connect=5)
     s.mount('https://', HTTPAdapter(max_retries=retries))
+    s.mount('http://', HTTPAdapter(max_retries=retries))
 
     try:
         response = s.get(url, params=params, timeout=10)
@@ -55,6 +82,8 @@ def get_open_meteo_weather(lat: float, lon: float) -> dict[str, Any]:
         hourly_data = data.get("hourly", {})
         # Get the latest weather code from the hourly data
         weather_code = hourly_data.get('weathercode', [None])[-1] if hourly_data.get('weathercode') else None
+        # Derived agro-met metrics over the full hourly/daily arrays, computed once per fetch
+        derived = derive_weather_metrics(hourly_data, daily_data)
         # Prepare 7-day forecast data
         forecast_dates = data.get("daily", {}).get("time", [])
         forecast_max_temps = daily_data.get("temperature_2m_max", [])
@@ -82,6 +111,9 @@ def get_open_meteo_weather(lat: float, lon: float) -> dict[str, Any]:
             "soil_moisture": hourly_data.get("soil_moisture_0_1cm", [None])[0],
             "evaporation_rate": hourly_data.get("evapotranspiration", [None])[0],
             "pressure": hourly_data.get("pressure_msl", [None])[0],
+            "dewpoint": _first_value(derived["dew_point"]),
+            "vpd": _first_value(derived["vpd"], 2),
+            "heat_index": _first_value(derived["heat_index"]),
             "sunrise": daily_data.get("sunrise", ["N/A"])[0],  # Get first day's sunrise
             "sunset": daily_data.get("sunset", ["N/A"])[0],    # Get first day's sunset
             "weather_code": weather_code,  # Use current hour's weather code
@@ -93,7 +125,10 @@ def get_open_meteo_weather(lat: float, lon: float) -> dict[str, Any]:
                 "max_temps": forecast_max_temps,
                 "min_temps": forecast_min_temps,
                 "precipitation": forecast_precipitation,
-                "weather_codes": forecast_weather_codes
+                "weather_codes": forecast_weather_codes,
+                "gdd": derived["gdd"].round(1).tolist(),
+                "vpd_mean": derived["vpd_mean"].round(2).tolist(),
+                "heat_stress_hours": derived["heat_stress_hours"].tolist()
             }
         }
 
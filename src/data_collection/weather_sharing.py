@@ -0,0 +1,285 @@
+"""
+Spatial nearest-neighbour weather sharing across nearby townships.
+
+Many townships in 'Full Data.txt' sit within a few kilometres of each other,
+and the Open-Meteo grid is coarser than that anyway. `SharedWeatherFetcher`
+keeps a haversine ball tree over the grid points it has already fetched:
+any township within `radius_km` of fetched points reuses them (nearest, or
+inverse-distance weighted), and only uncovered townships trigger a request.
+
+Usage:
+    fetcher = SharedWeatherFetcher(get_open_meteo_weather, radius_km=15)
+    weather = fetcher.fetch_many(df['Latitude'], df['Longitude'])
+    print(fetcher.report())
+
+    # Plan only (no network): how many requests a nationwide run needs
+    python -m src.data_collection.weather_sharing --radius-km 10 25 50
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.utils.geo import build_haversine_tree, query_radius_km
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+FULL_DATA_PATH = os.path.join(PROJECT_ROOT, "Full Data.txt")
+
+
+def load_township_points(file_path: str = FULL_DATA_PATH) -> pd.DataFrame:
+    """
+    Load township names and coordinates from 'Full Data.txt'.
+    """
+    df = pd.read_csv(file_path)
+    df.columns = df.columns.str.strip()
+    return df[["Township", "Region", "Latitude", "Longitude"]].dropna(subset=["Latitude", "Longitude"]).reset_index(drop=True)
+
+
+def plan_shared_fetches(lats: Sequence[float], lons: Sequence[float], radius_km: float) -> np.ndarray:
+    """
+    Greedily pick a set of representative points so that every input point is
+    within `radius_km` of at least one representative.
+
+    Returns:
+        Array of indices into the input that need to be fetched.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    if len(lats) == 0:
+        return np.array([], dtype=int)
+    tree = build_haversine_tree(lats, lons)
+    neighbours, _ = query_radius_km(tree, lats, lons, radius_km)
+    covered = np.zeros(len(lats), dtype=bool)
+    representatives = []
+    for i in range(len(lats)):
+        if covered[i]:
+            continue
+        representatives.append(i)
+        covered[neighbours[i]] = True
+    return np.asarray(representatives, dtype=int)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+
+
+def _is_categorical_field(key: Optional[str]) -> bool:
+    """Codes and flags (weather_code, is_day, ...) cannot be averaged."""
+    key = str(key or "").lower()
+    return "code" in key or key.endswith("is_day")
+
+
+def _is_direction_field(key: Optional[str]) -> bool:
+    """Compass directions in degrees (wind_direction_10m, winddirection_10m_dominant, ...)."""
+    return "direction" in str(key or "").lower()
+
+
+def _mean_direction(weights: np.ndarray, degrees: np.ndarray) -> np.ndarray:
+    """Weighted mean of angles (degrees, along the first axis) as the direction of the mean unit vector."""
+    radians = np.radians(degrees)
+    sin = np.tensordot(weights, np.sin(radians), axes=1)
+    cos = np.tensordot(weights, np.cos(radians), axes=1)
+    return np.round(np.degrees(np.arctan2(sin, cos)), 6) % 360
+
+
+def _combine(weights: np.ndarray, values: np.ndarray, key: Optional[str]) -> np.ndarray:
+    if _is_direction_field(key):
+        return _mean_direction(weights, values)
+    return np.tensordot(weights, values, axes=1)
+
+
+def interpolate_weather(payloads: List[Any], weights: np.ndarray, key: Optional[str] = None) -> Any:
+    """
+    Inverse-distance-weighted combination of weather payloads.
+
+    Numeric scalars and equal-length numeric lists are averaged; directions
+    (fields named '*direction*') are averaged as unit vectors. Codes and flags
+    (fields named '*code*' or '*is_day') and anything else (strings, mismatched
+    shapes) are taken from the first (nearest) payload. DataFrames (e.g. from
+    fetch_historical_weather) are combined column-wise the same way when all
+    share the same 'ds' index.
+
+    Args:
+        payloads: Payloads of the neighbours, nearest first
+        weights: One weight per payload
+        key: Field name of the payloads (set when recursing into dicts)
+    """
+    first = payloads[0]
+    if len(payloads) == 1 or _is_categorical_field(key):
+        return first
+    weights = np.asarray(weights, dtype=float)
+    weights = weights / weights.sum()
+
+    if isinstance(first, pd.DataFrame):
+        if not all(isinstance(p, pd.DataFrame) and p.shape == first.shape for p in payloads):
+            return first
+        if "ds" in first.columns and not all((p["ds"].values == first["ds"].values).all() for p in payloads[1:]):
+            return first
+        out = first.copy()
+        numeric = [c for c in first.columns
+                   if c != "ds" and pd.api.types.is_numeric_dtype(first[c]) and not _is_categorical_field(c)]
+        for column in numeric:
+            stacked = np.stack([p[column].to_numpy(dtype=float) for p in payloads])
+            out[column] = _combine(weights, stacked, column)
+        return out
+
+    if isinstance(first, dict):
+        return {k: interpolate_weather([p.get(k) if isinstance(p, dict) else None for p in payloads], weights, key=k)
+                if all(isinstance(p, dict) and k in p for p in payloads) else value
+                for k, value in first.items()}
+
+    if _is_number(first) and all(_is_number(p) for p in payloads):
+        return float(_combine(weights, np.asarray(payloads, dtype=float), key))
+
+    if isinstance(first, list) and first and all(isinstance(p, list) and len(p) == len(first) for p in payloads):
+        if all(_is_number(v) for p in payloads for v in p):
+            return _combine(weights, np.asarray(payloads, dtype=float), key).round(2).tolist()
+
+    return first
+
+
+class SharedWeatherFetcher:
+    """
+    Wraps a `fetch_fn(lat, lon)` weather client so that nearby locations share requests.
+
+    Args:
+        fetch_fn: Weather client, e.g. get_open_meteo_weather or a lambda around
+            fetch_historical_weather. Returning None/empty or raising counts as a failure.
+        radius_km: Locations within this distance of a fetched grid point reuse it
+        mode: 'idw' to interpolate between fetched neighbours, 'nearest' to copy the closest
+        max_neighbours: Neighbours used for IDW
+        idw_power: Distance exponent for IDW weights
+        max_workers: Concurrent requests when fetching representatives
+    """
+
+    def __init__(self, fetch_fn: Callable[[float, float], Any], radius_km: float = 10.0, mode: str = "idw",
+                 max_neighbours: int = 4, idw_power: float = 2.0, max_workers: int = 1):
+        if mode not in ("idw", "nearest"):
+            raise ValueError(f"Unknown sharing mode: {mode}")
+        self.fetch_fn = fetch_fn
+        self.radius_km = radius_km
+        self.mode = mode
+        self.max_neighbours = max_neighbours
+        self.idw_power = idw_power
+        self.max_workers = max_workers
+
+        self._grid_lats: List[float] = []
+        self._grid_lons: List[float] = []
+        self._grid_payloads: List[Any] = []
+        self._tree = None
+        self.stats = {
+            "locations_requested": 0,
+            "requests_issued": 0,
+            "requests_failed": 0,
+            "requests_saved": 0,
+            "fetch_seconds": 0.0,
+        }
+
+    # --- grid bookkeeping ---
+    def _rebuild_tree(self):
+        self._tree = build_haversine_tree(self._grid_lats, self._grid_lons) if self._grid_lats else None
+
+    def _covered_mask(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        if self._tree is None:
+            return np.zeros(len(lats), dtype=bool)
+        idx, _ = query_radius_km(self._tree, lats, lons, self.radius_km)
+        return np.array([len(i) > 0 for i in idx], dtype=bool)
+
+    def _fetch_one(self, lat: float, lon: float):
+        try:
+            payload = self.fetch_fn(lat, lon)
+        except Exception as e:
+            print(f"Error fetching weather for ({lat}, {lon}): {e}")
+            return None
+        if payload is None or (isinstance(payload, pd.DataFrame) and payload.empty):
+            return None
+        return payload
+
+    def _fetch_representatives(self, lats: np.ndarray, lons: np.ndarray):
+        started = time.perf_counter()
+        if self.max_workers > 1 and len(lats) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                payloads = list(pool.map(self._fetch_one, lats, lons))
+        else:
+            payloads = [self._fetch_one(lat, lon) for lat, lon in zip(lats, lons)]
+        self.stats["fetch_seconds"] += time.perf_counter() - started
+        self.stats["requests_issued"] += len(lats)
+
+        for lat, lon, payload in zip(lats, lons, payloads):
+            if payload is None:
+                self.stats["requests_failed"] += 1
+                continue
+            self._grid_lats.append(float(lat))
+            self._grid_lons.append(float(lon))
+            self._grid_payloads.append(payload)
+        self._rebuild_tree()
+
+    def _combine(self, neighbour_idx: np.ndarray, distances: np.ndarray):
+        if len(neighbour_idx) == 0:
+            return None
+        if self.mode == "nearest" or distances[0] < 1e-6:
+            return self._grid_payloads[neighbour_idx[0]]
+        neighbour_idx = neighbour_idx[:self.max_neighbours]
+        weights = 1.0 / np.power(distances[:self.max_neighbours], self.idw_power)
+        return interpolate_weather([self._grid_payloads[i] for i in neighbour_idx], weights)
+
+    # --- public API ---
+    def fetch_many(self, lats: Sequence[float], lons: Sequence[float]) -> List[Any]:
+        """
+        Return one weather payload per location (None where nothing could be fetched),
+        issuing requests only for locations not covered by already fetched grid points.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        self.stats["locations_requested"] += len(lats)
+
+        uncovered = np.flatnonzero(~self._covered_mask(lats, lons))
+        if len(uncovered):
+            reps = uncovered[plan_shared_fetches(lats[uncovered], lons[uncovered], self.radius_km)]
+            self._fetch_representatives(lats[reps], lons[reps])
+            self.stats["requests_saved"] += len(lats) - len(reps)
+        else:
+            self.stats["requests_saved"] += len(lats)
+
+        if self._tree is None:
+            return [None] * len(lats)
+        neighbours, distances = query_radius_km(self._tree, lats, lons, self.radius_km)
+        return [self._combine(idx, dist) for idx, dist in zip(neighbours, distances)]
+
+    def fetch(self, lat: float, lon: float) -> Any:
+        """Single-location convenience wrapper around fetch_many."""
+        return self.fetch_many([lat], [lon])[0]
+
+    def report(self) -> Dict[str, Any]:
+        """Request counters, including how many requests sharing avoided."""
+        requested = self.stats["locations_requested"]
+        return {
+            **self.stats,
+            "grid_points": len(self._grid_payloads),
+            "saved_ratio": round(self.stats["requests_saved"] / requested, 3) if requested else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report weather requests needed for all townships with spatial sharing.")
+    parser.add_argument("--radius-km", type=float, nargs="+", default=[5.0, 10.0, 25.0, 50.0])
+    parser.add_argument("--data", default=FULL_DATA_PATH)
+    args = parser.parse_args()
+
+    points = load_township_points(args.data)
+    print(f"{len(points)} townships in {os.path.basename(args.data)}")
+    for radius in args.radius_km:
+        started = time.perf_counter()
+        reps = plan_shared_fetches(points["Latitude"], points["Longitude"], radius)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"radius {radius:>5.1f} km: {len(reps):>4} requests, {len(points) - len(reps):>4} saved "
+              f"({1 - len(reps) / len(points):.0%}), planned in {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# src/market/fast_forecast.py
+"""
+NumPy forecasting engine for short monthly price series.
+
+Every series is placed on a common monthly grid (right-aligned, NaN-padded)
+and all of them are filtered together as one (series × parameter grid)
+array:
+
+- 'damped': additive damped-trend exponential smoothing (Holt)
+- 'holt_winters': the same plus additive yearly seasonality
+- 'seasonal_naive': same month last year (last value when there is no full year)
+- 'auto': Holt-Winters for series with two full seasons, damped trend otherwise
+
+Smoothing parameters are chosen per series by one-step-ahead squared error
+over a small grid. Prediction intervals use the analytical ETS variance with
+normal quantiles. Prophet (src/market/price_predictor) is the slow path.
+"""
+import threading
+import warnings
+from itertools import product
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.market.price_store import MarketPriceStore, get_price_store
+
+SEASON_LENGTH = 12
+METHODS = ("auto", "damped", "holt_winters", "seasonal_naive")
+
+ALPHAS = (0.1, 0.3, 0.5, 0.7, 0.9)
+BETAS = (0.01, 0.1, 0.3)
+PHIS = (0.8, 0.9, 0.98)
+GAMMAS = (0.05, 0.2)
+
+_cache: Dict[Tuple, pd.DataFrame] = {}
+_cache_lock = threading.Lock()
+
+
+def to_monthly_matrix(frame: pd.DataFrame, keys: Sequence[str] = ("region", "crop_name"),
+                      date_col: str = "date", value_col: str = "price_per_kg"):
+    """
+    Stack long-format observations into a (series, months) matrix aligned on each
+    series' last month; several observations in one month are averaged.
+
+    Returns:
+        (index DataFrame of the series keys with 'last_period' and 'n_obs', matrix)
+    """
+    keys = list(keys)
+    df = frame[keys + [date_col, value_col]].dropna(subset=[date_col, value_col]).copy()
+    dates = pd.to_datetime(df[date_col])
+    df["period"] = dates.dt.year * 12 + dates.dt.month - 1
+    df = df.groupby(keys + ["period"], sort=True)[value_col].mean().reset_index()
+
+    series_id = df.groupby(keys, sort=False).ngroup().to_numpy()
+    periods = df["period"].to_numpy()
+    n_series = int(series_id.max()) + 1 if len(series_id) else 0
+    first = np.full(n_series, np.iinfo(np.int64).max)
+    last = np.full(n_series, np.iinfo(np.int64).min)
+    np.minimum.at(first, series_id, periods)
+    np.maximum.at(last, series_id, periods)
+    width = int((last - first).max()) + 1 if n_series else 0
+
+    matrix = np.full((n_series, width), np.nan)
+    matrix[series_id, periods - last[series_id] + width - 1] = df[value_col].to_numpy(dtype=float)
+
+    index = df.groupby(keys, sort=False).size().rename("n_obs").reset_index()
+    index["last_period"] = last
+    return index, matrix
+
+
+def _param_grid(seasonal: bool) -> np.ndarray:
+    gammas = GAMMAS if seasonal else (0.0,)
+    return np.array(list(product(ALPHAS, BETAS, PHIS, gammas)))  # (G, 4)
+
+
+def _ets_filter(Y: np.ndarray, params: np.ndarray, m: int, seasonal: bool):
+    """
+    Run additive damped-trend ETS (optionally seasonal) over every series and
+    parameter combination at once.
+
+    Returns:
+        level, trend (S, G), season (S, G, m), sse and error count (S, G)
+    """
+    S, T = Y.shape
+    G = len(params)
+    alpha, beta, phi, gamma = (params[:, i][None, :] for i in range(4))
+
+    level = np.zeros((S, G))
+    trend = np.zeros((S, G))
+    season = np.zeros((S, G, m))
+    started = np.zeros((S, 1), dtype=bool)
+    sse = np.zeros((S, G))
+    count = np.zeros((S, 1))
+
+    for t in range(T):
+        y = Y[:, t][:, None]
+        observed = ~np.isnan(y)
+        s = season[:, :, t % m]
+        damped = level + phi * trend
+        forecast = damped + s
+
+        update = observed & started
+        err = np.where(update, y - forecast, 0.0)
+        sse += err ** 2
+        count += update
+
+        new_level = np.where(update, damped + alpha * err, damped)
+        new_trend = np.where(update, phi * trend + alpha * beta * err, phi * trend)
+        if seasonal:
+            season[:, :, t % m] = np.where(update, s + gamma * (1 - alpha) * err, s)
+
+        # The first observation of a series initialises its level
+        first = observed & ~started
+        level = np.where(first, y, np.where(started, new_level, level))
+        trend = np.where(first, 0.0, np.where(started, new_trend, trend))
+        started |= observed
+
+    return level, trend, season, sse, count
+
+
+def _holt(Y: np.ndarray, horizon: int, m: int, seasonal: bool, z: float):
+    params = _param_grid(seasonal)
+    level, trend, season, sse, count = _ets_filter(Y, params, m, seasonal)
+    mse = np.where(count > 0, sse / np.maximum(count, 1), np.inf)
+    best = np.argmin(mse, axis=1)
+    rows = np.arange(len(Y))
+    alpha, beta, phi, gamma = params[best].T
+    level, trend, season = level[rows, best], trend[rows, best], season[rows, best]
+    sigma = np.sqrt(np.where(np.isfinite(mse[rows, best]), mse[rows, best], 0.0))
+
+    h = np.arange(1, horizon + 1)
+    phi_cum = np.cumsum(phi[:, None] ** h[None, :], axis=1)  # φ + ... + φ^h
+    point = level[:, None] + phi_cum * trend[:, None]
+    if seasonal:
+        T = Y.shape[1]
+        point += season[:, (T - 1 + h) % m]
+
+    # Var(h) = σ² (1 + Σ_{j<h} c_j²), c_j = α(1 + β(φ + ... + φ^j)) (+ γ(1-α) at seasonal lags)
+    c = alpha[:, None] * (1 + beta[:, None] * phi_cum)
+    if seasonal:
+        c = c + np.where(h % m == 0, gamma[:, None] * (1 - alpha[:, None]), 0.0)
+    var_factor = 1 + np.concatenate([np.zeros((len(Y), 1)), np.cumsum(c[:, :-1] ** 2, axis=1)], axis=1)
+    half_width = z * sigma[:, None] * np.sqrt(var_factor)
+    return point, half_width
+
+
+def _seasonal_naive(Y: np.ndarray, horizon: int, m: int, z: float):
+    S, T = Y.shape
+    # Carry the last observation forward so gaps do not break the lookup
+    filled = pd.DataFrame(Y).ffill(axis=1).to_numpy()
+    n_obs = (~np.isnan(Y)).sum(axis=1)
+    h = np.arange(1, horizon + 1)
+    lag = T - m + ((h - 1) % m)  # same month in the last observed year
+    seasonal = filled[:, np.clip(lag, 0, T - 1)]
+    naive = np.repeat(filled[:, -1:], horizon, axis=1)
+    has_year = (n_obs >= m)[:, None] & (lag >= 0)[None, :]
+    point = np.where(has_year, seasonal, naive)
+
+    # Residual scale of the same rule in-sample: y_t - y_{t-m} (or y_t - y_{t-1})
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # series too short for a residual
+        sigma_seasonal = (np.sqrt(np.nanmean((filled[:, m:] - filled[:, :-m]) ** 2, axis=1))
+                          if T > m else np.full(S, np.nan))
+        sigma_naive = (np.sqrt(np.nanmean((filled[:, 1:] - filled[:, :-1]) ** 2, axis=1))
+                       if T > 1 else np.full(S, np.nan))
+    sigma = np.nan_to_num(np.where(n_obs >= m, sigma_seasonal, sigma_naive))
+    k = np.where((n_obs >= m)[:, None], ((h - 1) // m)[None, :], (h - 1)[None, :])
+    return point, z * sigma[:, None] * np.sqrt(k + 1)
+
+
+def forecast_matrix(Y: np.ndarray, horizon: int, method: str = "auto", level: float = 0.8,
+                    season_length: int = SEASON_LENGTH):
+    """
+    Forecast every row of a right-aligned monthly matrix.
+
+    Returns:
+        (point forecasts, lower, upper, method used per series), arrays of shape (S, horizon)
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown forecasting method: {method}")
+    S = len(Y)
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    point = np.full((S, horizon), np.nan)
+    half = np.full((S, horizon), np.nan)
+    used = np.full(S, "", dtype=object)
+    if S == 0 or horizon <= 0:
+        return point, point.copy(), point.copy(), used
+
+    n_obs = (~np.isnan(Y)).sum(axis=1)
+    if method == "seasonal_naive":
+        groups = {"seasonal_naive": np.ones(S, dtype=bool)}
+    elif method == "damped":
+        groups = {"damped": np.ones(S, dtype=bool)}
+    elif method == "holt_winters":
+        groups = {"holt_winters": np.ones(S, dtype=bool)}
+    else:
+        seasonal = n_obs >= 2 * season_length
+        groups = {"holt_winters": seasonal, "damped": ~seasonal}
+
+    for name, mask in groups.items():
+        if not mask.any():
+            continue
+        sub = Y[mask]
+        # Trim columns that are empty for every series in the group
+        sub = sub[:, np.flatnonzero((~np.isnan(sub)).any(axis=0)).min():]
+        if name == "seasonal_naive":
+            p, hw = _seasonal_naive(sub, horizon, season_length, z)
+        else:
+            p, hw = _holt(sub, horizon, season_length, seasonal=(name == "holt_winters"), z=z)
+        point[mask], half[mask], used[mask] = p, hw, name
+    return point, point - half, point + half, used
+
+
+def forecast_prices(frame: pd.DataFrame, horizon: int = 6, method: str = "auto", level: float = 0.8,
+                    keys: Sequence[str] = ("region", "crop_name")) -> pd.DataFrame:
+    """
+    Monthly forecasts for every series in a long price table.
+
+    Args:
+        frame: Rows with the key columns, date and price_per_kg (e.g. MarketPriceStore.frame())
+        horizon: Months ahead
+        method: One of METHODS
+        level: Coverage of the prediction interval (0.8 = 80%)
+        keys: Columns identifying a series
+
+    Returns:
+        Long DataFrame: keys, ds (month start), step, yhat, yhat_lower, yhat_upper, method
+    """
+    keys = list(keys)
+    index, Y = to_monthly_matrix(frame, keys)
+    point, lower, upper, used = forecast_matrix(Y, horizon, method, level)
+
+    steps = np.arange(1, horizon + 1)
+    periods = index["last_period"].to_numpy()[:, None] + steps[None, :]
+    ds = pd.to_datetime({"year": (periods // 12).ravel(), "month": (periods % 12 + 1).ravel(), "day": 1})
+
+    out = index.loc[np.repeat(np.arange(len(index)), horizon), keys].reset_index(drop=True)
+    out["ds"] = ds.to_numpy()
+    out["step"] = np.tile(steps, len(index))
+    out["yhat"] = point.ravel()
+    out["yhat_lower"] = lower.ravel()
+    out["yhat_upper"] = upper.ravel()
+    out["method"] = np.repeat(used, horizon)
+    return out
+
+
+def get_store_forecasts(store: Optional[MarketPriceStore] = None, horizon: int = 6, method: str = "auto",
+                        level: float = 0.8) -> pd.DataFrame:
+    """
+    forecast_prices for every (region, crop) series of the price store, cached until
+    the price file changes. The returned frame is shared and must not be modified.
+    """
+    store = store or get_price_store()
+    # Version and rows from one snapshot, so a reload in between cannot mislabel the result
+    version, frame = store.versioned_frame()
+    key = (store.path, version, horizon, method, level)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    forecast = forecast_prices(frame, horizon=horizon, method=method, level=level)
+    with _cache_lock:
+        for old_key in [k for k in _cache if k[0] == store.path and k[1] < version]:
+            del _cache[old_key]
+        if any(k[0] == store.path and k[1] > version for k in _cache):
+            return forecast  # a newer version was cached meanwhile; don't add a stale entry
+        _cache[key] = forecast
+    return forecast
+
+
+if __name__ == "__main__":
+    import time
+
+    print(forecast_prices(get_price_store().frame(), horizon=3).head(9).to_string(index=False))
+
+    # Throughput on synthetic monthly series of mixed length
+    rng = np.random.default_rng(0)
+    n_series, months = 5000, 36
+    t = np.arange(months)
+    Y = (1000 + rng.normal(0, 200, (n_series, 1)) + rng.normal(5, 3, (n_series, 1)) * t
+         + 80 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 30, (n_series, months)))
+    lengths = rng.integers(3, months + 1, n_series)
+    Y[t[None, :] < (months - lengths)[:, None]] = np.nan
+    for method in ("auto", "damped", "seasonal_naive"):
+        started = time.perf_counter()
+        forecast_matrix(Y, horizon=6, method=method)
+        elapsed = time.perf_counter() - started
+        print(f"{method:>14}: {n_series} series in {elapsed:.3f} s ({n_series / elapsed:,.0f} series/s)")
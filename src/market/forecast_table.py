@@ -0,0 +1,251 @@
+# src/market/forecast_table.py
+"""
+Materialized price forecasts: one row per (region, crop, horizon) in SQLite.
+
+`materialize_forecasts` is the batch job (run nightly, e.g. from cron):
+
+    15 2 * * *  cd /path/to/project && python -m src.market.forecast_table
+
+It fingerprints every (region, crop) series of the price store, re-forecasts
+only series that are new or whose prices changed since the last run (with
+the stacked engine in src.market.fast_forecast), deletes rows of series that
+disappeared, and records the fingerprints for the next run.
+
+Readers use `get_forecast_table()`: the table is loaded once into a dict keyed
+by (region, crop, horizon_days) and reloaded only when the file changes, so a
+lookup is a dictionary access. MarketPricePredictor.get_price_trend (fast engine)
+reads it for series whose forecast is as new as their data.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.market.fast_forecast import forecast_prices
+from src.market.price_store import PROJECT_ROOT, MarketPriceStore, get_price_store
+
+DEFAULT_FORECAST_DB_PATH = os.path.join(PROJECT_ROOT, "data", "market_forecasts.db")
+FORECAST_HORIZONS = (30, 60, 90, 180)  # days
+# Bump when the engine or its settings change, so every series is re-forecast
+FORECAST_VERSION = "fast-v1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_forecasts (
+    region TEXT NOT NULL,
+    crop_key TEXT NOT NULL,
+    crop_name TEXT NOT NULL,
+    horizon_days INTEGER NOT NULL,
+    target_date TEXT NOT NULL,
+    yhat REAL NOT NULL,
+    yhat_lower REAL NOT NULL,
+    yhat_upper REAL NOT NULL,
+    method TEXT NOT NULL,
+    last_observed TEXT NOT NULL,
+    generated_at TEXT NOT NULL,
+    PRIMARY KEY (region, crop_key, horizon_days)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS forecast_series (
+    region TEXT NOT NULL,
+    crop_key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    PRIMARY KEY (region, crop_key)
+) WITHOUT ROWID;
+"""
+
+
+def series_fingerprints(frame: pd.DataFrame, salt: str = "") -> pd.Series:
+    """
+    Order-independent content hash of each (region, crop) series, indexed by
+    (region, crop_key). Computed from vectorized per-row hashes summed per group,
+    so all series are fingerprinted in one grouped pass.
+    """
+    df = frame[["date", "region", "crop_name", "price_per_kg"]]
+    crop_key = df["crop_name"].str.lower()
+    rows = pd.util.hash_pandas_object(pd.DataFrame({"date": df["date"], "price": df["price_per_kg"]}),
+                                      index=False).to_numpy(dtype=np.uint64)
+    grouped = pd.Series(rows, index=pd.MultiIndex.from_arrays([df["region"], crop_key], names=["region", "crop_key"]))
+    with np.errstate(over="ignore"):
+        sums = grouped.groupby(level=[0, 1]).agg(lambda v: np.add.reduce(v.to_numpy(dtype=np.uint64)))
+    counts = grouped.groupby(level=[0, 1]).size()
+    return sums.astype("uint64").astype(str) + f":{salt}:" + counts.astype(str)
+
+
+class ForecastTable:
+    """
+    Args:
+        path: SQLite file holding the forecasts (created on first use)
+    """
+
+    def __init__(self, path: str = DEFAULT_FORECAST_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._rows: Dict[Tuple[str, str, int], Dict] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    # --- writing ---
+    def stored_fingerprints(self) -> Dict[Tuple[str, str], str]:
+        conn = self._connect()
+        try:
+            return {(r, c): f for r, c, f in conn.execute("SELECT region, crop_key, fingerprint FROM forecast_series")}
+        finally:
+            conn.close()
+
+    def replace_series(self, forecasts: pd.DataFrame, fingerprints: Dict[Tuple[str, str], str],
+                       removed: Sequence[Tuple[str, str]] = ()) -> None:
+        """
+        In one transaction: replace the forecast rows of the series in `fingerprints`
+        with `forecasts`, record their fingerprints, and delete `removed` series.
+        """
+        generated_at = datetime.now().isoformat(timespec="seconds")
+        rows = [(r.region, r.crop_key, r.crop_name, int(r.horizon_days), r.target_date, float(r.yhat),
+                 float(r.yhat_lower), float(r.yhat_upper), r.method, r.last_observed, generated_at)
+                for r in forecasts.itertuples(index=False)]
+        keys = list(fingerprints) + list(removed)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("DELETE FROM price_forecasts WHERE region = ? AND crop_key = ?", keys)
+                conn.executemany("DELETE FROM forecast_series WHERE region = ? AND crop_key = ?", keys)
+                conn.executemany("INSERT INTO price_forecasts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.executemany("INSERT INTO forecast_series VALUES (?, ?, ?)",
+                                 [(r, c, f) for (r, c), f in fingerprints.items()])
+        finally:
+            conn.close()
+
+    # --- reading ---
+    def _current(self) -> Dict[Tuple[str, str, int], Dict]:
+        st = os.stat(self.path)
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return self._rows
+        with self._lock:
+            if signature != self._signature:
+                frame = self.frame()
+                records = frame.to_dict("records")
+                self._rows = {(r["region"], r["crop_key"], r["horizon_days"]): r for r in records}
+                self._signature = signature
+        return self._rows
+
+    def frame(self) -> pd.DataFrame:
+        """All materialized forecasts."""
+        conn = self._connect()
+        try:
+            return pd.read_sql_query("SELECT * FROM price_forecasts", conn)
+        finally:
+            conn.close()
+
+    def lookup(self, region: str, crop: str, horizon_days: int) -> Optional[Dict]:
+        """Forecast row (target_date, yhat, yhat_lower, yhat_upper, method, ...) or None."""
+        return self._current().get((region.strip().lower(), crop.strip().lower(), int(horizon_days)))
+
+    def horizons(self) -> Sequence[int]:
+        return sorted({h for _, _, h in self._current()})
+
+
+def materialize_forecasts(store: Optional[MarketPriceStore] = None, table: Optional[ForecastTable] = None,
+                          horizons: Sequence[int] = FORECAST_HORIZONS, method: str = "auto", level: float = 0.8,
+                          full: bool = False) -> Dict:
+    """
+    Forecast every (region, crop) series whose data changed and store the results.
+
+    Args:
+        store: Price store to read (the default store when None)
+        table: Target table (data/market_forecasts.db when None)
+        horizons: Horizons in days; each maps to the month ceil(days / 30) ahead
+        method: Forecasting method (see src.market.fast_forecast.METHODS)
+        level: Prediction interval coverage
+        full: Re-forecast every series, ignoring stored fingerprints
+
+    Returns:
+        Report with series, forecast, unchanged, removed and seconds
+    """
+    started = time.perf_counter()
+    store = store or get_price_store()
+    table = table or ForecastTable()
+    frame = store.frame()
+
+    salt = f"{FORECAST_VERSION}:{method}:{level}:{','.join(map(str, horizons))}"
+    current = series_fingerprints(frame, salt).to_dict()
+    stored = {} if full else table.stored_fingerprints()
+    changed = {key: fp for key, fp in current.items() if stored.get(key) != fp}
+    removed = [key for key in stored if key not in current]
+
+    forecasts = pd.DataFrame()
+    if changed:
+        changed_index = pd.MultiIndex.from_tuples(list(changed), names=["region", "crop_key"])
+        subset = frame[pd.MultiIndex.from_arrays([frame["region"], frame["crop_name"].str.lower()]).isin(changed_index)]
+        # Rows are keyed on crop_key: forecast each case-insensitive crop as one series,
+        # under the first spelling seen, so 'Rice' and 'rice' cannot collide on insert
+        crop_key = subset["crop_name"].str.lower()
+        subset = subset.assign(crop_name=crop_key.map(subset.groupby(crop_key)["crop_name"].first()))
+        steps = {h: max(1, math.ceil(h / 30)) for h in horizons}
+        monthly = forecast_prices(subset, horizon=max(steps.values()), method=method, level=level)
+        last_observed = subset.groupby(["region", "crop_name"])["date"].max().rename("last_observed")
+        monthly = monthly.join(last_observed, on=["region", "crop_name"])
+
+        by_step = pd.DataFrame({"horizon_days": list(steps), "step": list(steps.values())})
+        forecasts = monthly.merge(by_step, on="step")
+        forecasts["crop_key"] = forecasts["crop_name"].str.lower()
+        forecasts["target_date"] = forecasts["ds"].dt.strftime("%Y-%m-%d")
+        forecasts["last_observed"] = forecasts["last_observed"].dt.strftime("%Y-%m-%d")
+
+    table.replace_series(forecasts, changed, removed)
+    return {
+        "series": len(current),
+        "forecast": len(changed),
+        "unchanged": len(current) - len(changed),
+        "removed": len(removed),
+        "rows_written": len(forecasts),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+_tables: Dict[str, ForecastTable] = {}
+_tables_lock = threading.Lock()
+
+
+def get_forecast_table(path: Optional[str] = None) -> ForecastTable:
+    """Process-wide reader for a forecast database (data/market_forecasts.db by default)."""
+    path = os.path.abspath(path or DEFAULT_FORECAST_DB_PATH)
+    with _tables_lock:
+        if path not in _tables:
+            _tables[path] = ForecastTable(path)
+        return _tables[path]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Materialize price forecasts for every (region, crop).")
+    parser.add_argument("--source", default=None, help="Price CSV or database (default: the shared price store)")
+    parser.add_argument("--db", default=DEFAULT_FORECAST_DB_PATH)
+    parser.add_argument("--full", action="store_true", help="Re-forecast every series")
+    args = parser.parse_args()
+
+    table = get_forecast_table(args.db)
+    report = materialize_forecasts(get_price_store(args.source), table, full=args.full)
+    print(f"{report['series']} series: {report['forecast']} forecast, {report['unchanged']} unchanged, "
+          f"{report['removed']} removed, {report['rows_written']} rows written in {report['seconds']:.2f} s")
+
+    materialized = table.frame()
+    if materialized.empty:
+        print("No forecasts to look up: the price store has no series.")
+        raise SystemExit(0)
+    sample = materialized.iloc[0]
+    started = time.perf_counter()
+    row = None
+    for _ in range(10000):
+        row = table.lookup(sample["region"], sample["crop_name"], 90)
+    print(f"lookup: {(time.perf_counter() - started) / 10000 * 1e6:.2f} µs -> {row}")
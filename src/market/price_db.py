@@ -0,0 +1,151 @@
+# src/market/price_db.py
+"""
+SQLite table of market prices, one row per (date, region, crop).
+
+Rows are written in bulk transactions with INSERT OR IGNORE against a unique
+index on (date, region, crop_key), so re-ingesting overlapping batches only
+adds the rows that are new. A second index on (region, crop_key, date) serves
+per-series reads. MarketPriceStore reads this file the same way it reads the
+CSV (see `src.market.price_store`).
+
+Usage:
+    db = MarketPriceDB()                       # data/market_prices.db
+    db.import_csv("data/market_prices.csv")    # one-off migration
+    db.upsert(rows)                            # dicts with date, region, crop_name, price_per_kg
+"""
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_MARKET_DB_PATH = os.path.join(PROJECT_ROOT, "data", "market_prices.db")
+COLUMNS = ["date", "region", "crop_name", "price_per_kg"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS market_prices (
+    date TEXT NOT NULL,
+    region TEXT NOT NULL,
+    crop_name TEXT NOT NULL,
+    crop_key TEXT NOT NULL,
+    price_per_kg REAL NOT NULL,
+    source TEXT,
+    ingested_at TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_market_prices_date_region_crop
+    ON market_prices (date, region, crop_key);
+CREATE INDEX IF NOT EXISTS ix_market_prices_series
+    ON market_prices (region, crop_key, date);
+"""
+
+INSERT_SQL = ("INSERT OR IGNORE INTO market_prices "
+              "(date, region, crop_name, crop_key, price_per_kg, source, ingested_at) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+
+def is_database_path(path: str) -> bool:
+    """True for SQLite files (by extension), as opposed to CSV price files."""
+    return os.path.splitext(path)[1].lower() in (".db", ".sqlite", ".sqlite3")
+
+
+def _normalize_rows(rows: Iterable[Dict], source: Optional[str], ingested_at: str) -> List[tuple]:
+    """Validated insert tuples; rows without a parseable date or price are dropped."""
+    records = []
+    for row in rows:
+        try:
+            day = pd.Timestamp(row["date"]).strftime("%Y-%m-%d")
+            price = float(row["price_per_kg"])
+            region = str(row["region"]).strip().lower()
+            crop = str(row["crop_name"]).strip()
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not region or not crop or price != price:  # NaN price
+            continue
+        records.append((day, region, crop, crop.lower(), price, source, ingested_at))
+    return records
+
+
+class MarketPriceDB:
+    """
+    Args:
+        path: SQLite file (created with its schema on first use)
+    """
+
+    def __init__(self, path: str = DEFAULT_MARKET_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def upsert(self, rows: Iterable[Dict], source: Optional[str] = None) -> int:
+        """
+        Insert rows not yet in the table, in one transaction.
+
+        Args:
+            rows: Dicts with date, region, crop_name and price_per_kg
+            source: Optional label stored with the new rows (e.g. the API URL)
+
+        Returns:
+            Number of rows actually inserted (existing (date, region, crop) rows are kept)
+        """
+        records = _normalize_rows(rows, source, datetime.now().isoformat(timespec="seconds"))
+        if not records:
+            return 0
+        conn = self._connect()
+        try:
+            with conn:
+                before = conn.total_changes
+                conn.executemany(INSERT_SQL, records)
+                return conn.total_changes - before
+        finally:
+            conn.close()
+
+    def upsert_frame(self, df: pd.DataFrame, source: Optional[str] = None) -> int:
+        """upsert() for a DataFrame with the price columns."""
+        return self.upsert(df[COLUMNS].to_dict("records"), source=source)
+
+    def import_csv(self, csv_path: str) -> int:
+        """Load a market_prices.csv file; returns the number of new rows."""
+        return self.upsert_frame(pd.read_csv(csv_path), source=os.path.basename(csv_path))
+
+    def frame(self) -> pd.DataFrame:
+        """All rows as date, region, crop_name, price_per_kg."""
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(
+                "SELECT date, region, crop_name, price_per_kg FROM market_prices ORDER BY region, crop_key, date", conn)
+        finally:
+            conn.close()
+
+    def latest_date(self) -> Optional[str]:
+        """Most recent observation date in the table (ISO string), or None when empty."""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT MAX(date) FROM market_prices").fetchone()[0]
+        finally:
+            conn.close()
+
+    def count(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM market_prices").fetchone()[0]
+        finally:
+            conn.close()
+
+    def export_csv(self, csv_path: str) -> None:
+        """Write the table in the market_prices.csv layout."""
+        self.frame().to_csv(csv_path, index=False)
+
+
+if __name__ == "__main__":
+    from src.market.price_store import DEFAULT_MARKET_PRICES_PATH
+
+    db = MarketPriceDB()
+    added = db.import_csv(DEFAULT_MARKET_PRICES_PATH)
+    print(f"Imported {added} new rows into {db.path} ({db.count()} total, latest {db.latest_date()})")
@@ -1,13 +1,96 @@
+import math
+import os
 import pandas as pd
-from prophet import Prophet
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 import numpy as np
 from typing import List, Dict, Optional
 
+from src.market.fast_forecast import forecast_prices, get_store_forecasts
+from src.market.forecast_table import DEFAULT_FORECAST_DB_PATH, ForecastTable, get_forecast_table
+from src.market.price_stats import get_price_stats, price_summary
+from src.market.price_store import PROJECT_ROOT, get_price_store
+from src.utils.model_store import ModelStore, fingerprint_frame
+
+try:
+    from prophet import Prophet
+except ImportError:  # only needed for engine='prophet'
+    Prophet = None
+
+# 'fast': NumPy exponential smoothing over all series at once (src/market/fast_forecast);
+# 'prophet': one Prophet model per crop (slow, optional dependency)
+ENGINES = ('fast', 'prophet')
+FAST_HORIZON_MONTHS = 12
+
+# Bump when the Prophet configuration changes, so registered models are refitted
+PRICE_MODEL_VERSION = 'prophet-price-v1'
+
+# Fitted price models, one file per (region, crop, data fingerprint)
+PRICE_MODEL_REGISTRY = ModelStore(os.path.join(PROJECT_ROOT, 'data', 'models', 'market'), serializer='prophet')
+
+
+def fit_price_model(prophet_df: pd.DataFrame) -> "Prophet":
+    """Fit the price Prophet model on a (ds, y) frame."""
+    if Prophet is None:
+        raise ImportError("Prophet is not installed; use MarketPricePredictor(engine='fast')")
+    # Initialize and fit Prophet model with adjusted parameters for sparse data
+    model = Prophet(
+        yearly_seasonality=True,
+        weekly_seasonality=False,  # Disable weekly seasonality for sparse data
+        changepoint_prior_scale=0.5,  # Increase changepoint flexibility
+        seasonality_prior_scale=10.0  # Increase seasonality flexibility
+    )
+    model.fit(prophet_df)
+    return model
+
+
+def _registry_key(region: Optional[str], crop: str) -> str:
+    return f"{(region or 'all').strip().lower()}__{crop.strip().lower()}"
+
+
+def _data_fingerprint(prophet_df: pd.DataFrame) -> str:
+    return fingerprint_frame(prophet_df, ['ds', 'y'], salt=PRICE_MODEL_VERSION)
+
+
+def _registry_extra(region: Optional[str], crop: str, prophet_df: pd.DataFrame) -> Dict:
+    return {'region': region or 'all', 'crop': crop, 'rows': len(prophet_df),
+            'data_end': pd.Timestamp(prophet_df['ds'].max()).strftime('%Y-%m-%d')}
+
+
+def _fit_and_register(root_dir: str, key: str, fingerprint: str, prophet_df: pd.DataFrame, extra: Dict) -> float:
+    """Process-pool worker: fit one model and save it to the registry directory."""
+    store = ModelStore(root_dir, serializer='prophet')
+    _, access = store.get_or_fit(key, fingerprint, lambda: fit_price_model(prophet_df), extra=extra)
+    return access['seconds']
+
+
+def _interval_confidence(yhat: float, lower: float, upper: float) -> float:
+    """Narrower uncertainty interval relative to the price = higher confidence."""
+    interval = (upper - lower) / abs(yhat) if yhat else float('inf')
+    return float(np.clip(1 - interval / 2, 0, 1))
+
+
 class MarketPricePredictor:
-    def __init__(self):
+    def __init__(self, registry: Optional[ModelStore] = None, engine: str = 'fast',
+                 forecast_table: Optional[ForecastTable] = None):
+        """
+        Args:
+            registry: Where fitted Prophet models are persisted; defaults to data/models/market
+            engine: 'fast' (default) or 'prophet', see ENGINES
+            forecast_table: Materialized forecasts (src.market.forecast_table) read by
+                get_price_trend with the fast engine; defaults to data/market_forecasts.db
+                when it exists and the predictor reads the default price store
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown forecasting engine: {engine}")
+        self.engine = engine
         self.models = {}
+        # engine='fast': crop -> monthly forecast rows (ds, step, yhat, yhat_lower, yhat_upper)
+        self.forecasts: Dict[str, pd.DataFrame] = {}
         self.data_path = None
+        self.region = None
+        self.registry = registry or PRICE_MODEL_REGISTRY
+        self.forecast_table = forecast_table
 
     def set_data_path(self, data_path: str):
         """
@@ -17,99 +100,195 @@ class MarketPricePredictor:
 
     def load_market_data(self, data_path: str, region: str = None) -> pd.DataFrame:
         """
-        Load and preprocess market price data
+        Load and preprocess market price data (through the shared MarketPriceStore)
         Expected columns: 'date', 'region', 'crop_name', 'price_per_kg'
         """
         try:
-            df = pd.read_csv(data_path)
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.sort_values('date')
-            
-            # Filter by region if specified
-            if region:
-                # Convert region to lowercase to match CSV format
-                region = region.lower()
-                df = df[df['region'] == region]
-                if len(df) == 0:
-                    raise ValueError(f"No market data found for region: {region}")
-            
+            # Parsed once per file and shared; reloaded only when the file changes
+            df = get_price_store(data_path).frame(region)
+
+            if region and len(df) == 0:
+                raise ValueError(f"No market data found for region: {region.lower()}")
+
             return df
         except ValueError as ve:
             raise ValueError(f"Error loading market data: {str(ve)}")
         except Exception as e:
             raise Exception(f"Unexpected error loading market data: {str(e)}")
 
-    def train_crop_model(self, df: pd.DataFrame, crop_name: str) -> Prophet:
+    def _prophet_frame(self, df: pd.DataFrame, crop_name: str) -> pd.DataFrame:
+        # Filter data for specific crop
+        crop_df = df[df['crop_name'] == crop_name]
+
+        # Check if we have enough data points
+        if len(crop_df) < 3:
+            raise ValueError(f"Not enough data points for {crop_name}. Need at least 3 data points.")
+
+        # Prepare data for Prophet
+        return pd.DataFrame({
+            'ds': crop_df['date'].to_numpy(),
+            'y': crop_df['price_per_kg'].to_numpy()
+        })
+
+    def train_crop_model(self, df: pd.DataFrame, crop_name: str) -> "Prophet":
         """
         Train a Prophet model for a specific crop's price prediction
         """
         try:
-            # Filter data for specific crop
-            crop_df = df[df['crop_name'] == crop_name]
-            
-            # Check if we have enough data points
-            if len(crop_df) < 3:
-                raise ValueError(f"Not enough data points for {crop_name}. Need at least 3 data points.")
-                
-            # Prepare data for Prophet
-            prophet_df = pd.DataFrame({
-                'ds': crop_df['date'],
-                'y': crop_df['price_per_kg']
-            })
-            
-            # Initialize and fit Prophet model with adjusted parameters for sparse data
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=False,  # Disable weekly seasonality for sparse data
-                changepoint_prior_scale=0.5,  # Increase changepoint flexibility
-                seasonality_prior_scale=10.0  # Increase seasonality flexibility
-            )
-            model.fit(prophet_df)
-            
-            return model
+            return fit_price_model(self._prophet_frame(df, crop_name))
         except Exception as e:
             print(f"Error training model for {crop_name}: {str(e)}")
             raise
 
-    def train_all_models(self, data_path: str, region: str = None) -> None:
+    def train_all_models(self, data_path: str, region: str = None, max_workers: Optional[int] = None) -> None:
         """
         Train price prediction models for all crops in the data
+
+        Models already in the registry for the same (region, crop, data) are loaded
+        instead of refitted; the rest are fitted in parallel on a process pool.
+
+        Args:
+            data_path: Market price CSV
+            region: Optional region filter
+            max_workers: Worker processes for fitting (default: CPU count; 1 fits inline)
         """
         try:
             # Store the data path for future use
             self.set_data_path(data_path)
-            
+            self.region = region
+
             df = self.load_market_data(data_path, region)
-            
+
+            if self.engine == 'fast':
+                self._train_fast(df, FAST_HORIZON_MONTHS)
+                return
+
             # Get all unique crops in the data for this region
-            crops = df['crop_name'].unique()
-            
-            # Train models for each crop
-            for crop in crops:
+            pending = {}
+            for crop in df['crop_name'].unique():
                 try:
-                    model = self.train_crop_model(df, crop)
-                    self.models[crop] = model
-                except Exception as e:
+                    prophet_df = self._prophet_frame(df, crop)
+                except ValueError as e:
                     print(f"Error training model for {crop}: {str(e)}")
                     continue
-            
+                key, fingerprint = _registry_key(region, crop), _data_fingerprint(prophet_df)
+                model, _ = self.registry.load(key, fingerprint)
+                if model is not None:
+                    self.models[crop] = model
+                else:
+                    pending[crop] = (key, fingerprint, prophet_df)
+
+            if not pending:
+                return
+
+            max_workers = max_workers or os.cpu_count() or 1
+            if max_workers == 1 or len(pending) == 1:
+                for crop, (key, fingerprint, prophet_df) in pending.items():
+                    try:
+                        self.models[crop], _ = self.registry.get_or_fit(
+                            key, fingerprint, lambda: fit_price_model(prophet_df), extra=_registry_extra(region, crop, prophet_df))
+                    except Exception as e:
+                        print(f"Error training model for {crop}: {str(e)}")
+                return
+
+            # Each worker fits and writes its model to the registry directory; the
+            # parent then loads the saved files
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+                futures = {
+                    pool.submit(_fit_and_register, self.registry.root_dir, key, fingerprint, prophet_df,
+                                _registry_extra(region, crop, prophet_df)): crop
+                    for crop, (key, fingerprint, prophet_df) in pending.items()
+                }
+                for future in as_completed(futures):
+                    crop = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Error training model for {crop}: {str(e)}")
+                        continue
+                    key, fingerprint, _ = pending[crop]
+                    model, _ = self.registry.load(key, fingerprint)
+                    if model is not None:
+                        self.models[crop] = model
+
         except ValueError as ve:
             raise ValueError(f"Error loading market data: {str(ve)}")
         except Exception as e:
             raise Exception(f"Unexpected error training models: {str(e)}")
 
+    def _train_fast(self, df: pd.DataFrame, horizon_months: int):
+        """Forecast every crop of the (region-filtered) data in one stacked pass."""
+        forecast = forecast_prices(df, horizon=horizon_months, keys=['crop_name'])
+        self.forecasts = {crop: rows.reset_index(drop=True) for crop, rows in forecast.groupby('crop_name', sort=False)}
+
+    def _fast_forecast(self, crop_name: str, days_ahead: int) -> pd.DataFrame:
+        """Monthly forecast rows covering `days_ahead` days."""
+        months = max(1, math.ceil(days_ahead / 30))
+        if self.forecasts and months > len(next(iter(self.forecasts.values()))):
+            self._train_fast(self.load_market_data(self.data_path, self.region), months)
+        return self.forecasts[crop_name].head(months)
+
     def predict_prices(self, crop_name: str, days_ahead: int = 30, region: str = None) -> pd.DataFrame:
         """
         Predict future prices for a specific crop
+
+        Only the requested horizon is evaluated; the training history is not re-predicted.
+        The fast engine returns monthly steps covering `days_ahead` days.
         """
+        if self.engine == 'fast':
+            if crop_name not in self.forecasts:
+                raise ValueError(f"No model trained for crop: {crop_name} in region: {region}")
+            return self._fast_forecast(crop_name, days_ahead)[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+
         if crop_name not in self.models:
             raise ValueError(f"No model trained for crop: {crop_name} in region: {region}")
-            
+
         model = self.models[crop_name]
-        future = model.make_future_dataframe(periods=days_ahead)
+        future = model.make_future_dataframe(periods=days_ahead, include_history=False)
         forecast = model.predict(future)
-        
-        return forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(days_ahead)
+
+        return forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+
+    def registry_report(self) -> pd.DataFrame:
+        """
+        Fit time, load time, age and staleness of every registered price model.
+
+        A model is stale when the current price data for its (region, crop) no longer
+        matches the data it was fitted on, or the series has disappeared.
+        """
+        entries = pd.DataFrame(self.registry.entries())
+        if entries.empty:
+            return entries
+
+        current = {}
+        df = get_price_store(self.data_path).frame()
+        for region in [None] + sorted(df['region'].unique()):
+            region_df = df if region is None else df[df['region'] == region]
+            for crop in region_df['crop_name'].unique():
+                try:
+                    current[_registry_key(region, crop)] = _data_fingerprint(self._prophet_frame(region_df, crop))
+                except ValueError:
+                    continue
+
+        entries['current_fingerprint'] = entries['key'].map(current)
+        entries['stale'] = entries['fingerprint'] != entries['current_fingerprint']
+        entries['age_days'] = (pd.Timestamp.now() - pd.to_datetime(entries['created_at'])).dt.total_seconds() / 86400
+        columns = ['key', 'region', 'crop', 'rows', 'data_end', 'fit_seconds', 'last_load_seconds',
+                   'created_at', 'age_days', 'stale']
+        return entries[[c for c in columns if c in entries.columns]]
+
+    def _materialized_forecast(self, region: str, crop: str, days_ahead: int, latest_date) -> Optional[Dict]:
+        """The nightly forecast row of a series, or None if missing or older than the series' data."""
+        table = self.forecast_table
+        if table is None:
+            # The nightly job forecasts the default price store only
+            if not os.path.exists(DEFAULT_FORECAST_DB_PATH) or get_price_store(self.data_path) is not get_price_store():
+                return None
+            table = get_forecast_table()
+        row = table.lookup(region, crop, days_ahead)
+        if row is None or row['last_observed'] != pd.Timestamp(latest_date).strftime('%Y-%m-%d'):
+            return None
+        return row
 
     def get_price_trend(self, crop: str, days_ahead: int = 30, region: str = None) -> dict:
         """
@@ -124,21 +303,44 @@ class MarketPricePredictor:
             dict: Contains current price, predicted trend, and confidence
         """
         try:
-            # Load data and filter by crop and region
-            df = self.load_market_data(self.data_path, region)
-            crop_df = df[df['crop_name'] == crop]
-            
-            if len(crop_df) == 0:
+            # Precomputed per-series statistics, cached until the price file changes
+            stats = price_summary(region, crop, store=get_price_store(self.data_path))
+
+            if len(stats) == 0:
                 raise ValueError(f"No market data found for crop: {crop} in region: {region}")
-            
-            # Get current price
-            current_price = crop_df['price_per_kg'].iloc[-1]
-            
-            # Get historical trend
-            last_30_days = crop_df.tail(30)
-            price_change = (last_30_days['price_per_kg'].iloc[-1] - last_30_days['price_per_kg'].iloc[0]) / last_30_days['price_per_kg'].iloc[0]
-            
-            # Predict future trend
+
+            # Without a region, use the most recently updated series
+            latest = stats.sort_values('latest_date', kind='mergesort').iloc[-1]
+            current_price = float(latest['latest_price'])
+
+            # Get historical trend: change over the last TREND_WINDOW observations
+            price_change = float(latest['window_change_pct'])
+
+            # Predict future trend: a current materialized forecast is a dictionary lookup
+            row = self._materialized_forecast(latest['region'], crop, days_ahead, latest['latest_date']) \
+                if self.engine == 'fast' else None
+            if row is not None:
+                return {
+                    'current_price': current_price,
+                    'predicted_trend': float((row['yhat'] - current_price) / current_price) if current_price else 0.0,
+                    'confidence': _interval_confidence(row['yhat'], row['yhat_lower'], row['yhat_upper'])
+                }
+
+            if self.engine == 'fast':
+                # Forecast of the selected series itself (not of self.region or all regions),
+                # from the cached forecasts of the whole price store
+                step = max(1, math.ceil(days_ahead / 30))
+                forecast = get_store_forecasts(get_price_store(self.data_path), horizon=max(step, FAST_HORIZON_MONTHS))
+                series = forecast[(forecast['region'] == latest['region']) & (forecast['crop_name'] == latest['crop_name'])
+                                  & (forecast['step'] == step)]
+                if len(series):
+                    end = series.iloc[0]
+                    return {
+                        'current_price': current_price,
+                        'predicted_trend': float((end['yhat'] - current_price) / current_price) if current_price else 0.0,
+                        'confidence': _interval_confidence(end['yhat'], end['yhat_lower'], end['yhat_upper'])
+                    }
+
             model = self.models.get(crop)
             if model is None:
                 # If no model exists, create a simple linear trend based prediction
@@ -147,17 +349,19 @@ class MarketPricePredictor:
                     'predicted_trend': price_change,  # Use historical trend as prediction
                     'confidence': abs(price_change)  # Higher absolute change = higher confidence
                 }
-            
-            future = model.make_future_dataframe(periods=days_ahead)
-            forecast = model.predict(future)
-            
+
+            # Evaluate only the last observed date and the end of the horizon
+            last_date = model.history['ds'].max()
+            forecast = model.predict(pd.DataFrame({'ds': [last_date, last_date + pd.Timedelta(days=days_ahead)]}))
+
             # Calculate predicted trend
-            predicted_change = (forecast['yhat'].iloc[-1] - forecast['yhat'].iloc[-days_ahead-1]) / forecast['yhat'].iloc[-days_ahead-1]
-            
+            start_price, end = forecast['yhat'].iloc[0], forecast.iloc[-1]
+            predicted_change = (end['yhat'] - start_price) / start_price
+
             return {
                 'current_price': current_price,
-                'predicted_trend': predicted_change,
-                'confidence': model.model.score(crop_df['ds'], crop_df['y'])
+                'predicted_trend': float(predicted_change),
+                'confidence': _interval_confidence(end['yhat'], end['yhat_lower'], end['yhat_upper'])
             }
             
         except ValueError as ve:
@@ -166,47 +370,111 @@ class MarketPricePredictor:
             raise Exception(f"Unexpected error getting price trend for {crop}: {str(e)}")
             raise
 
-    def get_optimal_crop(self, crops: List[str], days_ahead: int = 30) -> Dict:
+    def rank_crops(self, crops: Optional[List[str]] = None, regions: Optional[List[str]] = None,
+                   days_ahead: int = 30) -> pd.DataFrame:
+        """
+        Rank (region, crop) series by expected value in one vectorized pass.
+
+        Uses the cached price statistics and the cached fast forecasts of the whole price
+        store (both recomputed only when the price file changes), so no per-crop
+        filtering or model evaluation happens here. The ranking is independent of the
+        predictor's engine, of the region given to train_all_models and of any trained
+        models: pass `regions` to restrict it.
+
+        Args:
+            crops: Crop names to include (case-insensitive); all crops when None
+            regions: Regions to include; all regions when None
+            days_ahead: Horizon of the predicted trend
+
+        Returns:
+            DataFrame sorted best first: region, crop, current_price, trend, confidence,
+            score (current_price × confidence) and rank
+        """
+        store = get_price_store(self.data_path)
+        summary = get_price_stats(store)['summary']
+        step = max(1, math.ceil(days_ahead / 30))
+        forecast = get_store_forecasts(store, horizon=max(step, FAST_HORIZON_MONTHS))
+        forecast = forecast[forecast['step'] == step]
+
+        table = summary[['region', 'crop_name', 'latest_date', 'latest_price']].merge(
+            forecast[['region', 'crop_name', 'yhat', 'yhat_lower', 'yhat_upper']], on=['region', 'crop_name'], how='left')
+        if crops is not None:
+            wanted = {c.strip().lower() for c in crops}
+            table = table[table['crop_name'].str.lower().isin(wanted)]
+            missing = wanted - set(table['crop_name'].str.lower())
+            if missing:
+                print(f"No market data for: {', '.join(sorted(missing))}")
+        if regions is not None:
+            table = table[table['region'].isin({r.strip().lower() for r in regions})]
+
+        price = table['latest_price'].to_numpy(dtype=float)
+        yhat = table['yhat'].to_numpy(dtype=float)
+        width = (table['yhat_upper'] - table['yhat_lower']).to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trend = np.where(price != 0, (yhat - price) / price, 0.0)
+            confidence = np.clip(1 - width / np.abs(yhat) / 2, 0, 1)
+
+        ranked = pd.DataFrame({
+            'region': table['region'].to_numpy(),
+            'crop': table['crop_name'].to_numpy(),
+            'latest_date': table['latest_date'].to_numpy(),
+            'current_price': price,
+            'trend': np.nan_to_num(trend),
+            'confidence': np.nan_to_num(confidence),
+        })
+        ranked['score'] = ranked['current_price'] * ranked['confidence']
+        ranked = ranked.sort_values(['score', 'crop'], ascending=[False, True], kind='mergesort').reset_index(drop=True)
+        ranked['rank'] = np.arange(1, len(ranked) + 1)
+        return ranked
+
+    def get_optimal_crop(self, crops: List[str], days_ahead: int = 30, regions: Optional[List[str]] = None) -> Dict:
         """
         Get the most profitable crop based on price trend analysis
+
+        Without `regions`, each crop is represented by its most recently updated series.
+        Like rank_crops, this uses the fast forecasts of the whole price store whatever
+        the engine, region or trained models of this predictor.
         """
-        results = []
-        
-        for crop in crops:
-            try:
-                result = self.get_price_trend(crop, days_ahead)
-                results.append({
-                    'crop': crop,
-                    'trend': result['predicted_trend'],
-                    'confidence': result['confidence'],
-                    'current_price': result['current_price']
-                })
-            except Exception as e:
-                print(f"Error processing {crop}: {e}")
-                continue
-        
-        # Sort by current price and confidence
-        results.sort(key=lambda x: (x['current_price'] * x['confidence']), reverse=True)
-        
-        return results
+        ranked = self.rank_crops(crops, regions, days_ahead)
+        if regions is None:
+            ranked = (ranked.sort_values('latest_date', kind='mergesort')
+                      .drop_duplicates('crop', keep='last')
+                      .sort_values('rank'))
+
+        # Sorted by current price and confidence
+        return [{
+            'crop': row.crop,
+            'region': row.region,
+            'trend': float(row.trend),
+            'confidence': float(row.confidence),
+            'current_price': float(row.current_price)
+        } for row in ranked.itertuples(index=False)]
 
 # Example usage
 if __name__ == "__main__":
+    import time
+
     predictor = MarketPricePredictor()
-    predictor.train_all_models("data/market_prices.csv")  # You'll need to create this file
-    
+    started = time.perf_counter()
+    predictor.train_all_models("data/market_prices.csv")
+    trained = predictor.forecasts if predictor.engine == 'fast' else predictor.models
+    print(f"Forecast {len(trained)} crop series ({predictor.engine} engine) in {time.perf_counter() - started:.2f} s")
+
     # Example prediction
-    forecast = predictor.predict_prices("tomato", days_ahead=30)
+    forecast = predictor.predict_prices("Tomato", days_ahead=30)
     print("\nTomato Price Forecast:")
     print(forecast)
     
     # Example trend analysis
-    trend = predictor.get_price_trend("tomato", days_ahead=30)
+    trend = predictor.get_price_trend("Tomato", days_ahead=30)
     print("\nTomato Price Trend:")
     print(trend)
     
     # Example optimal crop selection
-    crops = ["tomato", "cucumber", "lettuce"]  # Example crops
+    crops = ["Tomato", "Rice", "Apple"]  # Example crops
     optimal = predictor.get_optimal_crop(crops)
     print("\nOptimal Crop Selection:")
     print(optimal)
+
+    print("\nModel registry:")
+    print(predictor.registry_report().to_string(index=False))
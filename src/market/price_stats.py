@@ -0,0 +1,136 @@
+# src/market/price_stats.py
+"""
+Price change, rolling statistics and trend classification for every
+(region, crop) series of the market price store.
+
+All series are processed in one grouped pass over the store's frame. Results
+are cached per (file, store version, parameters) and recomputed only after the
+price file changes, so the market table and the recommenders read precomputed
+numbers.
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.market.price_store import MarketPriceStore, get_price_store
+
+ROLLING_WINDOW = 3   # observations in the rolling mean / volatility
+TREND_WINDOW = 12    # observations used for the trend (a year of monthly prices)
+TREND_THRESHOLD = 0.02  # |relative change per 30 days| below this counts as stable
+
+_cache: Dict[Tuple, Dict[str, pd.DataFrame]] = {}
+_cache_lock = threading.Lock()
+
+
+def compute_price_stats(frame: pd.DataFrame, rolling_window: int = ROLLING_WINDOW,
+                        trend_window: int = TREND_WINDOW) -> Dict[str, pd.DataFrame]:
+    """
+    Args:
+        frame: Rows with date, region, crop_name, price_per_kg (e.g. MarketPriceStore.frame())
+        rolling_window: Observations in the rolling mean and volatility
+        trend_window: Most recent observations used for the trend fit
+
+    Returns:
+        Dictionary with
+        'history': every observation with change, pct_change, rolling_mean and volatility
+        'summary': one row per (region, crop): latest price and date, change and pct_change
+            versus the previous observation, rolling_mean, volatility, trend_slope_pct
+            (fitted relative change per 30 days), window_change_pct and trend
+            ('Rising', 'Falling' or 'Stable')
+    """
+    df = frame[['date', 'region', 'crop_name', 'price_per_kg']].copy()
+    df['crop_key'] = df['crop_name'].str.lower()
+    df = df.sort_values(['region', 'crop_key', 'date'], kind='mergesort').reset_index(drop=True)
+    keys = ['region', 'crop_key']
+    grouped = df.groupby(keys, sort=False)['price_per_kg']
+
+    df['change'] = grouped.diff()
+    df['pct_change'] = grouped.pct_change()
+    df['rolling_mean'] = grouped.rolling(rolling_window, min_periods=1).mean().reset_index(level=keys, drop=True)
+    df['volatility'] = (df.groupby(keys, sort=False)['pct_change']
+                        .rolling(rolling_window, min_periods=2).std()
+                        .reset_index(level=keys, drop=True))
+
+    # Least-squares slope over each series' last `trend_window` observations,
+    # from per-group sums (no Python loop over series)
+    recent = df[df.groupby(keys, sort=False).cumcount(ascending=False) < trend_window].copy()
+    first_date = recent.groupby(keys, sort=False)['date'].transform('min')
+    recent['x'] = (recent['date'] - first_date).dt.days.astype(float)
+    recent['y'] = recent['price_per_kg']
+    recent['xx'] = recent['x'] ** 2
+    recent['xy'] = recent['x'] * recent['y']
+    sums = recent.groupby(keys, sort=False).agg(n=('x', 'size'), sx=('x', 'sum'), sy=('y', 'sum'),
+                                                sxx=('xx', 'sum'), sxy=('xy', 'sum'),
+                                                first_price=('y', 'first'), last_price=('y', 'last'))
+    denom = sums['n'] * sums['sxx'] - sums['sx'] ** 2
+    slope = (sums['n'] * sums['sxy'] - sums['sx'] * sums['sy']) / denom.where(denom > 0)
+    mean_price = sums['sy'] / sums['n']
+    sums['trend_slope_pct'] = (slope * 30 / mean_price.where(mean_price != 0)).fillna(0.0)
+    sums['window_change_pct'] = ((sums['last_price'] - sums['first_price'])
+                                 / sums['first_price'].where(sums['first_price'] != 0)).fillna(0.0)
+
+    latest = df.groupby(keys, sort=False).tail(1).set_index(keys)
+    summary = latest[['crop_name', 'date', 'price_per_kg', 'change', 'pct_change', 'rolling_mean', 'volatility']].join(
+        sums[['n', 'trend_slope_pct', 'window_change_pct']])
+    summary = summary.rename(columns={'date': 'latest_date', 'price_per_kg': 'latest_price', 'n': 'trend_observations'})
+    summary[['change', 'pct_change']] = summary[['change', 'pct_change']].fillna(0.0)
+    summary['trend'] = np.select(
+        [summary['trend_slope_pct'] > TREND_THRESHOLD, summary['trend_slope_pct'] < -TREND_THRESHOLD],
+        ['Rising', 'Falling'], default='Stable')
+
+    history = df.drop(columns='crop_key')
+    return {'history': history, 'summary': summary.reset_index().drop(columns='crop_key')}
+
+
+def get_price_stats(store: Optional[MarketPriceStore] = None, rolling_window: int = ROLLING_WINDOW,
+                    trend_window: int = TREND_WINDOW) -> Dict[str, pd.DataFrame]:
+    """
+    compute_price_stats over the whole price store, cached until the price file changes.
+    The returned frames are shared and must not be modified in place.
+    """
+    store = store or get_price_store()
+    # Version and rows from one snapshot: a reload in between must not cache new stats under the old key
+    version, frame = store.versioned_frame()
+    key = (store.path, version, rolling_window, trend_window)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    stats = compute_price_stats(frame, rolling_window, trend_window)
+    with _cache_lock:
+        # Drop results computed from older versions of the same file; other windows of
+        # this version stay cached
+        for old_key in [k for k in _cache if k[0] == store.path and k[1] < version]:
+            del _cache[old_key]
+        if any(k[0] == store.path and k[1] > version for k in _cache):
+            return stats  # a newer version was cached meanwhile; don't add a stale entry
+        _cache[key] = stats
+    return stats
+
+
+def price_summary(region: Optional[str] = None, crop: Optional[str] = None,
+                  store: Optional[MarketPriceStore] = None) -> pd.DataFrame:
+    """Cached per-series summary rows, optionally filtered by region and/or crop."""
+    summary = get_price_stats(store)['summary']
+    if region is not None:
+        summary = summary[summary['region'] == region.strip().lower()]
+    if crop is not None:
+        summary = summary[summary['crop_name'].str.lower() == crop.strip().lower()]
+    return summary
+
+
+if __name__ == "__main__":
+    import time
+
+    store = get_price_store()
+    started = time.perf_counter()
+    stats = get_price_stats(store)
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    get_price_stats(store)
+    second = time.perf_counter() - started
+    print(stats['summary'].head(10).to_string(index=False))
+    print(f"\n{len(stats['summary'])} series: computed in {first * 1000:.1f} ms, cached read in {second * 1000:.3f} ms")
@@ -0,0 +1,171 @@
+# src/market/price_store.py
+"""
+In-memory store for the market prices: data/market_prices.db when it exists
+(written by the ingestion pipeline, see src.market.price_db), else
+data/market_prices.csv.
+
+The file is parsed once into a cleaned, date-sorted frame plus one pair of
+sorted (dates, prices) arrays per (region, crop). Latest-price, range and
+as-of queries are answered by binary search on those arrays. Every query
+checks the file's modification time and size; when they change, a new
+snapshot is built and swapped in as a whole, so readers never see a
+half-loaded state.
+"""
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.market.price_db import DEFAULT_MARKET_DB_PATH, MarketPriceDB, is_database_path
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_MARKET_PRICES_PATH = os.path.join(PROJECT_ROOT, "data", "market_prices.csv")
+COLUMNS = ["date", "region", "crop_name", "price_per_kg"]
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    signature: Tuple[int, int]  # (mtime_ns, size) of the file it was built from
+    version: int
+    frame: pd.DataFrame
+    series: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = field(repr=False)
+    crop_names: Dict[str, str] = field(repr=False)  # lowercase -> display name
+
+
+def _key(value: Optional[str]) -> Optional[str]:
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+class MarketPriceStore:
+    """
+    Args:
+        path: CSV with columns date, region, crop_name, price_per_kg, or a
+            MarketPriceDB SQLite file (.db / .sqlite)
+
+    Regions and crop names are matched case-insensitively. Rows without a
+    price or a valid date are ignored. Returned frames are shared between
+    callers and must not be modified in place.
+    """
+
+    def __init__(self, path: str = DEFAULT_MARKET_PRICES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self.reloads = 0
+
+    # --- loading ---
+    def _signature(self) -> Tuple[int, int]:
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def _build(self, signature: Tuple[int, int], version: int) -> _Snapshot:
+        df = MarketPriceDB(self.path).frame() if is_database_path(self.path) else pd.read_csv(self.path)
+        missing = [c for c in COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"Market price file {self.path} is missing columns: {missing}")
+        df = df[COLUMNS].copy()
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        df["price_per_kg"] = pd.to_numeric(df["price_per_kg"], errors="coerce")
+        df = df.dropna(subset=["date", "region", "crop_name", "price_per_kg"])
+        df["region"] = df["region"].str.strip().str.lower()
+        df["crop_name"] = df["crop_name"].str.strip()
+        df["crop_key"] = df["crop_name"].str.lower()
+        df = df.sort_values(["region", "crop_key", "date"], kind="mergesort").reset_index(drop=True)
+
+        series = {}
+        for (region, crop), idx in df.groupby(["region", "crop_key"], sort=False).indices.items():
+            series[(region, crop)] = (df["date"].to_numpy()[idx], df["price_per_kg"].to_numpy(dtype=float)[idx])
+        crop_names = dict(zip(df["crop_key"], df["crop_name"]))
+        frame = df.sort_values("date", kind="mergesort").reset_index(drop=True)
+        return _Snapshot(signature, version, frame, series, crop_names)
+
+    def _current(self) -> _Snapshot:
+        """The snapshot matching the file on disk, reloading it if the file changed."""
+        signature = self._signature()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.signature == signature:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.signature != signature:
+                version = snapshot.version + 1 if snapshot else 1
+                self._snapshot = snapshot = self._build(signature, version)
+                self.reloads += 1
+        return snapshot
+
+    @property
+    def version(self) -> int:
+        """Increments every time the file is (re)loaded; usable as a cache key."""
+        return self._current().version
+
+    def versioned_frame(self) -> Tuple[int, pd.DataFrame]:
+        """(version, all rows) from one snapshot, so a cache key always matches its data."""
+        snapshot = self._current()
+        return snapshot.version, snapshot.frame[COLUMNS]
+
+    # --- queries ---
+    def frame(self, region: Optional[str] = None, crop: Optional[str] = None) -> pd.DataFrame:
+        """Date-sorted rows (date, region, crop_name, price_per_kg), optionally filtered."""
+        df = self._current().frame
+        if region is not None:
+            df = df[df["region"] == _key(region)]
+        if crop is not None:
+            df = df[df["crop_key"] == _key(crop)]
+        return df[COLUMNS]
+
+    def regions(self) -> List[str]:
+        return sorted({region for region, _ in self._current().series})
+
+    def crops(self, region: Optional[str] = None) -> List[str]:
+        snapshot = self._current()
+        keys = {crop for r, crop in snapshot.series if region is None or r == _key(region)}
+        return sorted(snapshot.crop_names[k] for k in keys)
+
+    def series(self, region: str, crop: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted (dates, prices) arrays for one region and crop; empty arrays if unknown."""
+        return self._current().series.get((_key(region), _key(crop)),
+                                          (np.array([], dtype="datetime64[ns]"), np.array([], dtype=float)))
+
+    def price_as_of(self, region: str, crop: str, date) -> Optional[float]:
+        """Last known price on or before `date`, or None."""
+        dates, prices = self.series(region, crop)
+        pos = np.searchsorted(dates, np.datetime64(pd.Timestamp(date)), side="right") - 1
+        return float(prices[pos]) if pos >= 0 else None
+
+    def price_range(self, region: str, crop: str, start=None, end=None) -> pd.DataFrame:
+        """Observations with start <= date <= end (either bound optional)."""
+        dates, prices = self.series(region, crop)
+        lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side="left") if start is not None else 0
+        hi = np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side="right") if end is not None else len(dates)
+        return pd.DataFrame({"date": dates[lo:hi], "price_per_kg": prices[lo:hi]})
+
+    def latest_prices(self, region: Optional[str] = None) -> pd.DataFrame:
+        """Most recent price of every (region, crop), optionally for one region only."""
+        snapshot = self._current()
+        rows = [
+            {"region": r, "crop_name": snapshot.crop_names[c], "date": dates[-1], "price_per_kg": prices[-1]}
+            for (r, c), (dates, prices) in snapshot.series.items()
+            if region is None or r == _key(region)
+        ]
+        return pd.DataFrame(rows, columns=["region", "crop_name", "date", "price_per_kg"])
+
+
+_stores: Dict[str, MarketPriceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def default_price_source() -> str:
+    """The ingested price database when it exists, otherwise the bundled CSV."""
+    return DEFAULT_MARKET_DB_PATH if os.path.exists(DEFAULT_MARKET_DB_PATH) else DEFAULT_MARKET_PRICES_PATH
+
+
+def get_price_store(path: Optional[str] = None) -> MarketPriceStore:
+    """Process-wide store for a price file (default_price_source() by default)."""
+    path = os.path.abspath(path or default_price_source())
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = MarketPriceStore(path)
+        return _stores[path]
@@ -0,0 +1,295 @@
+# File: src/planning/crop_reverse_index.py
+"""
+Reverse index: every township where a crop is suitable, best predicted profit first.
+
+Suitable (crop, township) pairs come from three sources:
+  - knowledge_base.csv rows (with predicted profit and yield),
+  - the 'Suitable Crops' lists of 'Full Data.txt',
+  - data/crop_settings.json, whose cities are added as townships of their own.
+Townships are the sites of src.planning.township_locator plus those cities.
+
+The pairs are stored as a crop x township CSR matrix (scipy.sparse) whose value
+is the best predicted profit (NaN when only suitability is known). Each crop's
+row is laid out best profit first, so the slice of column ids for a crop is
+its ranked posting list and a reverse query costs O(result size).
+
+Python:
+    index = get_crop_reverse_index()
+    index.townships("Mango", top=10)                  # DataFrame
+    where_to_grow("Mango", top=10, min_profit=50000)   # JSON-ready records
+
+CLI:
+    python -m src.planning.crop_reverse_index --crop Mango --top 10
+    python -m src.planning.crop_reverse_index --benchmark
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.planning.knowledge_base_query import FULL_DATA_PATH, KNOWLEDGE_BASE_PATH, PROJECT_ROOT
+from src.planning.township_locator import TownshipLocator, get_township_locator
+
+CROP_SETTINGS_PATH = os.path.join(PROJECT_ROOT, "data", "crop_settings.json")
+
+# Bit flags recording where a (crop, township) pair comes from
+SOURCE_KNOWLEDGE_BASE = 1
+SOURCE_FULL_DATA = 2
+SOURCE_CROP_SETTINGS = 4
+SOURCE_NAMES = {SOURCE_KNOWLEDGE_BASE: "knowledge base", SOURCE_FULL_DATA: "Full Data",
+                SOURCE_CROP_SETTINGS: "crop settings"}
+RESULT_COLUMNS = ["Township", "Region", "Latitude", "Longitude", "PredictedProfitMMK", "PredictedYieldPerSqmKg",
+                  "Sources"]
+
+
+def _crop_key(name) -> str:
+    return str(name).strip().lower()
+
+
+def _settings_sites(crop_settings: Dict, city_coordinates: Dict) -> pd.DataFrame:
+    """One township row per crop-settings city with known coordinates."""
+    rows = []
+    for city in crop_settings:
+        location = city_coordinates.get(city)
+        if not location:
+            continue
+        name, _, region = city.partition(" (")
+        rows.append({"Township": name, "Region": region.rstrip(")") or name, "Latitude": location["lat"],
+                     "Longitude": location["lon"], "City": city})
+    return pd.DataFrame(rows, columns=["Township", "Region", "Latitude", "Longitude", "City"])
+
+
+class CropReverseIndex:
+    """
+    Args:
+        locator: Township locator (knowledge-base and 'Full Data.txt' sites)
+        crop_settings: Parsed data/crop_settings.json ({city: [crop settings, ...]})
+        city_coordinates: {city: {'lat', 'lon'}} for the crop-settings cities
+
+    Crops are addressed by position in `crops`, townships by position in `sites`.
+    """
+
+    def __init__(self, locator: TownshipLocator, crop_settings: Optional[Dict] = None,
+                 city_coordinates: Optional[Dict] = None):
+        kb = locator.kb
+        cities = _settings_sites(crop_settings or {}, city_coordinates or {})
+        self.sites = pd.concat([locator.sites[["Township", "Region", "Latitude", "Longitude"]],
+                                cities.drop(columns="City")], ignore_index=True)
+
+        # (crop, site, profit, knowledge-base row, source) for every suitable pair
+        site_of_row = np.full(len(kb), -1, dtype=np.int64)
+        for site, rows in enumerate(locator.site_rows):
+            site_of_row[rows] = site
+        kb_rows = np.flatnonzero(site_of_row >= 0)
+        parts = [pd.DataFrame({
+            "crop": kb.frame["CropName"].to_numpy()[kb_rows], "site": site_of_row[kb_rows],
+            "profit": kb.values["profit"][kb_rows], "row": kb_rows, "source": SOURCE_KNOWLEDGE_BASE,
+        })]
+        listed = locator.sites["SuitableCrops"].dropna().str.split(",").explode()
+        parts.append(pd.DataFrame({"crop": listed.to_numpy(), "site": listed.index.to_numpy(),
+                                   "profit": np.nan, "row": -1, "source": SOURCE_FULL_DATA}))
+        settings = [(entry["crop_name"], len(locator) + i)
+                    for i, city in enumerate(cities["City"]) for entry in crop_settings[city]]
+        parts.append(pd.DataFrame(settings, columns=["crop", "site"]).assign(
+            profit=np.nan, row=-1, source=SOURCE_CROP_SETTINGS))
+        pairs = pd.concat([p for p in parts if not p.empty], ignore_index=True)
+        pairs["crop"] = pairs["crop"].astype(str).str.strip()
+        pairs = pairs[pairs["crop"] != ""]
+        pairs["key"] = pairs["crop"].str.lower()
+
+        # One entry per (crop, site): its best profit and that row, and every source
+        pairs = pairs.sort_values("profit", ascending=False, na_position="last", kind="stable")
+        grouped = pairs.groupby(["key", "site"], sort=False)
+        entries = grouped.first()[["crop", "profit", "row"]]
+        entries["source"] = grouped["source"].agg(lambda s: np.bitwise_or.reduce(s.to_numpy()))
+        entries = entries.reset_index()
+
+        # Display name: the knowledge-base spelling when there is one (entries are profit-sorted)
+        names = entries.groupby("key", sort=True)["crop"].first()
+        self.crops: List[str] = names.tolist()
+        self.crop_of: Dict[str, int] = {key: i for i, key in enumerate(names.index)}
+        entries["crop_id"] = entries["key"].map(self.crop_of)
+
+        # CSR layout, each crop's row best profit first (NaN last, then township order)
+        entries = entries.sort_values(["crop_id", "profit", "site"], ascending=[True, False, True],
+                                      na_position="last", kind="stable")
+        counts = np.bincount(entries["crop_id"], minlength=len(self.crops))
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        self.matrix = sparse.csr_matrix(
+            (entries["profit"].to_numpy(dtype=float), entries["site"].to_numpy(dtype=np.int32), indptr),
+            shape=(len(self.crops), len(self.sites)))
+        self.best_rows = entries["row"].to_numpy(dtype=np.int64)
+        self.sources = entries["source"].to_numpy(dtype=np.int8)
+
+        # Per-entry and per-township columns, so a result frame is built from slices
+        kb_yield = kb.values["yield"]
+        self._entry_yield = np.where(self.best_rows >= 0, kb_yield[np.maximum(self.best_rows, 0)], np.nan) \
+            if len(self.best_rows) else np.empty(0)
+        labels = {s: ", ".join(name for flag, name in SOURCE_NAMES.items() if s & flag) for s in np.unique(self.sources)}
+        self._entry_sources = np.array([labels[s] for s in self.sources], dtype=object)
+        self._site_columns = {c: self.sites[c].to_numpy() for c in ["Township", "Region", "Latitude", "Longitude"]}
+
+    def __len__(self) -> int:
+        return self.matrix.nnz
+
+    def posting(self, crop: str) -> Tuple[int, int]:
+        """[start, end) of the crop's ranked posting list in the CSR arrays; (0, 0) for unknown crops."""
+        i = self.crop_of.get(_crop_key(crop))
+        if i is None:
+            return 0, 0
+        return int(self.matrix.indptr[i]), int(self.matrix.indptr[i + 1])
+
+    def _entries(self, crop: str, top: Optional[int], min_profit: Optional[float]) -> slice:
+        start, end = self.posting(crop)
+        if min_profit is not None:
+            # Profits are descending with NaN last, so the passing entries are a prefix
+            profits = self.matrix.data[start:end]
+            end = start + int(np.searchsorted(-np.nan_to_num(profits, nan=-np.inf), -min_profit, side="right"))
+        if top is not None:
+            end = min(end, start + top)
+        return slice(start, end)
+
+    def township_ids(self, crop: str, top: Optional[int] = None, min_profit: Optional[float] = None) -> np.ndarray:
+        """Township positions where `crop` is suitable, best predicted profit first."""
+        return self.matrix.indices[self._entries(crop, top, min_profit)]
+
+    def townships(self, crop: str, top: Optional[int] = None, min_profit: Optional[float] = None) -> pd.DataFrame:
+        """township_ids() as a frame of RESULT_COLUMNS."""
+        entries = self._entries(crop, top, min_profit)
+        ids = self.matrix.indices[entries]
+        columns = {name: values[ids] for name, values in self._site_columns.items()}
+        columns.update({
+            "PredictedProfitMMK": self.matrix.data[entries].round(2),
+            "PredictedYieldPerSqmKg": self._entry_yield[entries],
+            "Sources": self._entry_sources[entries],
+        })
+        return pd.DataFrame(columns, columns=RESULT_COLUMNS)
+
+
+_indexes: Dict[Tuple[str, str], Tuple[TownshipLocator, Optional[Tuple[int, int]], CropReverseIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_crop_settings(path: str) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def get_crop_reverse_index(kb_path: Optional[str] = None, full_data_path: str = FULL_DATA_PATH,
+                           crop_settings_path: str = CROP_SETTINGS_PATH) -> CropReverseIndex:
+    """Process-wide reverse index, rebuilt when any of its source files changes."""
+    from app.data.city_coordinates import CITY_COORDINATES
+
+    locator = get_township_locator(kb_path, full_data_path)
+    key = (os.path.abspath(kb_path or KNOWLEDGE_BASE_PATH), os.path.abspath(crop_settings_path))
+    signature = _signature(crop_settings_path)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] is locator and cached[1] == signature:
+            return cached[2]
+    index = CropReverseIndex(locator, _load_crop_settings(crop_settings_path), CITY_COORDINATES)
+    with _indexes_lock:
+        _indexes[key] = (locator, signature, index)
+    return index
+
+
+def where_to_grow(crop: str, top: Optional[int] = 20, min_profit: Optional[float] = None) -> List[Dict]:
+    """
+    Townships where `crop` is suitable, best predicted profit first.
+
+    Args:
+        crop: Crop name (case-insensitive)
+        top: Maximum number of townships (None for all)
+        min_profit: Only townships with at least this predicted profit (MMK);
+            townships without a profit prediction are then left out
+
+    Returns:
+        List of dicts with township, region, latitude, longitude,
+        predicted_profit_mmk, predicted_yield_per_sqm_kg (None when unknown) and sources
+    """
+    result = get_crop_reverse_index().townships(crop, top=top, min_profit=min_profit)
+    records = []
+    for r in result.itertuples(index=False):
+        records.append({
+            "township": r.Township,
+            "region": r.Region,
+            "latitude": float(r.Latitude),
+            "longitude": float(r.Longitude),
+            "predicted_profit_mmk": None if np.isnan(r.PredictedProfitMMK) else float(r.PredictedProfitMMK),
+            "predicted_yield_per_sqm_kg": None if np.isnan(r.PredictedYieldPerSqmKg) else float(r.PredictedYieldPerSqmKg),
+            "sources": r.Sources.split(", "),
+        })
+    return records
+
+
+def _benchmark(index: CropReverseIndex, repeats: int = 2000):
+    """Time reverse queries for every crop against a scan of the pairs."""
+    crops = index.crops
+    started = time.perf_counter()
+    for _ in range(repeats // len(crops) + 1):
+        for crop in crops:
+            index.township_ids(crop, top=10)
+    per_query = (time.perf_counter() - started) / ((repeats // len(crops) + 1) * len(crops))
+
+    coo = index.matrix.tocoo()
+    started = time.perf_counter()
+    for crop in crops:
+        hits = coo.col[coo.row == index.crop_of[crop.lower()]]
+    scan = (time.perf_counter() - started) / len(crops)
+
+    started = time.perf_counter()
+    for crop in crops:
+        index.townships(crop, top=10)
+    frame = (time.perf_counter() - started) / len(crops)
+    print(f"{len(crops)} crops x {len(index.sites)} townships, {len(index)} suitable pairs")
+    print(f"  posting-list slice, top 10:   {per_query * 1e6:8.2f} µs")
+    print(f"  as a result frame, top 10:    {frame * 1e6:8.1f} µs")
+    print(f"  scan of all pairs (unranked): {scan * 1e6:8.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Townships where a crop is suitable, ranked by predicted profit.")
+    parser.add_argument("--crop")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--min-profit", type=float)
+    parser.add_argument("--list-crops", action="store_true")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = get_crop_reverse_index()
+    print(f"Built the reverse index in {(time.perf_counter() - started) * 1000:.0f} ms")
+    if args.benchmark:
+        _benchmark(index)
+        return
+    if args.list_crops or not args.crop:
+        print(", ".join(index.crops))
+        return
+
+    result = index.townships(args.crop, top=args.top, min_profit=args.min_profit)
+    if result.empty:
+        print(f"No townships found for '{args.crop}'.")
+    else:
+        print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+# File: src/planning/knowledge_base_query.py
+"""
+Indexed, in-memory query engine for knowledge_base.csv.
+
+The file is loaded once per (path, modification time) into column arrays with
+  - hash indexes (lowercase value -> sorted row ids) on township, region, crop
+    and fertilizer type,
+  - sorted indexes (row ids, best first) on predicted profit and yield.
+A query starts from the shortest posting list among its equality filters,
+checks the other filters on those rows only, and ranks the survivors by their
+position in the sorted index. Queries without equality filters walk the
+sorted index in blocks and stop as soon as k rows pass.
+
+Python:
+    kb = get_knowledge_base()
+    kb.query(region="Mandalay", max_water=1500, fertilizer="Organic", top=10, by="profit")
+
+CLI:
+    python -m src.planning.knowledge_base_query --region Mandalay --max-water 1500 --fertilizer Organic --top 10
+    python -m src.planning.knowledge_base_query --benchmark 300000
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+KNOWLEDGE_BASE_PATH = os.path.join(PROJECT_ROOT, "knowledge_base.csv")
+FULL_DATA_PATH = os.path.join(PROJECT_ROOT, "Full Data.txt")
+
+# Query keyword -> knowledge-base column
+HASH_INDEXES = {
+    "township": "KnownTownships",
+    "region": "KnownRegions",
+    "crop": "CropName",
+    "fertilizer": "FertilizerType",
+}
+SORT_KEYS = {
+    "profit": "PredictedProfitMMK",
+    "yield": "PredictedYieldPerSqmKg",
+}
+WATER_COLUMN = "WaterAvailabilityLPerDay"
+RESULT_COLUMNS = ["CropName", "KnownTownships", "KnownRegions", "FertilizerType", WATER_COLUMN,
+                  "AvgMarketPriceMMK", "PredictedYieldPerSqmKg", "PredictedProfitMMK", "PlantingRecommendation"]
+
+
+def attach_site_columns(kb: pd.DataFrame, full_data_path: str = FULL_DATA_PATH) -> pd.DataFrame:
+    """
+    Knowledge bases built before the water/fertilizer columns existed: take them from
+    'Full Data.txt' by matching region and coordinates.
+    """
+    if WATER_COLUMN in kb.columns and "FertilizerType" in kb.columns:
+        return kb
+    try:
+        sites = pd.read_csv(full_data_path)
+    except FileNotFoundError:
+        return kb.assign(**{WATER_COLUMN: np.nan, "FertilizerType": None})
+    sites.columns = sites.columns.str.strip()
+    sites = sites.rename(columns={"Region": "KnownRegions", "Water Availability (L/day)": WATER_COLUMN,
+                                  "Fertilizer Type": "FertilizerType"})
+    sites = sites.drop_duplicates(["KnownRegions", "Latitude", "Longitude"])
+    keys = ["KnownRegions", "Latitude", "Longitude"]
+    return kb.merge(sites[keys + [WATER_COLUMN, "FertilizerType"]], on=keys, how="left")
+
+
+class KnowledgeBaseIndex:
+    """
+    Args:
+        kb: Knowledge-base frame (as written by create_knowledge_base.py)
+
+    Rows are addressed by position in `frame`; queries return positions or frames.
+    """
+
+    def __init__(self, kb: pd.DataFrame):
+        self.frame = kb.reset_index(drop=True)
+        n = len(self.frame)
+
+        self.hash_indexes: Dict[str, Dict[str, np.ndarray]] = {}
+        self.codes: Dict[str, np.ndarray] = {}  # per-row value code, to check further filters on candidates
+        self.code_of: Dict[str, Dict[str, int]] = {}
+        for name, column in HASH_INDEXES.items():
+            if column not in self.frame.columns:
+                self.hash_indexes[name], self.codes[name], self.code_of[name] = {}, np.full(n, -1), {}
+                continue
+            keys = self.frame[column].astype("string").str.strip().str.lower().fillna("")
+            codes, uniques = pd.factorize(keys)
+            order = np.argsort(codes, kind="stable")  # row ids grouped by value, ascending within each
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.hash_indexes[name] = {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)}
+            self.codes[name] = codes
+            self.code_of[name] = {value: i for i, value in enumerate(uniques)}
+
+        self.water = pd.to_numeric(self.frame.get(WATER_COLUMN, pd.Series(np.nan, index=self.frame.index)),
+                                   errors="coerce").to_numpy(dtype=float)
+        self.values: Dict[str, np.ndarray] = {}
+        self.sorted_indexes: Dict[str, np.ndarray] = {}
+        self.ranks: Dict[str, np.ndarray] = {}
+        for name, column in SORT_KEYS.items():
+            values = pd.to_numeric(self.frame[column], errors="coerce").to_numpy(dtype=float)
+            # Best first; NaN last
+            order = np.argsort(np.where(np.isnan(values), np.inf, -values), kind="stable")
+            rank = np.empty(n, dtype=np.int64)
+            rank[order] = np.arange(n)
+            self.values[name], self.sorted_indexes[name], self.ranks[name] = values, order, rank
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def distinct(self, field: str) -> List[str]:
+        """Indexed values of a hash-indexed field (lowercase)."""
+        return sorted(v for v in self.hash_indexes[field] if v)
+
+    def query_ids(self, top: Optional[int] = 10, by: str = "profit", min_water: Optional[float] = None,
+                  max_water: Optional[float] = None, min_profit: Optional[float] = None,
+                  **equals: Optional[str]) -> np.ndarray:
+        """
+        Row positions matching all filters, best first by `by`.
+
+        Args:
+            top: Number of rows to return (None for all matches)
+            by: 'profit' or 'yield'
+            min_water, max_water: Bounds on the township's water availability (L/day)
+            min_profit: Lower bound on predicted profit (MMK)
+            **equals: township, region, crop and/or fertilizer (case-insensitive)
+        """
+        if by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{by}'; expected one of {list(SORT_KEYS)}")
+        unknown = set(equals) - set(HASH_INDEXES)
+        if unknown:
+            raise ValueError(f"Unknown filter(s) {sorted(unknown)}; expected {list(HASH_INDEXES)}")
+
+        wanted = {field: str(value).strip().lower() for field, value in equals.items() if value is not None}
+        if any(value not in self.code_of[field] for field, value in wanted.items()):
+            return np.empty(0, dtype=np.int64)
+
+        if not wanted:
+            return self._scan(self.sorted_indexes[by], top, min_water, max_water, min_profit)
+
+        # Start from the shortest posting list; check the other equality filters by value code
+        fields = sorted(wanted, key=lambda f: len(self.hash_indexes[f][wanted[f]]))
+        candidates = self.hash_indexes[fields[0]][wanted[fields[0]]]
+        keep = self._range_mask(candidates, min_water, max_water, min_profit)
+        for field in fields[1:]:
+            keep &= self.codes[field][candidates] == self.code_of[field][wanted[field]]
+        candidates = candidates[keep]
+
+        ranks = self.ranks[by][candidates]
+        if top is not None and len(candidates) > top:
+            best = np.argpartition(ranks, top - 1)[:top]
+            candidates, ranks = candidates[best], ranks[best]
+        return candidates[np.argsort(ranks, kind="stable")]
+
+    def _range_mask(self, ids: np.ndarray, min_water: Optional[float], max_water: Optional[float],
+                    min_profit: Optional[float]) -> np.ndarray:
+        keep = np.ones(len(ids), dtype=bool)
+        if min_water is not None:
+            keep &= self.water[ids] >= min_water
+        if max_water is not None:
+            keep &= self.water[ids] <= max_water
+        if min_profit is not None:
+            keep &= self.values["profit"][ids] >= min_profit
+        return keep
+
+    def _scan(self, order: np.ndarray, top: Optional[int], min_water: Optional[float],
+              max_water: Optional[float], min_profit: Optional[float], block: int = 2048) -> np.ndarray:
+        """Walk a sorted index in blocks, stopping once `top` rows pass the range filters."""
+        if top is None:
+            return order[self._range_mask(order, min_water, max_water, min_profit)]
+        hits, found = [], 0
+        for start in range(0, len(order), block):
+            ids = order[start:start + block]
+            ids = ids[self._range_mask(ids, min_water, max_water, min_profit)]
+            hits.append(ids)
+            found += len(ids)
+            if found >= top:
+                break
+        return np.concatenate(hits)[:top] if hits else order[:0]
+
+    def query(self, top: Optional[int] = 10, by: str = "profit", columns: Optional[List[str]] = None,
+              **filters) -> pd.DataFrame:
+        """query_ids() as a frame of `columns` (RESULT_COLUMNS by default)."""
+        ids = self.query_ids(top=top, by=by, **filters)
+        columns = [c for c in (columns or RESULT_COLUMNS) if c in self.frame.columns]
+        return self.frame.iloc[ids][columns]
+
+
+_indexes: Dict[str, Tuple[Tuple[int, int], KnowledgeBaseIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_knowledge_base(path: Optional[str] = None) -> KnowledgeBaseIndex:
+    """Process-wide index of a knowledge-base CSV, rebuilt when the file changes."""
+    path = os.path.abspath(path or KNOWLEDGE_BASE_PATH)
+    st = os.stat(path)
+    signature = (st.st_mtime_ns, st.st_size)
+    with _indexes_lock:
+        cached = _indexes.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    index = KnowledgeBaseIndex(attach_site_columns(pd.read_csv(path)))
+    with _indexes_lock:
+        _indexes[path] = (signature, index)
+    return index
+
+
+def _benchmark(kb: pd.DataFrame, rows: int, repeats: int = 200):
+    """Replicate the knowledge base to `rows` rows and time typical queries."""
+    copies = max(1, -(-rows // len(kb)))
+    big = pd.concat([kb] * copies, ignore_index=True).iloc[:rows].copy()
+    rng = np.random.default_rng(0)
+    big["PredictedProfitMMK"] = big["PredictedProfitMMK"] * rng.uniform(0.8, 1.2, len(big))
+    big[WATER_COLUMN] = big[WATER_COLUMN] * rng.uniform(0.8, 1.2, len(big))
+
+    started = time.perf_counter()
+    index = KnowledgeBaseIndex(big)
+    print(f"Indexed {len(index)} rows in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    # Filter values taken from the data, so every case times a non-empty result: the most
+    # common (region, fertilizer) pair, with the water cap at that group's median
+    keys = pd.DataFrame({"region": big[HASH_INDEXES["region"]].astype("string").str.strip().str.lower(),
+                         "fertilizer": big[HASH_INDEXES["fertilizer"]].astype("string").str.strip().str.lower(),
+                         "water": pd.to_numeric(big[WATER_COLUMN], errors="coerce")})
+    region, fertilizer = keys.groupby(["region", "fertilizer"]).size().idxmax()
+    group_water = keys.loc[(keys["region"] == region) & (keys["fertilizer"] == fertilizer), "water"]
+    low, high = keys["water"].quantile([0.4, 0.6])
+    cases = {
+        "region + water + fertilizer, top 10 by profit":
+            dict(region=region, max_water=float(group_water.median()), fertilizer=fertilizer, top=10, by="profit"),
+        "crop, top 10 by yield": dict(crop=index.distinct("crop")[0], top=10, by="yield"),
+        "water range only, top 10 by profit": dict(min_water=float(low), max_water=float(high), top=10),
+    }
+    for label, kwargs in cases.items():
+        started = time.perf_counter()
+        for _ in range(repeats):
+            ids = index.query_ids(**kwargs)
+        elapsed = (time.perf_counter() - started) / repeats
+        print(f"  {label:<48} {elapsed * 1e6:8.1f} µs  ({len(ids)} rows)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query knowledge_base.csv.")
+    parser.add_argument("--kb", default=KNOWLEDGE_BASE_PATH)
+    for name in HASH_INDEXES:
+        parser.add_argument(f"--{name}")
+    parser.add_argument("--min-water", type=float)
+    parser.add_argument("--max-water", type=float)
+    parser.add_argument("--min-profit", type=float)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--by", choices=list(SORT_KEYS), default="profit")
+    parser.add_argument("--benchmark", type=int, metavar="ROWS", help="Time queries on a replicated knowledge base")
+    args = parser.parse_args()
+
+    index = get_knowledge_base(args.kb)
+    if args.benchmark:
+        _benchmark(index.frame, args.benchmark)
+        return
+
+    started = time.perf_counter()
+    result = index.query(top=args.top, by=args.by, min_water=args.min_water, max_water=args.max_water,
+                         min_profit=args.min_profit, **{name: getattr(args, name) for name in HASH_INDEXES})
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if result.empty:
+        print("No matching knowledge-base rows.")
+    else:
+        print(result.to_string(index=False))
+    print(f"\n{len(result)} rows in {elapsed_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
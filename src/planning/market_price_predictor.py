@@ -1,12 +1,15 @@
 # File: src/planning/market_price_predictor.py
 
+import math
+
 import pandas as pd
-from prophet import Prophet
+
+from src.market.fast_forecast import forecast_prices
 
 
-def forecast_market_price(df_market, period=30):
+def forecast_market_price(df_market, period=30, engine="prophet"):
     """
-    Forecast future market prices using the Prophet model.
+    Forecast future market prices.
 
     Parameters:
       df_market (pd.DataFrame): Historical market price data containing:
@@ -15,9 +18,25 @@ def forecast_market_price(df_market, period=30):
 
       period (int): Number of days to forecast into the future.
 
+      engine (str): 'prophet' (default) for the Prophet model: daily rows,
+          history included; needs Prophet installed. 'fast' for the NumPy
+          exponential-smoothing engine: monthly steps covering `period` days,
+          future rows only, with no Prophet needed.
+
     Returns:
-      pd.DataFrame: Forecast DataFrame with columns for date and predicted price (yhat).
+      pd.DataFrame: Forecast DataFrame with columns ds, yhat, yhat_lower and yhat_upper:
+          one row per day including the history (prophet), or ceil(period / 30)
+          monthly future rows (fast).
     """
+    if engine == "fast":
+        frame = pd.DataFrame({"series": 0, "date": df_market["ds"], "price_per_kg": df_market["y"]})
+        forecast = forecast_prices(frame, horizon=max(1, math.ceil(period / 30)), keys=["series"])
+        return forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+    if engine != "prophet":
+        raise ValueError(f"Unknown forecasting engine: {engine}")
+
+    from prophet import Prophet
+
     # Initialize and fit the Prophet model on your market data.
     model = Prophet()
     model.fit(df_market)
@@ -0,0 +1,258 @@
+# File: src/planning/township_locator.py
+"""
+Nearest known township for any farm location.
+
+Every distinct coordinate in knowledge_base.csv and 'Full Data.txt' is a site
+(township name, region, suitable crops, and the knowledge-base rows at that
+site). The sites are held in a haversine ball tree (src.utils.geo), so the k
+nearest sites to a latitude/longitude are found without scanning them all,
+and their crop rows come from a per-site list of knowledge-base row ids.
+
+Python:
+    locator = get_township_locator()
+    locator.nearest(21.2, 95.9, k=3)              # sites with distance_km
+    locator.crops_near(21.2, 95.9, k=3, top=10)   # their knowledge-base rows, best profit first
+
+CLI:
+    python -m src.planning.township_locator --lat 21.2 --lon 95.9 --k 3
+    python -m src.planning.township_locator --benchmark 10000
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.planning.knowledge_base_query import (FULL_DATA_PATH, KNOWLEDGE_BASE_PATH, RESULT_COLUMNS, SORT_KEYS,
+                                               KnowledgeBaseIndex, get_knowledge_base)
+from src.utils.geo import build_haversine_tree, haversine_km, query_nearest_km
+
+SITE_COLUMNS = ["Township", "Region", "Latitude", "Longitude", "SuitableCrops", "KnowledgeBaseRows"]
+COORDINATE_DECIMALS = 5  # ~1 m; coordinates that agree to this precision are one site
+# Bounding box of Myanmar, used for benchmark queries
+MYANMAR_BOUNDS = {"lat": (9.6, 28.5), "lon": (92.2, 101.2)}
+
+
+def _load_full_data(path: str) -> Optional[pd.DataFrame]:
+    try:
+        df = pd.read_csv(path)
+    except FileNotFoundError:
+        return None
+    df.columns = df.columns.str.strip()
+    # Placeholder names ('Township_12') carry no information; use the region as create_knowledge_base.py does
+    placeholder = df["Township"].astype(str).str.strip().str.startswith("Township_")
+    df["Township"] = df["Township"].where(~placeholder, df["Region"])
+    return df
+
+
+class TownshipLocator:
+    """
+    Args:
+        kb: Indexed knowledge base
+        full_data: Township table ('Full Data.txt'); its sites are added to the knowledge-base sites
+
+    Sites are addressed by position in `sites`.
+    """
+
+    def __init__(self, kb: KnowledgeBaseIndex, full_data: Optional[pd.DataFrame] = None):
+        self.kb = kb
+        frame = kb.frame
+        parts = [pd.DataFrame({
+            "Township": frame["KnownTownships"], "Region": frame["KnownRegions"],
+            "Latitude": pd.to_numeric(frame["Latitude"], errors="coerce"),
+            "Longitude": pd.to_numeric(frame["Longitude"], errors="coerce"),
+            "Crop": frame["CropName"], "SuitableCrops": None, "row": np.arange(len(frame)),
+        })]
+        if full_data is not None:
+            parts.append(pd.DataFrame({
+                "Township": full_data["Township"], "Region": full_data["Region"],
+                "Latitude": pd.to_numeric(full_data["Latitude"], errors="coerce"),
+                "Longitude": pd.to_numeric(full_data["Longitude"], errors="coerce"),
+                "Crop": None, "SuitableCrops": full_data.get("Suitable Crops"), "row": -1,
+            }))
+        points = pd.concat([p for p in parts if not p.empty], ignore_index=True)
+        points = points.dropna(subset=["Latitude", "Longitude"])
+
+        # Knowledge-base points come first, so their township names win for shared sites
+        site_of, _ = pd.factorize(pd.MultiIndex.from_arrays([points["Latitude"].round(COORDINATE_DECIMALS),
+                                                             points["Longitude"].round(COORDINATE_DECIMALS)]))
+        points = points.assign(site=site_of)
+        grouped = points.groupby("site", sort=True)
+        sites = grouped[["Township", "Region", "Latitude", "Longitude"]].first()
+        kb_points = points[points["row"] >= 0]
+        kb_crops = kb_points.groupby("site")["Crop"].agg(lambda c: ", ".join(dict.fromkeys(c.dropna().str.strip())))
+        listed = grouped["SuitableCrops"].first()
+        sites["SuitableCrops"] = listed.where(listed.notna(), kb_crops.reindex(sites.index))
+
+        # Knowledge-base row ids per site
+        order = np.argsort(kb_points["site"].to_numpy(), kind="stable")
+        rows, row_sites = kb_points["row"].to_numpy()[order], kb_points["site"].to_numpy()[order]
+        bounds = np.searchsorted(row_sites, np.arange(len(sites) + 1))
+        self.site_rows: List[np.ndarray] = [rows[bounds[i]:bounds[i + 1]] for i in range(len(sites))]
+        sites["KnowledgeBaseRows"] = np.diff(bounds)
+
+        self.sites = sites.reset_index(drop=True)[SITE_COLUMNS]
+        self.lats = self.sites["Latitude"].to_numpy(dtype=float)
+        self.lons = self.sites["Longitude"].to_numpy(dtype=float)
+        self.tree = build_haversine_tree(self.lats, self.lons)
+
+    def __len__(self) -> int:
+        return len(self.sites)
+
+    def nearest_ids(self, lat: float, lon: float, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """(distances_km, site ids) of the k nearest sites, nearest first."""
+        distances, ids = query_nearest_km(self.tree, lat, lon, k=k)
+        return distances[0], ids[0]
+
+    def nearest_batch(self, lats, lons, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """(distances_km, site ids), each of shape (n_locations, k), for many locations at once."""
+        return query_nearest_km(self.tree, lats, lons, k=k)
+
+    def nearest(self, lat: float, lon: float, k: int = 5) -> pd.DataFrame:
+        """The k nearest sites (SITE_COLUMNS plus distance_km), nearest first."""
+        distances, ids = self.nearest_ids(lat, lon, k)
+        return self.sites.iloc[ids].assign(distance_km=distances.round(2))
+
+    def rows_near(self, lat: float, lon: float, k: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """(knowledge-base row ids, distance_km of each row's site) for the k nearest sites."""
+        distances, ids = self.nearest_ids(lat, lon, k)
+        rows = [self.site_rows[i] for i in ids]
+        counts = [len(r) for r in rows]
+        if not sum(counts):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        return np.concatenate(rows), np.repeat(distances, counts)
+
+    def crops_near(self, lat: float, lon: float, k: int = 3, top: Optional[int] = None, by: Optional[str] = "profit",
+                   columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Knowledge-base rows of the k nearest sites with their distance_km.
+
+        Args:
+            lat, lon: Farm location in degrees
+            k: Number of nearest sites to include
+            top: Keep only the best `top` rows (None for all)
+            by: 'profit' or 'yield' to rank best first, or None to order by distance
+            columns: Knowledge-base columns to return (RESULT_COLUMNS by default)
+        """
+        if by is not None and by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{by}'; expected one of {list(SORT_KEYS)} or None")
+        rows, distances = self.rows_near(lat, lon, k)
+        if by is not None:
+            order = np.argsort(self.kb.ranks[by][rows], kind="stable")
+            rows, distances = rows[order], distances[order]
+        if top is not None:
+            rows, distances = rows[:top], distances[:top]
+        columns = [c for c in (columns or RESULT_COLUMNS) if c in self.kb.frame.columns]
+        return self.kb.frame.iloc[rows][columns].assign(distance_km=distances.round(2))
+
+
+_locators: Dict[Tuple[str, str], Tuple[KnowledgeBaseIndex, Optional[Tuple[int, int]], TownshipLocator]] = {}
+_locators_lock = threading.Lock()
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_township_locator(kb_path: Optional[str] = None, full_data_path: str = FULL_DATA_PATH) -> TownshipLocator:
+    """Process-wide locator, rebuilt when the knowledge base or 'Full Data.txt' changes."""
+    kb = get_knowledge_base(kb_path)
+    key = (os.path.abspath(kb_path or KNOWLEDGE_BASE_PATH), os.path.abspath(full_data_path))
+    signature = _signature(full_data_path)
+    with _locators_lock:
+        cached = _locators.get(key)
+        if cached is not None and cached[0] is kb and cached[1] == signature:
+            return cached[2]
+    locator = TownshipLocator(kb, _load_full_data(full_data_path))
+    with _locators_lock:
+        _locators[key] = (kb, signature, locator)
+    return locator
+
+
+def _time_single(fn, lats, lons) -> float:
+    started = time.perf_counter()
+    for lat, lon in zip(lats, lons):
+        fn(lat, lon)
+    return (time.perf_counter() - started) / len(lats)
+
+
+def _benchmark(locator: TownshipLocator, queries: int, scaled_sites: int = 100_000):
+    """
+    Time single and batched nearest-site queries against a linear haversine scan,
+    on the real sites and on `scaled_sites` random sites.
+    """
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(*MYANMAR_BOUNDS["lat"], queries)
+    lons = rng.uniform(*MYANMAR_BOUNDS["lon"], queries)
+    print(f"{len(locator)} sites, {queries} random locations")
+
+    singles = min(queries, 2000)
+    tree_single = _time_single(lambda lat, lon: locator.nearest_ids(lat, lon, k=5), lats[:singles], lons[:singles])
+    rows_single = _time_single(lambda lat, lon: locator.rows_near(lat, lon, k=3), lats[:singles], lons[:singles])
+    linear_single = _time_single(lambda lat, lon: np.argmin(haversine_km(lat, lon, locator.lats, locator.lons)),
+                                 lats[:singles], lons[:singles])
+    started = time.perf_counter()
+    _, batch_ids = locator.nearest_batch(lats, lons, k=1)
+    tree_batch = (time.perf_counter() - started) / queries
+    linear_ids = [np.argmin(haversine_km(lat, lon, locator.lats, locator.lons)) for lat, lon in zip(lats[:200], lons[:200])]
+
+    print(f"  ball tree, one location, k=5:        {tree_single * 1e6:8.1f} µs")
+    print(f"  ball tree + crop rows, k=3:          {rows_single * 1e6:8.1f} µs")
+    print(f"  linear haversine scan, one location: {linear_single * 1e6:8.1f} µs")
+    print(f"  ball tree, batched, per location:    {tree_batch * 1e6:8.1f} µs")
+    print(f"  nearest site agrees with the linear scan: {bool(np.array_equal(batch_ids[:200, 0], linear_ids))}")
+
+    # National scale: the scan grows with the number of sites, the tree query barely does
+    site_lats = rng.uniform(*MYANMAR_BOUNDS["lat"], scaled_sites)
+    site_lons = rng.uniform(*MYANMAR_BOUNDS["lon"], scaled_sites)
+    started = time.perf_counter()
+    tree = build_haversine_tree(site_lats, site_lons)
+    build_ms = (time.perf_counter() - started) * 1000
+    tree_single = _time_single(lambda lat, lon: query_nearest_km(tree, lat, lon, k=5), lats[:500], lons[:500])
+    linear_single = _time_single(lambda lat, lon: np.argmin(haversine_km(lat, lon, site_lats, site_lons)),
+                                 lats[:100], lons[:100])
+    print(f"{scaled_sites} random sites (tree built in {build_ms:.0f} ms)")
+    print(f"  ball tree, one location, k=5:        {tree_single * 1e6:8.1f} µs")
+    print(f"  linear haversine scan, one location: {linear_single * 1e6:8.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the known townships nearest to a location.")
+    parser.add_argument("--kb", default=KNOWLEDGE_BASE_PATH)
+    parser.add_argument("--full-data", default=FULL_DATA_PATH)
+    parser.add_argument("--lat", type=float)
+    parser.add_argument("--lon", type=float)
+    parser.add_argument("--k", type=int, default=3, help="Number of nearest sites")
+    parser.add_argument("--top", type=int, default=10, help="Crop rows to show")
+    parser.add_argument("--by", choices=list(SORT_KEYS), default="profit")
+    parser.add_argument("--benchmark", type=int, metavar="QUERIES", help="Time queries at random locations")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    locator = get_township_locator(args.kb, args.full_data)
+    print(f"Indexed {len(locator)} sites in {(time.perf_counter() - started) * 1000:.0f} ms")
+    if args.benchmark:
+        _benchmark(locator, args.benchmark)
+        return
+    if args.lat is None or args.lon is None:
+        parser.error("--lat and --lon are required unless --benchmark is given")
+
+    print(locator.nearest(args.lat, args.lon, k=args.k).to_string(index=False))
+    crops = locator.crops_near(args.lat, args.lon, k=args.k, top=args.top, by=args.by)
+    if crops.empty:
+        print("\nNo knowledge-base rows at these sites.")
+    else:
+        print()
+        print(crops.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# src/recommendations/crop_training.py
+"""
+Training pipeline for the site -> crop recommender.
+
+A training set has one row per (site, suitable crop): the site's region,
+coordinates, water availability, fertilizer type and the crop's market price as
+features, the crop as the label and a site id. It is either generated from the
+knowledge base (rows of knowledge_base.csv, with water/fertilizer joined from
+'Full Data.txt', resampled and jittered to the requested size) or read from a
+CSV/Parquet file with the same columns (site_id optional).
+
+`train_crop_recommender` runs a successive-halving random search
+(HalvingRandomSearchCV) in parallel: candidates are scored by cross-validation
+on growing subsamples, capped at `search_rows`, and only the survivors see more
+data. The winner is refitted on the full training split with all cores and
+scored on a held-out split (accuracy and top-3 accuracy, since the dashboard
+shows three crops). Splits and folds are grouped by site, so resampled copies of
+a site never land on both sides and the scores are for unseen sites. The fitted sklearn Pipeline is stored as a versioned
+artifact in a joblib ModelStore (data/models/crop_recommender), with a JSON
+sidecar recording the data, parameters, scores and timings.
+"""
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401  (enables HalvingRandomSearchCV)
+from sklearn.metrics import accuracy_score, top_k_accuracy_score
+from sklearn.model_selection import GroupKFold, GroupShuffleSplit, HalvingRandomSearchCV, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OrdinalEncoder
+
+from src.planning.knowledge_base_query import PROJECT_ROOT, get_knowledge_base
+from src.utils.model_store import ModelStore, fingerprint_frame
+
+MODEL_DIR = os.path.join(PROJECT_ROOT, "data", "models", "crop_recommender")
+MODEL_KEY = "crop_recommender"
+PIPELINE_VERSION = "crop-rf-v1"  # bump when features or preprocessing change
+
+CATEGORICAL_FEATURES = ["region", "fertilizer_type"]
+NUMERIC_FEATURES = ["latitude", "longitude", "water_availability", "price_per_kg"]
+FEATURE_COLUMNS = CATEGORICAL_FEATURES + NUMERIC_FEATURES
+TARGET_COLUMN = "crop_name"
+SITE_COLUMN = "site_id"  # groups the rows of one site (and its resampled copies) for splitting
+
+# Searched RandomForest settings; max_samples bounds each tree's bootstrap so
+# a fit stays fast on millions of rows
+PARAM_DISTRIBUTIONS = {
+    "model__n_estimators": [50, 100, 150],
+    "model__max_depth": [None, 16, 24],
+    "model__min_samples_leaf": [2, 5, 10, 20],
+    "model__max_features": ["sqrt", 0.5, None],
+    "model__max_samples": [0.05, 0.1, 0.2],
+}
+
+
+def base_training_rows(kb: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """One training row per knowledge-base row (FEATURE_COLUMNS + TARGET_COLUMN + SITE_COLUMN)."""
+    kb = get_knowledge_base().frame if kb is None else kb
+    rows = pd.DataFrame({
+        "region": kb["KnownRegions"].astype(str).str.strip().str.lower(),
+        "fertilizer_type": kb["FertilizerType"].astype(str).str.strip().str.lower(),
+        "latitude": pd.to_numeric(kb["Latitude"], errors="coerce"),
+        "longitude": pd.to_numeric(kb["Longitude"], errors="coerce"),
+        "water_availability": pd.to_numeric(kb["WaterAvailabilityLPerDay"], errors="coerce"),
+        "price_per_kg": pd.to_numeric(kb["AvgMarketPriceMMK"], errors="coerce"),
+        TARGET_COLUMN: kb["CropName"].astype(str).str.strip(),
+    })
+    rows = rows.dropna().reset_index(drop=True)
+    rows[SITE_COLUMN] = rows.groupby(["region", "latitude", "longitude"], sort=False).ngroup()
+    return rows
+
+
+def expand_training_set(base: pd.DataFrame, rows: int, seed: int = 0, coordinate_jitter: float = 0.05,
+                        value_jitter: float = 0.15) -> pd.DataFrame:
+    """
+    Resample `base` to `rows` rows with jitter: coordinates by N(0, coordinate_jitter)
+    degrees, water availability and price by a uniform factor of 1 +/- value_jitter.
+    Each row keeps the SITE_COLUMN of the base row it was drawn from.
+    """
+    rng = np.random.default_rng(seed)
+    picked = base.iloc[rng.integers(0, len(base), rows)].reset_index(drop=True)
+    picked["latitude"] += rng.normal(0, coordinate_jitter, rows)
+    picked["longitude"] += rng.normal(0, coordinate_jitter, rows)
+    picked["water_availability"] *= rng.uniform(1 - value_jitter, 1 + value_jitter, rows)
+    picked["price_per_kg"] *= rng.uniform(1 - value_jitter, 1 + value_jitter, rows)
+    return picked
+
+
+def load_training_set(path: str) -> pd.DataFrame:
+    """
+    Read a CSV or Parquet training set with FEATURE_COLUMNS and TARGET_COLUMN.
+    Without a SITE_COLUMN, rows with the same region and coordinates form a site.
+    """
+    df = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+    missing = [c for c in FEATURE_COLUMNS + [TARGET_COLUMN] if c not in df.columns]
+    if missing:
+        raise ValueError(f"Training set {path} is missing columns: {missing}")
+    columns = FEATURE_COLUMNS + [TARGET_COLUMN] + ([SITE_COLUMN] if SITE_COLUMN in df.columns else [])
+    df = df[columns].dropna().reset_index(drop=True)
+    if SITE_COLUMN not in df.columns:
+        df[SITE_COLUMN] = df.groupby(["region", "latitude", "longitude"], sort=False).ngroup()
+    return df
+
+
+def build_pipeline(n_jobs: int = 1, seed: int = 0) -> Pipeline:
+    """Ordinal-encode the categorical features (unknown values -> -1) and fit a random forest."""
+    encode = ColumnTransformer(
+        [("categorical", OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1), CATEGORICAL_FEATURES)],
+        remainder="passthrough",
+    )
+    return Pipeline([
+        ("encode", encode),
+        ("model", RandomForestClassifier(n_estimators=100, n_jobs=n_jobs, random_state=seed)),
+    ])
+
+
+def split_by_site(data: pd.DataFrame, test_rows: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Train/test row positions with every site wholly on one side (about `test_rows`
+    test rows). With a single site, fall back to a row split, stratified only if
+    every crop has at least two rows.
+    """
+    groups = data[SITE_COLUMN].to_numpy()
+    if len(np.unique(groups)) >= 2:
+        splitter = GroupShuffleSplit(n_splits=1, test_size=test_rows / len(data), random_state=seed)
+        return next(splitter.split(data, groups=groups))
+    y = data[TARGET_COLUMN]
+    stratify = y if y.value_counts().min() >= 2 else None
+    return train_test_split(np.arange(len(data)), test_size=test_rows, random_state=seed, stratify=stratify)
+
+
+def region_baseline_top3(train: pd.DataFrame, test: pd.DataFrame) -> float:
+    """
+    Top-3 accuracy of always answering the region's three most common training
+    crops (the overall three for unseen regions): the bar the model must beat.
+    """
+    def top3(labels: pd.Series) -> set:
+        return set(labels.value_counts().index[:3])
+
+    overall = top3(train[TARGET_COLUMN])
+    by_region = {region: top3(labels) for region, labels in train.groupby("region")[TARGET_COLUMN]}
+    hits = [crop in by_region.get(region, overall) for region, crop in zip(test["region"], test[TARGET_COLUMN])]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def train_crop_recommender(data: pd.DataFrame, n_candidates: int = 24, factor: int = 3, search_rows: int = 150_000,
+                           min_resources: int = 5_000, cv: int = 3, test_size: float = 0.2,
+                           n_jobs: int = -1, seed: int = 0) -> Tuple[Pipeline, Dict]:
+    """
+    Search, refit and evaluate the recommender.
+
+    Args:
+        data: Training set (FEATURE_COLUMNS + TARGET_COLUMN + SITE_COLUMN)
+        n_candidates: Parameter settings sampled for the first halving round
+        factor: Halving factor (candidates kept 1/factor, resources x factor per round)
+        search_rows: Most rows any candidate is cross-validated on
+        min_resources: Rows per candidate in the first round
+        cv: Cross-validation folds (grouped by site)
+        test_size: Held-out fraction (at most 200,000 rows, whole sites) for the final scores
+        n_jobs: Parallel jobs for the search and the final fit (-1 = all cores)
+
+    Returns:
+        (fitted pipeline, metadata with data size, best parameters, search results,
+        held-out scores and timings)
+    """
+    X, y = data[FEATURE_COLUMNS], data[TARGET_COLUMN].to_numpy()
+    test_rows = max(min(int(len(data) * test_size), 200_000), 1)
+    train_idx, test_idx = split_by_site(data, test_rows, seed=seed)
+    X_train, X_test, y_train, y_test = X.iloc[train_idx], X.iloc[test_idx], y[train_idx], y[test_idx]
+    groups_train = data[SITE_COLUMN].to_numpy()[train_idx]
+
+    search_rows = min(search_rows, len(X_train))
+    search = HalvingRandomSearchCV(
+        build_pipeline(n_jobs=1, seed=seed), PARAM_DISTRIBUTIONS, n_candidates=n_candidates, factor=factor,
+        resource="n_samples", min_resources=min(min_resources, search_rows), max_resources=search_rows,
+        cv=GroupKFold(n_splits=cv), scoring="accuracy", refit=False, n_jobs=n_jobs, random_state=seed,
+    )
+    started = time.perf_counter()
+    search.fit(X_train, y_train, groups=groups_train)
+    search_seconds = time.perf_counter() - started
+
+    model = build_pipeline(n_jobs=n_jobs, seed=seed).set_params(**search.best_params_)
+    started = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    proba = model.predict_proba(X_test)
+    predict_seconds = time.perf_counter() - started
+    classes = model.classes_
+    predicted = classes[proba.argmax(axis=1)]
+
+    results = pd.DataFrame(search.cv_results_)
+    metadata = {
+        "pipeline_version": PIPELINE_VERSION,
+        "features": FEATURE_COLUMNS,
+        "classes": [str(c) for c in classes],
+        "train_rows": len(X_train),
+        "test_rows": len(X_test),
+        "train_sites": int(len(np.unique(groups_train))),
+        "test_sites": int(data[SITE_COLUMN].iloc[test_idx].nunique()),
+        "split": "grouped by site",
+        "best_params": {k.replace("model__", ""): v for k, v in search.best_params_.items()},
+        "cv_accuracy": round(float(search.best_score_), 4),
+        "test_accuracy": round(float(accuracy_score(y_test, predicted)), 4),
+        "test_top3_accuracy": round(float(top_k_accuracy_score(y_test, proba, k=min(3, len(classes)),
+                                                               labels=classes)), 4),
+        # Rows of one site share their features, so top-1 accuracy is capped at about
+        # 1 / crops_per_site; compare top-3 with the region lookup baseline
+        "crops_per_site": round(float(data.groupby(SITE_COLUMN)[TARGET_COLUMN].nunique().mean()), 2),
+        "baseline_top3_accuracy": round(region_baseline_top3(data.iloc[train_idx], data.iloc[test_idx]), 4),
+        "search": {
+            "candidates": int(search.n_candidates_[0]),
+            "rounds": int(search.n_iterations_),
+            "resources_per_round": [int(r) for r in search.n_resources_],
+            "fits": int(len(results) * cv),
+            "mean_fit_seconds_per_round": results.groupby("iter")["mean_fit_time"].mean().round(3).tolist(),
+        },
+        "search_seconds": round(search_seconds, 2),
+        "fit_seconds": round(fit_seconds, 2),
+        "predict_seconds": round(predict_seconds, 2),
+        "n_jobs": n_jobs,
+        "cpu_count": os.cpu_count(),
+        "sklearn_version": sklearn.__version__,
+        "seed": seed,
+    }
+    return model, metadata
+
+
+def save_crop_recommender(model: Pipeline, metadata: Dict, data: pd.DataFrame, source: str,
+                          model_dir: str = MODEL_DIR, keep_versions: int = 5) -> Dict:
+    """
+    Store the model as a new version, keyed by a fingerprint of the training data
+    and the training configuration. Returns the stored metadata (with 'version').
+    """
+    store = ModelStore(model_dir, serializer="joblib", keep_versions=keep_versions)
+    salt = json.dumps({k: metadata[k] for k in ("pipeline_version", "best_params", "seed")}, sort_keys=True,
+                      default=str)
+    fingerprint = fingerprint_frame(data, salt=salt)
+    extra = {**metadata, "version": fingerprint[:16], "source": source, "rows": len(data),
+             "artifact": os.path.basename(store.path_for(MODEL_KEY, fingerprint))}
+    store.save(MODEL_KEY, fingerprint, model, fit_seconds=metadata["fit_seconds"], extra=extra)
+    return store.latest_entry(MODEL_KEY)
+
+
+def load_crop_recommender(version: Optional[str] = None, model_dir: str = MODEL_DIR) -> Tuple[Optional[Pipeline], Optional[Dict]]:
+    """
+    Load a stored recommender: the given version (fingerprint prefix) or the newest.
+
+    Returns:
+        (pipeline, metadata), or (None, None) if no matching version is stored
+    """
+    store = ModelStore(model_dir, serializer="joblib")
+    entries = [e for e in store.entries() if e.get("key") == MODEL_KEY]
+    if version:
+        entries = [e for e in entries if e["fingerprint"].startswith(version)]
+    if not entries:
+        return None, None
+    entry = max(entries, key=lambda e: e.get("created_at", ""))
+    model, _ = store.load(MODEL_KEY, entry["fingerprint"])
+    return model, entry
+
+
+def predict_top_crops(model: Pipeline, sites: pd.DataFrame, k: int = 3) -> List[List[Dict]]:
+    """
+    The k most likely crops per site row (FEATURE_COLUMNS), as [{'crop_name', 'probability'}, ...].
+    """
+    features = sites[FEATURE_COLUMNS].copy()
+    for column in CATEGORICAL_FEATURES:
+        features[column] = features[column].astype(str).str.strip().str.lower()
+    proba = model.predict_proba(features)
+    top = np.argsort(-proba, axis=1)[:, :k]
+    return [[{"crop_name": str(model.classes_[j]), "probability": round(float(proba[i, j]), 4)} for j in row]
+            for i, row in enumerate(top)]
@@ -0,0 +1,91 @@
+# File: src/scripts/benchmark_knowledge_base.py
+# Description:
+#   Times the knowledge-base builders in create_knowledge_base.py on a
+#   synthetic input made of 'Full Data.txt' repeated N times (townships
+#   renamed, coordinates jittered): the original row-by-row builder, the
+#   batch builder in-process, and the batch builder on a process pool.
+#   Also checks that the batch output matches the row-wise output on every
+#   column except the randomized profit, and times the CSV/Parquet writes.
+#
+# Usage:
+#   python src/scripts/benchmark_knowledge_base.py                 # 100x input
+#   python src/scripts/benchmark_knowledge_base.py --scale 10 --workers 4
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# This file is at: [project_root]/src/scripts/benchmark_knowledge_base.py
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+with contextlib.redirect_stdout(io.StringIO()):  # the builder prints its path setup on import
+    import create_knowledge_base as kb
+
+
+def synthetic_copy(base: pd.DataFrame, i: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Copy `i` of 'Full Data.txt': townships renamed, coordinates jittered."""
+    copy = base.copy()
+    copy['Township'] = [f"{t}_{i}" if not str(t).startswith('Township_') else t for t in base['Township']]
+    copy['Latitude'] = base['Latitude'] + rng.normal(0, 0.05, len(base))
+    copy['Longitude'] = base['Longitude'] + rng.normal(0, 0.05, len(base))
+    return copy
+
+
+def synthetic_full_data(scale: int, seed: int = 0) -> pd.DataFrame:
+    """'Full Data.txt' repeated `scale` times with unique townships and jittered coordinates."""
+    base = pd.read_csv(kb.FULL_DATA_PATH)
+    rng = np.random.default_rng(seed)
+    return pd.concat([synthetic_copy(base, i, rng) for i in range(scale)], ignore_index=True)
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the knowledge-base builders.")
+    parser.add_argument('--scale', type=int, default=100, help="Copies of 'Full Data.txt' in the input")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-rows', type=int, default=kb.CHUNK_ROWS)
+    parser.add_argument('--skip-rowwise', action='store_true', help="Skip the slow original builder")
+    args = parser.parse_args()
+
+    full_data = synthetic_full_data(args.scale)
+    print(f"Input: {len(full_data)} rows ({args.scale}x 'Full Data.txt')")
+
+    batch, batch_seconds = timed(kb.build_knowledge_base, full_data, workers=1, seed=0)
+    pooled, pooled_seconds = timed(kb.build_knowledge_base, full_data, workers=args.workers,
+                                   chunk_rows=args.chunk_rows, seed=0)
+    print(f"batch, in-process:        {batch_seconds:8.2f} s  ({len(batch)} rows)")
+    print(f"batch, {args.workers:>2} workers:       {pooled_seconds:8.2f} s")
+
+    if not args.skip_rowwise:
+        with contextlib.redirect_stderr(io.StringIO()):  # tqdm progress bar
+            rowwise, rowwise_seconds = timed(kb.build_knowledge_base_rowwise, full_data)
+        print(f"row-wise (original):      {rowwise_seconds:8.2f} s  "
+              f"-> {rowwise_seconds / batch_seconds:.0f}x / {rowwise_seconds / pooled_seconds:.0f}x slower")
+        compared = [c for c in rowwise.columns if c != 'PredictedProfitMMK']
+        same = all(rowwise[c].astype(str).equals(batch[c].astype(str)) for c in compared)
+        print(f"Batch output matches row-wise on {len(compared)} deterministic columns: {same}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, parquet_path = os.path.join(tmp, 'kb.csv'), os.path.join(tmp, 'kb.parquet')
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, write_seconds = timed(kb.write_knowledge_base, batch, csv_path, parquet_path)
+        sizes = [os.path.getsize(p) / 1e6 if os.path.exists(p) else float('nan') for p in (csv_path, parquet_path)]
+        print(f"write CSV + Parquet:      {write_seconds:8.2f} s  (CSV {sizes[0]:.1f} MB, Parquet {sizes[1]:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
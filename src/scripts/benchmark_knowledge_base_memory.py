@@ -0,0 +1,96 @@
+# File: src/scripts/benchmark_knowledge_base_memory.py
+# Description:
+#   Peak Python heap (tracemalloc) of the in-memory knowledge-base build
+#   (read all input, build_knowledge_base, write_knowledge_base) against the
+#   streaming build (build_knowledge_base_streaming) on synthetic inputs of
+#   growing size: 'Full Data.txt' repeated N times, written to a temporary CSV
+#   one copy at a time. The streaming peak should stay flat as N grows.
+#   Both builds run in-process with one worker so tracemalloc sees every
+#   allocation; pyarrow's own memory pool is not traced. With a fixed seed the
+#   two outputs are also compared.
+#
+# Usage:
+#   python src/scripts/benchmark_knowledge_base_memory.py                   # scales 10 50 200
+#   python src/scripts/benchmark_knowledge_base_memory.py --scales 10 100 1000 --skip-in-memory
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# This file is at: [project_root]/src/scripts/benchmark_knowledge_base_memory.py
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.scripts.benchmark_knowledge_base import kb, synthetic_copy
+
+
+def write_synthetic_input(path: str, scale: int, seed: int = 0) -> int:
+    """Write 'Full Data.txt' repeated `scale` times to `path` without holding the copies; returns rows."""
+    base = pd.read_csv(kb.FULL_DATA_PATH)
+    rng = np.random.default_rng(seed)
+    for i in range(scale):
+        synthetic_copy(base, i, rng).to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    return scale * len(base)
+
+
+def traced(fn, *args, **kwargs):
+    """(result, seconds, peak traced MB) of one call."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn(*args, **kwargs)
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak / 1e6
+
+
+def in_memory_build(input_path: str, csv_path: str, parquet_path: str, seed: int) -> int:
+    final_df = kb.build_knowledge_base(pd.read_csv(input_path), workers=1, seed=seed)
+    kb.write_knowledge_base(final_df, csv_path, parquet_path)
+    return len(final_df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak memory of the in-memory and streaming builds.")
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 50, 200],
+                        help="Copies of 'Full Data.txt' per run")
+    parser.add_argument('--chunk-rows', type=int, default=kb.STREAM_CHUNK_ROWS)
+    parser.add_argument('--skip-in-memory', action='store_true', help="Only run the streaming build")
+    args = parser.parse_args()
+
+    print(f"{'scale':>6} {'input rows':>11} {'kb rows':>9} | {'in-memory peak':>15} {'time':>8} | "
+          f"{'streaming peak':>15} {'time':>8} | same output")
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'full_data.csv')
+        outputs = {name: (os.path.join(tmp, f'{name}.csv'), os.path.join(tmp, f'{name}.parquet'))
+                   for name in ('memory', 'stream')}
+        for scale in args.scales:
+            rows = write_synthetic_input(input_path, scale)
+
+            report, stream_seconds, stream_peak = traced(
+                kb.build_knowledge_base_streaming, input_path, *outputs['stream'],
+                chunk_rows=args.chunk_rows, workers=1, seed=0)
+            memory_cells, same = "", ""
+            if not args.skip_in_memory:
+                _, memory_seconds, memory_peak = traced(in_memory_build, input_path, *outputs['memory'], seed=0)
+                memory_cells = f"{memory_peak:12.1f} MB {memory_seconds:7.2f}s"
+                same = str(pd.read_csv(outputs['memory'][0]).equals(pd.read_csv(outputs['stream'][0])))
+            print(f"{scale:>6} {rows:>11} {report['kb_rows']:>9} | {memory_cells:>24} | "
+                  f"{stream_peak:12.1f} MB {stream_seconds:7.2f}s | {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# File: src/scripts/benchmark_optimal_crop.py
+# Description:
+#   Times MarketPricePredictor.get_optimal_crop / rank_crops on a synthetic
+#   price file (many crops x regions x months of monthly prices), comparing
+#   the first call (file load, statistics and fast forecasts of every series)
+#   with repeated calls that reuse the cached results. Ranking always uses the
+#   fast forecasts of the whole price file, whatever the predictor's engine,
+#   region or trained models, so no train_all_models call is timed.
+#
+# Usage:
+#   python src/scripts/benchmark_optimal_crop.py
+#   python src/scripts/benchmark_optimal_crop.py --crops 200 --regions 10 --months 48
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# This file is at: [project_root]/src/scripts/benchmark_optimal_crop.py
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.market.price_predictor import MarketPricePredictor
+
+
+def synthetic_prices(n_crops: int, n_regions: int, n_months: int, seed: int = 0) -> pd.DataFrame:
+    """Monthly prices with a per-series level, trend, yearly cycle and noise."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2020-01-01', periods=n_months, freq='MS')
+    crops = [f"Crop {i:03d}" for i in range(n_crops)]
+    regions = [f"region_{j}" for j in range(n_regions)]
+    n_series = n_crops * n_regions
+    t = np.arange(n_months)
+    level = rng.uniform(200, 5000, size=(n_series, 1))
+    trend = rng.normal(0, 0.005, size=(n_series, 1))
+    season = rng.uniform(0, 0.15, size=(n_series, 1)) * np.sin(2 * np.pi * t / 12 + rng.uniform(0, 2 * np.pi, (n_series, 1)))
+    noise = rng.normal(0, 0.03, size=(n_series, n_months))
+    prices = level * (1 + trend * t + season + noise)
+    return pd.DataFrame({
+        'date': np.tile(dates.strftime('%Y-%m-%d'), n_series),
+        'region': np.repeat(np.tile(regions, n_crops), n_months),
+        'crop_name': np.repeat(np.repeat(crops, n_regions), n_months),
+        'price_per_kg': prices.ravel().round(2),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time get_optimal_crop / rank_crops on a synthetic price file, cold and cached.")
+    parser.add_argument('--crops', type=int, default=120)
+    parser.add_argument('--regions', type=int, default=6)
+    parser.add_argument('--months', type=int, default=36)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'market_prices.csv')
+        df = synthetic_prices(args.crops, args.regions, args.months)
+        df.to_csv(path, index=False)
+        crops = sorted(df['crop_name'].unique())
+        print(f"{len(crops)} crops x {args.regions} regions x {args.months} months ({len(df)} rows)")
+
+        predictor = MarketPricePredictor()
+        predictor.set_data_path(path)
+
+        started = time.perf_counter()
+        ranked = predictor.rank_crops(crops, days_ahead=30)
+        cold = time.perf_counter() - started
+
+        timings = []
+        for _ in range(args.repeats):
+            started = time.perf_counter()
+            predictor.get_optimal_crop(crops, days_ahead=30)
+            timings.append(time.perf_counter() - started)
+
+    print(ranked.head(10).to_string(index=False))
+    print(f"\nRanked {len(ranked)} (region, crop) series")
+    print(f"First call (load + stats + forecasts): {cold * 1000:.1f} ms")
+    print(f"Cached get_optimal_crop:               {np.median(timings) * 1000:.1f} ms (median of {args.repeats})")
+
+
+if __name__ == "__main__":
+    main()
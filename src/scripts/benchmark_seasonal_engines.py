@@ -0,0 +1,139 @@
+# File: src/scripts/benchmark_seasonal_engines.py
+# Description:
+#   Compares the Prophet and harmonic-regression seasonal engines of
+#   PlantingDatePredictor on archived daily weather for every dashboard city:
+#   wall-clock time per engine, peak day-of-year agreement, and how well each
+#   engine's yearly curve tracks the observed day-of-year climatology of the
+#   suitability score. (Prophet's 'yearly' component excludes whatever its
+#   regressors explain, so it can track the observed cycle poorly.)
+#
+# Usage:
+#   python src/scripts/benchmark_seasonal_engines.py --years 3
+#   python src/scripts/benchmark_seasonal_engines.py --mock      # offline, local stand-in server
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# This file is at: [project_root]/src/scripts/benchmark_seasonal_engines.py
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from app.data.city_coordinates import CITY_COORDINATES
+from app.planting_date_predictor import PlantingDatePredictor
+from app.seasonal_harmonics import seasonal_peak
+from src.data_collection.historical_weather import fetch_historical_weather
+from src.data_collection.mock_open_meteo import start_mock_server
+from src.utils.model_store import ModelStore
+
+
+def circular_day_difference(a: int, b: int, year_length: int = 366) -> int:
+    """Distance between two days of year, wrapping around the new year."""
+    diff = abs(a - b) % year_length
+    return min(diff, year_length - diff)
+
+
+def prophet_yearly_by_day(model, regressor_means: dict) -> pd.Series:
+    """Prophet's yearly component evaluated on one leap year, indexed by day of year."""
+    future = pd.DataFrame({'ds': pd.date_range('2024-01-01', '2024-12-31', freq='D')})
+    for reg_name in model.extra_regressors:
+        future[reg_name] = regressor_means.get(reg_name, 0)
+    yearly = model.predict(future)['yearly'].to_numpy()
+    return pd.Series(yearly, index=np.arange(1, len(yearly) + 1))
+
+
+def observed_climatology(prepared: pd.DataFrame, smooth_days: int = 15) -> pd.Series:
+    """Mean suitability score per day of year, smoothed with a circular rolling mean."""
+    by_day = prepared.groupby(pd.to_datetime(prepared['ds']).dt.dayofyear)['y'].mean()
+    by_day = by_day.reindex(np.arange(1, 367)).interpolate(limit_direction='both')
+    padded = np.concatenate([by_day.values[-smooth_days:], by_day.values, by_day.values[:smooth_days]])
+    smoothed = pd.Series(padded).rolling(smooth_days, center=True, min_periods=1).mean().values
+    return pd.Series(smoothed[smooth_days:-smooth_days], index=by_day.index)
+
+
+def _corr(a: pd.Series, b: pd.Series) -> float:
+    return round(float(np.corrcoef(a.to_numpy(), b.to_numpy())[0, 1]), 3)
+
+
+def benchmark_city(name: str, lat: float, lon: float, history: pd.DataFrame, crop: str) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        predictor = PlantingDatePredictor(lat, lon, historical_weather_df=history, model_store=ModelStore(tmp),
+                                          fit_prophet=False)
+        prophet_pattern = predictor.get_seasonal_pattern(crop, engine='prophet')
+        prophet_seconds = time.perf_counter() - started
+
+        prophet_curve = prophet_yearly_by_day(predictor.model, predictor.regressor_means)
+
+    prepared = PlantingDatePredictor(lat, lon, historical_weather_df=history, fit_prophet=False)._prepare_data(crop)
+    started = time.perf_counter()
+    peak = seasonal_peak(prepared['ds'], prepared['y'])
+    harmonic_seconds = time.perf_counter() - started
+
+    harmonic_curve = peak['curve']
+    observed = observed_climatology(prepared)
+    prophet_peak = int(prophet_curve.idxmax())
+    return {
+        'city': name,
+        'days': len(history),
+        'prophet_s': round(prophet_seconds, 3),
+        'harmonic_ms': round(harmonic_seconds * 1000, 2),
+        'speedup': round(prophet_seconds / harmonic_seconds) if harmonic_seconds > 0 else float('inf'),
+        'prophet_peak_doy': prophet_peak,
+        'harmonic_peak_doy': peak['peak_day_of_year'],
+        'peak_diff_days': circular_day_difference(prophet_peak, peak['peak_day_of_year']),
+        'observed_peak_doy': int(observed.idxmax()),
+        'prophet_vs_obs': _corr(prophet_curve, observed),
+        'harmonic_vs_obs': _corr(harmonic_curve, observed),
+        'prophet_period': prophet_pattern['best_period'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Prophet vs harmonic seasonal engines.")
+    parser.add_argument("--years", type=int, default=3, help="Years of archived daily weather per city")
+    parser.add_argument("--crop", default="tomato")
+    parser.add_argument("--base-url", default=None, help="Open-Meteo host override")
+    parser.add_argument("--mock", action="store_true", help="Serve archived data from the local mock server")
+    args = parser.parse_args()
+
+    end_date = datetime.now().date() - timedelta(days=7)
+    start_date = end_date - timedelta(days=365 * args.years)
+
+    server = start_mock_server() if args.mock else None
+    base_url = server.base_url if server else args.base_url
+    rows = []
+    try:
+        for name, coords in CITY_COORDINATES.items():
+            history = fetch_historical_weather(coords['lat'], coords['lon'], start_date.isoformat(), end_date.isoformat(),
+                                               base_url=base_url)
+            if history.empty:
+                print(f"Skipping {name}: no archived data")
+                continue
+            rows.append(benchmark_city(name, coords['lat'], coords['lon'], history, args.crop))
+            print(f"{name}: done")
+    finally:
+        if server:
+            server.stop()
+
+    if not rows:
+        print("No cities benchmarked.")
+        return
+    results = pd.DataFrame(rows)
+    print(results.to_string(index=False))
+    print(f"\nMedian Prophet time: {results['prophet_s'].median():.3f} s, "
+          f"median harmonic time: {results['harmonic_ms'].median():.2f} ms")
+    print(f"Median peak difference between engines: {results['peak_diff_days'].median():.0f} days")
+    print(f"Median correlation with observed climatology: Prophet {results['prophet_vs_obs'].median():.3f}, "
+          f"harmonic {results['harmonic_vs_obs'].median():.3f}")
+
+
+if __name__ == "__main__":
+    main()
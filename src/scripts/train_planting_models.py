@@ -0,0 +1,249 @@
+# File: src/scripts/train_planting_models.py
+# Description:
+#   Precomputes planting recommendations for every (township, crop) pair in
+#   'Full Data.txt' by distributing PlantingDatePredictor fits over a process
+#   pool. Archived weather is fetched once in the parent (nearby townships share
+#   requests) and each task receives only its own history slice. Every result,
+#   including failures and timeouts, is appended to a JSON Lines file as soon as
+#   it finishes, so an interrupted run can be resumed with --resume.
+#
+# Usage:
+#   python src/scripts/train_planting_models.py --workers 4
+#   python src/scripts/train_planting_models.py --mock --limit 20 --engine harmonic
+
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import pandas as pd
+
+# This file is at: [project_root]/src/scripts/train_planting_models.py
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from app.planting_date_predictor import PlantingDatePredictor, PLANTING_MODEL_STORE
+from src.data_collection.historical_weather import fetch_historical_weather
+from src.data_collection.mock_open_meteo import start_mock_server
+from src.data_collection.weather_sharing import FULL_DATA_PATH, SharedWeatherFetcher
+from src.utils.model_store import ModelStore
+
+DEFAULT_OUTPUT = os.path.join(project_root, 'data', 'models', 'planting_recommendations.jsonl')
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+@contextmanager
+def time_limit(seconds: float):
+    """Raise TaskTimeout in the worker if the block runs longer than `seconds` (Unix only)."""
+    if not seconds or not hasattr(signal, 'SIGALRM'):
+        yield
+        return
+
+    def _handler(signum, frame):
+        raise TaskTimeout(f"timed out after {seconds:g} s")
+
+    previous = signal.signal(signal.SIGALRM, _handler)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def load_township_crops(file_path: str = FULL_DATA_PATH) -> pd.DataFrame:
+    """One row per (township, crop) from the 'Suitable Crops' column."""
+    df = pd.read_csv(file_path)
+    df.columns = df.columns.str.strip()
+    df = df.dropna(subset=['Latitude', 'Longitude', 'Suitable Crops'])
+    df['Crop'] = df['Suitable Crops'].str.split(',')
+    df = df.explode('Crop')
+    df['Crop'] = df['Crop'].str.strip()
+    df = df[df['Crop'] != '']
+    return df[['Township', 'Region', 'Latitude', 'Longitude', 'Crop']].drop_duplicates().reset_index(drop=True)
+
+
+def train_task(task: Dict) -> Dict:
+    """
+    Worker entry point: fit (or load) the planting model for one township and crop
+    and return its recommendations. Never raises; failures are reported in the result.
+    """
+    started = time.perf_counter()
+    result = {
+        'township': task['township'],
+        'region': task['region'],
+        'latitude': task['latitude'],
+        'longitude': task['longitude'],
+        'crop': task['crop'],
+        'engine': task['engine'],
+        'pid': os.getpid(),
+    }
+    try:
+        with time_limit(task['timeout']):
+            store = ModelStore(task['store_dir'], serializer='prophet')
+            predictor = PlantingDatePredictor(task['latitude'], task['longitude'], historical_weather_df=task['history'],
+                                              model_store=store, fit_prophet=False)
+            windows = predictor.predict_planting_dates(task['crop'], task['region'], num_dates=task['num_dates'])
+            # With the Prophet engine this loads (or fits and stores) the crop's own model,
+            # the same per-crop model the dashboard's get_seasonal_pattern(crop) serves
+            pattern = predictor.get_seasonal_pattern(task['crop'], engine=task['engine'])
+        result.update({
+            'status': 'ok',
+            'model_source': predictor.model_source,
+            'best_period': pattern['best_period'],
+            'peak_season_start': pattern['peak_season_start'],
+            'peak_season_end': pattern['peak_season_end'],
+            'windows': [{'start': w['date'].strftime('%Y-%m-%d'), 'end': w['end_date'].strftime('%Y-%m-%d'),
+                         'score': w['score'], 'confidence': w['confidence']} for w in windows],
+        })
+    except TaskTimeout as e:
+        result.update({'status': 'timeout', 'error': str(e)})
+    except Exception as e:
+        result.update({'status': 'failed', 'error': f"{type(e).__name__}: {e}"})
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def completed_pairs(output_path: str) -> set:
+    """(township, crop) pairs already trained successfully in a previous run."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partially written line from an interrupted run
+            if record.get('status') == 'ok':
+                done.add((record['township'], record['crop']))
+    return done
+
+
+def fetch_histories(points: pd.DataFrame, years: int, base_url, radius_km: float, max_workers: int) -> List:
+    """Archived daily weather per township, sharing requests between nearby townships."""
+    end_date = datetime.now().date() - timedelta(days=7)
+    start_date = end_date - timedelta(days=365 * years)
+    fetcher = SharedWeatherFetcher(
+        lambda lat, lon: fetch_historical_weather(lat, lon, start_date.isoformat(), end_date.isoformat(), base_url=base_url),
+        radius_km=radius_km, mode='nearest', max_workers=max_workers,
+    )
+    histories = fetcher.fetch_many(points['Latitude'], points['Longitude'])
+    report = fetcher.report()
+    print(f"Weather: {report['requests_issued']} requests for {len(points)} townships "
+          f"({report['requests_failed']} failed, {report['saved_ratio']:.0%} saved)")
+    return histories
+
+
+def run(tasks: List[Dict], output_path: str, workers: int) -> Dict:
+    """Run tasks on a process pool, streaming each result to `output_path` as it completes."""
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    counts = {'ok': 0, 'failed': 0, 'timeout': 0}
+    started = time.perf_counter()
+    with open(output_path, 'a', encoding='utf-8') as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(train_task, task): task for task in tasks}
+        for done, future in enumerate(as_completed(futures), start=1):
+            task = futures[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                # A worker died (e.g. out of memory); the remaining futures fail the same way
+                result = {'township': task['township'], 'region': task['region'], 'crop': task['crop'],
+                          'engine': task['engine'], 'status': 'failed', 'error': f"worker crashed: {e}"}
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+            counts[result['status']] += 1
+
+            elapsed = time.perf_counter() - started
+            rate = done / elapsed if elapsed > 0 else 0.0
+            eta = (len(tasks) - done) / rate if rate > 0 else 0.0
+            detail = f" ({result['error']})" if result['status'] != 'ok' else ''
+            print(f"[{done}/{len(tasks)}] {task['township']} / {task['crop']}: {result['status']}{detail} "
+                  f"| {rate:.2f} tasks/s, ETA {eta:.0f} s")
+    counts['seconds'] = round(time.perf_counter() - started, 2)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train planting models for every township and crop on a process pool.")
+    parser.add_argument("--data", default=FULL_DATA_PATH)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON Lines file results are appended to")
+    parser.add_argument("--engine", choices=["prophet", "harmonic"], default="prophet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds allowed per task")
+    parser.add_argument("--years", type=int, default=3, help="Years of archived weather per township")
+    parser.add_argument("--num-dates", type=int, default=3, help="Planting windows per crop")
+    parser.add_argument("--radius-km", type=float, default=10.0, help="Townships this close share weather requests")
+    parser.add_argument("--limit", type=int, default=None, help="Only the first N townships")
+    parser.add_argument("--resume", action="store_true", help="Skip pairs already trained in --output")
+    parser.add_argument("--base-url", default=None, help="Open-Meteo host override")
+    parser.add_argument("--mock", action="store_true", help="Serve archived data from the local mock server")
+    args = parser.parse_args()
+
+    pairs = load_township_crops(args.data)
+    points = pairs[['Township', 'Region', 'Latitude', 'Longitude']].drop_duplicates('Township').reset_index(drop=True)
+    if args.limit:
+        points = points.head(args.limit)
+        pairs = pairs[pairs['Township'].isin(points['Township'])]
+    if args.resume:
+        done = completed_pairs(args.output)
+        pairs = pairs[[(t, c) not in done for t, c in zip(pairs['Township'], pairs['Crop'])]]
+        points = points[points['Township'].isin(pairs['Township'])].reset_index(drop=True)
+        print(f"Resuming: {len(done)} pairs already trained")
+    if pairs.empty:
+        print("Nothing to train.")
+        return
+
+    server = start_mock_server() if args.mock else None
+    try:
+        histories = fetch_histories(points, args.years, server.base_url if server else args.base_url,
+                                    args.radius_km, max_workers=min(8, args.workers))
+    finally:
+        if server:
+            server.stop()
+    history_by_township = dict(zip(points['Township'], histories))
+
+    tasks, skipped = [], 0
+    for row in pairs.itertuples(index=False):
+        history = history_by_township.get(row.Township)
+        if history is None or history.empty:
+            skipped += 1
+            continue
+        tasks.append({
+            'township': row.Township,
+            'region': row.Region,
+            'latitude': float(row.Latitude),
+            'longitude': float(row.Longitude),
+            'crop': row.Crop,
+            'history': history,
+            'engine': args.engine,
+            'num_dates': args.num_dates,
+            'timeout': args.timeout,
+            'store_dir': PLANTING_MODEL_STORE.root_dir,
+        })
+    if skipped:
+        print(f"Skipping {skipped} pairs without archived weather")
+    if not tasks:
+        print("No tasks to run: no township has archived weather.")
+        return
+    print(f"Training {len(tasks)} (township, crop) models with {args.workers} workers ({args.engine})")
+
+    counts = run(tasks, args.output, args.workers)
+    rate = len(tasks) / counts['seconds'] if counts['seconds'] > 0 else 0.0
+    print(f"\nDone in {counts['seconds']} s: {counts['ok']} ok, {counts['failed']} failed, {counts['timeout']} timed out "
+          f"({rate:.2f} tasks/s). Results: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# src/utils/agro_meteorology.py
+"""
+Derived agro-meteorological metrics as vectorized NumPy functions.
+
+Every function accepts scalars or arrays of any shape (e.g. locations x hours)
+and broadcasts like a ufunc, so whole hourly/daily series for many locations
+are processed in one call. Missing values (None/NaN) propagate as NaN.
+
+The metrics are informational: get_open_meteo_weather attaches them and the
+dashboard displays them, but crop scoring (app/ml_crop_recommender.py) and the
+yield model still use raw temperature and humidity, since the crop settings
+define no VPD, heat-index or GDD ranges to score against.
+"""
+import warnings
+from typing import Dict, Optional
+
+import numpy as np
+
+# Magnus coefficients, as used by the dashboard's original dew point formula
+MAGNUS_A = 17.27
+MAGNUS_B = 237.7
+
+
+def _as_float(values) -> np.ndarray:
+    return np.asarray(values, dtype=float)
+
+
+def saturation_vapour_pressure(temp_c) -> np.ndarray:
+    """Saturation vapour pressure in kPa (FAO-56, eq. 11)."""
+    t = _as_float(temp_c)
+    return 0.6108 * np.exp(17.27 * t / (t + 237.3))
+
+
+def actual_vapour_pressure(temp_c, rel_humidity) -> np.ndarray:
+    """Actual vapour pressure in kPa from temperature and relative humidity (%)."""
+    return saturation_vapour_pressure(temp_c) * _as_float(rel_humidity) / 100.0
+
+
+def vapour_pressure_deficit(temp_c, rel_humidity) -> np.ndarray:
+    """Vapour pressure deficit in kPa; humidity above 100% is clipped."""
+    rh = np.clip(_as_float(rel_humidity), 0.0, 100.0)
+    return saturation_vapour_pressure(temp_c) * (1.0 - rh / 100.0)
+
+
+def dew_point(temp_c, rel_humidity) -> np.ndarray:
+    """Dew point in °C (Magnus formula). Non-positive humidity yields NaN."""
+    t = _as_float(temp_c)
+    rh = _as_float(rel_humidity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alpha = MAGNUS_A * t / (MAGNUS_B + t) + np.log(np.where(rh > 0, rh, np.nan) / 100.0)
+        return MAGNUS_B * alpha / (MAGNUS_A - alpha)
+
+
+def heat_index(temp_c, rel_humidity) -> np.ndarray:
+    """
+    Apparent temperature in °C (NWS Rothfusz regression, Steadman's
+    approximation below 26.7 °C where the regression is not valid).
+    """
+    t_f = _as_float(temp_c) * 9.0 / 5.0 + 32.0
+    rh = _as_float(rel_humidity)
+    simple = 0.5 * (t_f + 61.0 + (t_f - 68.0) * 1.2 + rh * 0.094)
+    full = (-42.379 + 2.04901523 * t_f + 10.14333127 * rh - 0.22475541 * t_f * rh
+            - 6.83783e-3 * t_f ** 2 - 5.481717e-2 * rh ** 2 + 1.22874e-3 * t_f ** 2 * rh
+            + 8.5282e-4 * t_f * rh ** 2 - 1.99e-6 * t_f ** 2 * rh ** 2)
+    hi_f = np.where((simple + t_f) / 2.0 >= 80.0, full, simple)
+    return (hi_f - 32.0) * 5.0 / 9.0
+
+
+def growing_degree_days(temp_max, temp_min, base_c: float = 10.0, cap_c: float = 30.0) -> np.ndarray:
+    """
+    Daily growing degree days with base and upper cutoff temperatures
+    (both daily extremes are clamped to [base_c, cap_c] before averaging).
+    """
+    tmax = np.clip(_as_float(temp_max), base_c, cap_c)
+    tmin = np.clip(_as_float(temp_min), base_c, cap_c)
+    return (tmax + tmin) / 2.0 - base_c
+
+
+def cumulative_gdd(temp_max, temp_min, base_c: float = 10.0, cap_c: float = 30.0, axis: int = -1) -> np.ndarray:
+    """Running GDD total along `axis` (missing days contribute 0)."""
+    gdd = np.nan_to_num(growing_degree_days(temp_max, temp_min, base_c, cap_c), nan=0.0)
+    return np.cumsum(gdd, axis=axis)
+
+
+def hourly_to_daily(values, how: str = "mean", hours_per_day: int = 24) -> np.ndarray:
+    """
+    Aggregate an hourly array (..., n_hours) to daily (..., n_days), ignoring NaN.
+    Trailing partial days are dropped.
+    """
+    v = _as_float(values)
+    n_days = v.shape[-1] // hours_per_day
+    v = v[..., :n_days * hours_per_day].reshape(v.shape[:-1] + (n_days, hours_per_day))
+    reducers = {"mean": np.nanmean, "max": np.nanmax, "min": np.nanmin, "sum": np.nansum}
+    if how not in reducers:
+        raise ValueError(f"Unknown aggregation: {how}")
+    # All-NaN days yield NaN; silence numpy's "mean of empty slice" warning
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return reducers[how](v, axis=-1)
+
+
+def heat_stress_hours(temp_c, threshold_c: float = 35.0, hours_per_day: int = 24) -> np.ndarray:
+    """Number of hours per day at or above `threshold_c`."""
+    hot = (_as_float(temp_c) >= threshold_c).astype(float)
+    return hourly_to_daily(hot, how="sum", hours_per_day=hours_per_day)
+
+
+def derive_weather_metrics(hourly: Dict, daily: Optional[Dict] = None, gdd_base_c: float = 10.0,
+                           heat_threshold_c: float = 35.0) -> Dict[str, np.ndarray]:
+    """
+    Compute derived metrics from Open-Meteo style 'hourly'/'daily' blocks.
+
+    Args:
+        hourly: Must contain 'temperature_2m' and 'relativehumidity_2m'
+            (or 'relative_humidity_2m') arrays
+        daily: Optional block with 'temperature_2m_max'/'temperature_2m_min';
+            when missing, daily extremes are taken from the hourly temperatures
+        gdd_base_c: Base temperature for growing degree days
+        heat_threshold_c: Temperature counted as heat stress
+
+    Returns:
+        Dictionary of hourly arrays (dew_point, vpd, heat_index) and daily
+        arrays (vpd_mean, heat_index_max, heat_stress_hours, gdd, gdd_cumulative)
+    """
+    temp = _as_float(hourly.get("temperature_2m", []))
+    rh = _as_float(hourly.get("relativehumidity_2m", hourly.get("relative_humidity_2m", [])))
+    n = min(temp.shape[-1], rh.shape[-1]) if temp.ndim and rh.ndim else 0
+    temp, rh = temp[..., :n], rh[..., :n]
+
+    vpd = vapour_pressure_deficit(temp, rh)
+    hi = heat_index(temp, rh)
+    metrics = {
+        "dew_point": dew_point(temp, rh),
+        "vpd": vpd,
+        "heat_index": hi,
+        "vpd_mean": hourly_to_daily(vpd, "mean"),
+        "heat_index_max": hourly_to_daily(hi, "max"),
+        "heat_stress_hours": heat_stress_hours(temp, heat_threshold_c),
+    }
+
+    daily = daily or {}
+    if len(daily.get("temperature_2m_max", [])) and len(daily.get("temperature_2m_min", [])):
+        tmax, tmin = _as_float(daily["temperature_2m_max"]), _as_float(daily["temperature_2m_min"])
+    else:
+        tmax, tmin = hourly_to_daily(temp, "max"), hourly_to_daily(temp, "min")
+    metrics["gdd"] = growing_degree_days(tmax, tmin, base_c=gdd_base_c)
+    metrics["gdd_cumulative"] = cumulative_gdd(tmax, tmin, base_c=gdd_base_c)
+    return metrics
@@ -0,0 +1,45 @@
+# src/utils/geo.py
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Great-circle distance in kilometres. Accepts scalars or arrays (broadcast).
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def build_haversine_tree(lats, lons) -> BallTree:
+    """
+    Build a ball tree over (lat, lon) points in degrees using the haversine metric.
+    """
+    coords = np.radians(np.column_stack([np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)]))
+    return BallTree(coords, metric="haversine")
+
+
+def query_nearest_km(tree: BallTree, lats, lons, k: int = 1):
+    """
+    Return (distances_km, indices), each of shape (n_queries, k).
+    """
+    coords = np.radians(np.column_stack([np.atleast_1d(lats).astype(float), np.atleast_1d(lons).astype(float)]))
+    k = min(k, tree.data.shape[0])
+    dist, idx = tree.query(coords, k=k)
+    return dist * EARTH_RADIUS_KM, idx
+
+
+def query_radius_km(tree: BallTree, lats, lons, radius_km: float):
+    """
+    Return (indices, distances_km) object arrays of the points within `radius_km`
+    of each query, sorted by distance.
+    """
+    coords = np.radians(np.column_stack([np.atleast_1d(lats).astype(float), np.atleast_1d(lons).astype(float)]))
+    idx, dist = tree.query_radius(coords, r=radius_km / EARTH_RADIUS_KM, return_distance=True, sort_results=True)
+    dist_km = np.empty(len(dist), dtype=object)
+    for i, d in enumerate(dist):
+        dist_km[i] = d * EARTH_RADIUS_KM
+    return idx, dist_km
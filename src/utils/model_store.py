@@ -0,0 +1,222 @@
+# src/utils/model_store.py
+"""
+On-disk store for fitted models, keyed by a logical key (e.g. a location or a
+(region, crop) pair) and a fingerprint of the training data.
+
+A model is refitted only when the fingerprint changes; otherwise it is loaded
+from disk (or from a bounded in-process LRU cache). load and get_or_fit return
+the model together with how it was obtained, so concurrent callers sharing a
+store never read each other's access details. Each model file has a JSON sidecar
+recording fit time, load time and creation date, so different processes can
+write to the same store without sharing an index file.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+SERIALIZERS = ("prophet", "joblib")
+
+
+def fingerprint_frame(df: pd.DataFrame, columns: Optional[List[str]] = None, salt: str = "") -> str:
+    """
+    Stable content hash of a DataFrame (optionally restricted to `columns`),
+    combined with a salt such as a model/config version.
+    """
+    data = df[columns] if columns is not None else df
+    digest = hashlib.sha1(salt.encode("utf-8"))
+    digest.update(",".join(map(str, data.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _safe_name(key: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", key).strip("_") or "model"
+
+
+class ModelStore:
+    """
+    Args:
+        root_dir: Directory holding the serialized models
+        serializer: 'prophet' (Prophet JSON) or 'joblib' (any picklable estimator)
+        keep_versions: Fingerprints kept per key; older files are pruned on save
+        max_memory_models: Models kept in memory; the least recently used are dropped
+    """
+
+    def __init__(self, root_dir: str, serializer: str = "prophet", keep_versions: int = 1,
+                 max_memory_models: int = 32):
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown serializer: {serializer}")
+        self.root_dir = root_dir
+        self.serializer = serializer
+        self.keep_versions = keep_versions
+        self.max_memory_models = max_memory_models
+        self._memory: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "fits": 0, "fit_seconds": 0.0, "load_seconds": 0.0}
+
+    # --- paths and serialization ---
+    @property
+    def _extension(self) -> str:
+        return ".json" if self.serializer == "prophet" else ".joblib"
+
+    def path_for(self, key: str, fingerprint: str) -> str:
+        return os.path.join(self.root_dir, f"{_safe_name(key)}__{fingerprint[:16]}{self._extension}")
+
+    def _dump(self, model: Any, path: str):
+        os.makedirs(self.root_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, suffix=".tmp")
+        try:
+            if self.serializer == "prophet":
+                from prophet.serialize import model_to_json
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(model_to_json(model))
+            else:
+                import joblib
+                os.close(fd)
+                joblib.dump(model, tmp_path)
+            os.replace(tmp_path, path)  # atomic, readers never see a partial file
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _read(self, path: str) -> Any:
+        if self.serializer == "prophet":
+            from prophet.serialize import model_from_json
+            with open(path, "r", encoding="utf-8") as f:
+                return model_from_json(f.read())
+        import joblib
+        return joblib.load(path)
+
+    def _remember(self, key: str, fingerprint: str, model: Any):
+        """Cache a model in memory, dropping the least recently used beyond max_memory_models."""
+        with self._lock:
+            self._memory[(key, fingerprint)] = model
+            self._memory.move_to_end((key, fingerprint))
+            while len(self._memory) > max(self.max_memory_models, 0):
+                self._memory.popitem(last=False)
+
+    # --- public API ---
+    def load(self, key: str, fingerprint: str) -> Tuple[Optional[Any], Optional[Dict]]:
+        """
+        Return the stored model for (key, fingerprint) and how it was obtained
+        ({'key', 'source': 'memory' | 'disk', 'seconds'}), or (None, None) if there is none.
+        """
+        with self._lock:
+            if (key, fingerprint) in self._memory:
+                self._memory.move_to_end((key, fingerprint))
+                self.stats["memory_hits"] += 1
+                return self._memory[(key, fingerprint)], {"key": key, "source": "memory", "seconds": 0.0}
+
+        path = self.path_for(key, fingerprint)
+        if not os.path.exists(path):
+            return None, None
+        started = time.perf_counter()
+        try:
+            model = self._read(path)
+        except Exception as e:
+            print(f"Error loading stored model '{key}' from {path}: {e}")
+            return None, None
+        elapsed = time.perf_counter() - started
+
+        self._remember(key, fingerprint, model)
+        with self._lock:
+            self.stats["disk_hits"] += 1
+            self.stats["load_seconds"] += elapsed
+        self._update_meta(path, {"last_load_seconds": round(elapsed, 4),
+                                 "last_loaded_at": datetime.now().isoformat(timespec="seconds")})
+        return model, {"key": key, "source": "disk", "seconds": elapsed}
+
+    def save(self, key: str, fingerprint: str, model: Any, fit_seconds: float = 0.0, extra: Optional[Dict] = None):
+        """Persist a fitted model and its metadata, pruning older versions of the key."""
+        path = self.path_for(key, fingerprint)
+        self._dump(model, path)
+        meta = {
+            "key": key,
+            "fingerprint": fingerprint,
+            "serializer": self.serializer,
+            "fit_seconds": round(fit_seconds, 4),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            **(extra or {}),
+        }
+        with open(path + ".meta", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        self._remember(key, fingerprint, model)
+        self._prune(key, keep_fingerprint=fingerprint)
+
+    def get_or_fit(self, key: str, fingerprint: str, fit_fn: Callable[[], Any],
+                   extra: Optional[Dict] = None) -> Tuple[Any, Dict]:
+        """
+        Load the model for (key, fingerprint), fitting and saving it with `fit_fn` on a miss.
+
+        Returns:
+            (model, {'key', 'source': 'memory' | 'disk' | 'fit', 'seconds'})
+        """
+        model, info = self.load(key, fingerprint)
+        if model is not None:
+            return model, info
+        started = time.perf_counter()
+        model = fit_fn()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.stats["fits"] += 1
+            self.stats["fit_seconds"] += elapsed
+        try:
+            self.save(key, fingerprint, model, fit_seconds=elapsed, extra=extra)
+        except Exception as e:
+            print(f"Error saving model '{key}' to store: {e}")
+        return model, {"key": key, "source": "fit", "seconds": elapsed}
+
+    def entries(self) -> List[Dict]:
+        """Metadata of every stored model."""
+        if not os.path.isdir(self.root_dir):
+            return []
+        entries = []
+        for name in sorted(os.listdir(self.root_dir)):
+            if name.endswith(".meta"):
+                try:
+                    with open(os.path.join(self.root_dir, name), "r", encoding="utf-8") as f:
+                        entries.append(json.load(f))
+                except (OSError, json.JSONDecodeError):
+                    continue
+        return entries
+
+    def latest_entry(self, key: str) -> Optional[Dict]:
+        """Most recently created entry for a key, whatever its fingerprint."""
+        matches = [e for e in self.entries() if e.get("key") == key]
+        return max(matches, key=lambda e: e.get("created_at", "")) if matches else None
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+    # --- housekeeping ---
+    def _update_meta(self, path: str, updates: Dict):
+        meta_path = path + ".meta"
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            meta.update(updates)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2)
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    def _prune(self, key: str, keep_fingerprint: str):
+        older = sorted((e for e in self.entries() if e.get("key") == key and e.get("fingerprint") != keep_fingerprint),
+                       key=lambda e: e.get("created_at", ""), reverse=True)
+        for entry in older[max(self.keep_versions - 1, 0):]:
+            path = self.path_for(key, entry["fingerprint"])
+            for p in (path, path + ".meta"):
+                if os.path.exists(p):
+                    os.remove(p)
+            with self._lock:
+                self._memory.pop((key, entry["fingerprint"]), None)